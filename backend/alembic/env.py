@@ -3,7 +3,7 @@ from sqlalchemy import engine_from_config
 from sqlalchemy import pool
 from alembic import context
 from app.db.base import Base
-from app.models import user, analysis, chat, journal
+from app.models import user, analysis, chat, journal, interest, match_deck, swipe
 
 # this is the Alembic Config object, which provides
 # access to the values within the .ini file in use.
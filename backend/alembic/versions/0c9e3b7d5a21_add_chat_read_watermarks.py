@@ -0,0 +1,34 @@
+"""Add read watermarks and participant indexes to chat_sessions
+
+Revision ID: 0c9e3b7d5a21
+Revises: f4a7c2e9b816
+Create Date: 2026-10-17 22:41:09.863412
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0c9e3b7d5a21'
+down_revision: Union[str, None] = 'f4a7c2e9b816'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column('chat_sessions', sa.Column('read_seq_1', sa.Integer(), server_default='0', nullable=False))
+    op.add_column('chat_sessions', sa.Column('read_seq_2', sa.Integer(), server_default='0', nullable=False))
+    # Reads were never recorded; count existing history as read rather than unread
+    op.execute("UPDATE chat_sessions SET read_seq_1 = last_seq, read_seq_2 = last_seq")
+    op.create_index(op.f('ix_chat_sessions_user_id_1'), 'chat_sessions', ['user_id_1'], unique=False)
+    op.create_index(op.f('ix_chat_sessions_user_id_2'), 'chat_sessions', ['user_id_2'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index(op.f('ix_chat_sessions_user_id_2'), table_name='chat_sessions')
+    op.drop_index(op.f('ix_chat_sessions_user_id_1'), table_name='chat_sessions')
+    op.drop_column('chat_sessions', 'read_seq_2')
+    op.drop_column('chat_sessions', 'read_seq_1')
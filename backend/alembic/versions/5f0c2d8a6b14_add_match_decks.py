@@ -0,0 +1,49 @@
+"""Add users.updated_at, match_decks and match_precompute_runs tables
+
+Revision ID: 5f0c2d8a6b14
+Revises: e3b5a90d7c21
+Create Date: 2026-10-17 14:12:53.204771
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '5f0c2d8a6b14'
+down_revision: Union[str, None] = 'e3b5a90d7c21'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column('users', sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=True))
+    op.create_index(op.f('ix_users_updated_at'), 'users', ['updated_at'], unique=False)
+    op.create_table('match_decks',
+    sa.Column('user_id', sa.Integer(), nullable=False),
+    sa.Column('candidates', sa.JSON(), nullable=False),
+    sa.Column('computed_at', sa.DateTime(timezone=True), nullable=False),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('user_id')
+    )
+    op.create_index(op.f('ix_match_decks_computed_at'), 'match_decks', ['computed_at'], unique=False)
+    op.create_table('match_precompute_runs',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('mode', sa.String(), nullable=False),
+    sa.Column('started_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+    sa.Column('finished_at', sa.DateTime(timezone=True), nullable=True),
+    sa.Column('users_scored', sa.Integer(), nullable=True),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_match_precompute_runs_id'), 'match_precompute_runs', ['id'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index(op.f('ix_match_precompute_runs_id'), table_name='match_precompute_runs')
+    op.drop_table('match_precompute_runs')
+    op.drop_index(op.f('ix_match_decks_computed_at'), table_name='match_decks')
+    op.drop_table('match_decks')
+    op.drop_index(op.f('ix_users_updated_at'), table_name='users')
+    op.drop_column('users', 'updated_at')
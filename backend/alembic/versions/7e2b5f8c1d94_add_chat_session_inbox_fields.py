@@ -0,0 +1,70 @@
+"""Add denormalized inbox fields to chat_sessions
+
+Revision ID: 7e2b5f8c1d94
+Revises: 0c9e3b7d5a21
+Create Date: 2026-10-17 23:58:27.140695
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '7e2b5f8c1d94'
+down_revision: Union[str, None] = '0c9e3b7d5a21'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column('chat_sessions', sa.Column('last_message_id', sa.Integer(), nullable=True))
+    op.add_column('chat_sessions', sa.Column('last_message_preview', sa.String(length=120), nullable=True))
+    op.add_column('chat_sessions', sa.Column('last_activity_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False))
+    op.add_column('chat_sessions', sa.Column('unread_count_1', sa.Integer(), server_default='0', nullable=False))
+    op.add_column('chat_sessions', sa.Column('unread_count_2', sa.Integer(), server_default='0', nullable=False))
+    # Flagged messages never reach the recipient, so they are neither previewed nor unread
+    op.execute("""
+        UPDATE chat_sessions SET
+            last_message_id = (
+                SELECT m.id FROM chat_messages m
+                WHERE m.session_id = chat_sessions.id AND NOT coalesce(m.is_flagged, false)
+                ORDER BY m.seq DESC LIMIT 1
+            ),
+            unread_count_1 = (
+                SELECT count(*) FROM chat_messages m
+                WHERE m.session_id = chat_sessions.id AND m.seq > chat_sessions.read_seq_1
+                    AND m.sender_id = chat_sessions.user_id_2 AND NOT coalesce(m.is_flagged, false)
+            ),
+            unread_count_2 = (
+                SELECT count(*) FROM chat_messages m
+                WHERE m.session_id = chat_sessions.id AND m.seq > chat_sessions.read_seq_2
+                    AND m.sender_id = chat_sessions.user_id_1 AND NOT coalesce(m.is_flagged, false)
+            )
+    """)
+    op.execute("""
+        UPDATE chat_sessions SET
+            last_message_preview = (SELECT substr(m.message_content, 1, 120) FROM chat_messages m WHERE m.id = chat_sessions.last_message_id),
+            last_activity_at = coalesce(
+                (SELECT m.created_at FROM chat_messages m WHERE m.id = chat_sessions.last_message_id),
+                chat_sessions.created_at,
+                chat_sessions.last_activity_at
+            )
+    """)
+    op.drop_index(op.f('ix_chat_sessions_user_id_2'), table_name='chat_sessions')
+    op.drop_index(op.f('ix_chat_sessions_user_id_1'), table_name='chat_sessions')
+    op.create_index('ix_chat_sessions_user_id_1_last_activity_at', 'chat_sessions', ['user_id_1', 'last_activity_at'], unique=False)
+    op.create_index('ix_chat_sessions_user_id_2_last_activity_at', 'chat_sessions', ['user_id_2', 'last_activity_at'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_chat_sessions_user_id_2_last_activity_at', table_name='chat_sessions')
+    op.drop_index('ix_chat_sessions_user_id_1_last_activity_at', table_name='chat_sessions')
+    op.create_index(op.f('ix_chat_sessions_user_id_1'), 'chat_sessions', ['user_id_1'], unique=False)
+    op.create_index(op.f('ix_chat_sessions_user_id_2'), 'chat_sessions', ['user_id_2'], unique=False)
+    op.drop_column('chat_sessions', 'unread_count_2')
+    op.drop_column('chat_sessions', 'unread_count_1')
+    op.drop_column('chat_sessions', 'last_activity_at')
+    op.drop_column('chat_sessions', 'last_message_preview')
+    op.drop_column('chat_sessions', 'last_message_id')
@@ -0,0 +1,51 @@
+"""Add swipes and mutual_matches tables
+
+Revision ID: 8a4e6c1f9d30
+Revises: 5f0c2d8a6b14
+Create Date: 2026-10-17 15:36:02.817349
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '8a4e6c1f9d30'
+down_revision: Union[str, None] = '5f0c2d8a6b14'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table('swipes',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('swiper_id', sa.Integer(), nullable=False),
+    sa.Column('swipee_id', sa.Integer(), nullable=False),
+    sa.Column('action', sa.String(length=10), nullable=False),
+    sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=True),
+    sa.ForeignKeyConstraint(['swiper_id'], ['users.id'], ondelete='CASCADE'),
+    sa.ForeignKeyConstraint(['swipee_id'], ['users.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_swipes_id'), 'swipes', ['id'], unique=False)
+    op.create_index('ux_swipes_swiper_id_swipee_id', 'swipes', ['swiper_id', 'swipee_id'], unique=True)
+    op.create_table('mutual_matches',
+    sa.Column('user_id', sa.Integer(), nullable=False),
+    sa.Column('matched_user_id', sa.Integer(), nullable=False),
+    sa.Column('compatibility_score', sa.Float(), nullable=False),
+    sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=True),
+    sa.ForeignKeyConstraint(['matched_user_id'], ['users.id'], ondelete='CASCADE'),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('user_id', 'matched_user_id')
+    )
+    op.create_index('ix_mutual_matches_user_id_score', 'mutual_matches', ['user_id', 'compatibility_score'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_mutual_matches_user_id_score', table_name='mutual_matches')
+    op.drop_table('mutual_matches')
+    op.drop_index('ux_swipes_swiper_id_swipee_id', table_name='swipes')
+    op.drop_index(op.f('ix_swipes_id'), table_name='swipes')
+    op.drop_table('swipes')
@@ -0,0 +1,26 @@
+"""Add (user_id, created_at) index to text_analysis
+
+Revision ID: 9b3f6c1d2e47
+Revises: 4d21e106e088
+Create Date: 2026-10-17 09:12:41.318204
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '9b3f6c1d2e47'
+down_revision: Union[str, None] = '4d21e106e088'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_index('ix_text_analysis_user_id_created_at', 'text_analysis', ['user_id', 'created_at'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_text_analysis_user_id_created_at', table_name='text_analysis')
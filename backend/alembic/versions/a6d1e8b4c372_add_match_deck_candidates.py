@@ -0,0 +1,38 @@
+"""Add match_deck_candidates reverse index
+
+Revision ID: a6d1e8b4c372
+Revises: 7e2b5f8c1d94
+Create Date: 2026-10-18 09:41:06.318254
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a6d1e8b4c372'
+down_revision: Union[str, None] = '7e2b5f8c1d94'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table('match_deck_candidates',
+    sa.Column('candidate_id', sa.Integer(), nullable=False),
+    sa.Column('owner_id', sa.Integer(), nullable=False),
+    sa.ForeignKeyConstraint(['owner_id'], ['match_decks.user_id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('candidate_id', 'owner_id')
+    )
+    op.create_index(op.f('ix_match_deck_candidates_owner_id'), 'match_deck_candidates', ['owner_id'], unique=False)
+    op.execute("""
+        INSERT INTO match_deck_candidates (candidate_id, owner_id)
+        SELECT DISTINCT CAST(candidate ->> 1 AS INTEGER), d.user_id
+        FROM match_decks d, json_array_elements(d.candidates) AS candidate
+    """)
+
+
+def downgrade() -> None:
+    op.drop_index(op.f('ix_match_deck_candidates_owner_id'), table_name='match_deck_candidates')
+    op.drop_table('match_deck_candidates')
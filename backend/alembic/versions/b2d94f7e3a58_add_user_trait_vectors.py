@@ -0,0 +1,63 @@
+"""Add user_trait_vectors table
+
+Revision ID: b2d94f7e3a58
+Revises: 8a4e6c1f9d30
+Create Date: 2026-10-17 17:05:41.662190
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b2d94f7e3a58'
+down_revision: Union[str, None] = '8a4e6c1f9d30'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+BASE_TRAITS = ('openness', 'conscientiousness', 'extraversion', 'agreeableness', 'neuroticism')
+
+
+def upgrade() -> None:
+    op.create_table('user_trait_vectors',
+    sa.Column('user_id', sa.Integer(), nullable=False),
+    sa.Column('openness', sa.Float(), nullable=True),
+    sa.Column('conscientiousness', sa.Float(), nullable=True),
+    sa.Column('extraversion', sa.Float(), nullable=True),
+    sa.Column('agreeableness', sa.Float(), nullable=True),
+    sa.Column('neuroticism', sa.Float(), nullable=True),
+    sa.Column('extra_traits', sa.JSON(), nullable=True),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('user_id')
+    )
+
+    # Backfill from each user's latest text analysis
+    connection = op.get_bind()
+    analyses = sa.table('text_analysis', sa.column('id'), sa.column('user_id'),
+                        sa.column('trait_scores', sa.JSON()), sa.column('created_at'))
+    ranked = sa.select(
+        analyses.c.user_id, analyses.c.trait_scores,
+        sa.func.row_number().over(
+            partition_by=analyses.c.user_id,
+            order_by=(analyses.c.created_at.desc(), analyses.c.id.desc())
+        ).label('rank')
+    ).where(analyses.c.user_id.isnot(None)).subquery()
+    latest = connection.execute(sa.select(ranked.c.user_id, ranked.c.trait_scores).where(ranked.c.rank == 1)).all()
+    vectors = sa.table('user_trait_vectors', sa.column('user_id'), sa.column('extra_traits', sa.JSON()),
+                       *(sa.column(trait) for trait in BASE_TRAITS))
+    rows = [
+        dict(
+            user_id=user_id,
+            extra_traits={trait: score for trait, score in (traits or {}).items() if trait not in BASE_TRAITS},
+            **{trait: (traits or {}).get(trait) for trait in BASE_TRAITS}
+        )
+        for user_id, traits in latest
+    ]
+    if rows:
+        op.bulk_insert(vectors, rows)
+
+
+def downgrade() -> None:
+    op.drop_table('user_trait_vectors')
@@ -0,0 +1,45 @@
+"""Add latitude, longitude and geohash to users table
+
+Revision ID: c7a18e5f0b93
+Revises: 9b3f6c1d2e47
+Create Date: 2026-10-17 11:03:27.541982
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+from app.services.geo import geohash_encode, resolve_location
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c7a18e5f0b93'
+down_revision: Union[str, None] = '9b3f6c1d2e47'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column('users', sa.Column('latitude', sa.Float(), nullable=True))
+    op.add_column('users', sa.Column('longitude', sa.Float(), nullable=True))
+    op.add_column('users', sa.Column('geohash', sa.String(length=12), nullable=True))
+    op.create_index(op.f('ix_users_geohash'), 'users', ['geohash'], unique=False)
+
+    # Backfill coordinates for existing locations from the offline gazetteer
+    connection = op.get_bind()
+    users = sa.table('users', sa.column('id'), sa.column('location'),
+                     sa.column('latitude'), sa.column('longitude'), sa.column('geohash'))
+    for user_id, location in connection.execute(sa.select(users.c.id, users.c.location).where(users.c.location.isnot(None))).all():
+        coordinates = resolve_location(location)
+        if coordinates:
+            connection.execute(users.update().where(users.c.id == user_id).values(
+                latitude=coordinates[0], longitude=coordinates[1], geohash=geohash_encode(*coordinates)
+            ))
+
+
+def downgrade() -> None:
+    op.drop_index(op.f('ix_users_geohash'), table_name='users')
+    op.drop_column('users', 'geohash')
+    op.drop_column('users', 'longitude')
+    op.drop_column('users', 'latitude')
@@ -0,0 +1,28 @@
+"""Add updated_at and a pair index to compatibility_matches
+
+Revision ID: d8c3a6e2f147
+Revises: b2d94f7e3a58
+Create Date: 2026-10-17 18:22:16.093517
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd8c3a6e2f147'
+down_revision: Union[str, None] = 'b2d94f7e3a58'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column('compatibility_matches', sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=True))
+    op.create_index('ix_compatibility_matches_user_ids', 'compatibility_matches', ['user_id_1', 'user_id_2'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_compatibility_matches_user_ids', table_name='compatibility_matches')
+    op.drop_column('compatibility_matches', 'updated_at')
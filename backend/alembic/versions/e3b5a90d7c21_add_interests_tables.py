@@ -0,0 +1,44 @@
+"""Add interests and user_interests tables
+
+Revision ID: e3b5a90d7c21
+Revises: c7a18e5f0b93
+Create Date: 2026-10-17 12:41:09.318225
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e3b5a90d7c21'
+down_revision: Union[str, None] = 'c7a18e5f0b93'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table('interests',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('name', sa.String(length=100), nullable=False),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_interests_id'), 'interests', ['id'], unique=False)
+    op.create_index(op.f('ix_interests_name'), 'interests', ['name'], unique=True)
+    op.create_table('user_interests',
+    sa.Column('user_id', sa.Integer(), nullable=False),
+    sa.Column('interest_id', sa.Integer(), nullable=False),
+    sa.ForeignKeyConstraint(['interest_id'], ['interests.id'], ondelete='CASCADE'),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('user_id', 'interest_id')
+    )
+    op.create_index('ix_user_interests_interest_id', 'user_interests', ['interest_id'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_user_interests_interest_id', table_name='user_interests')
+    op.drop_table('user_interests')
+    op.drop_index(op.f('ix_interests_name'), table_name='interests')
+    op.drop_index(op.f('ix_interests_id'), table_name='interests')
+    op.drop_table('interests')
@@ -0,0 +1,45 @@
+"""Add per-session sequence numbers to chat_messages
+
+Revision ID: f4a7c2e9b816
+Revises: d8c3a6e2f147
+Create Date: 2026-10-17 21:04:38.517230
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f4a7c2e9b816'
+down_revision: Union[str, None] = 'd8c3a6e2f147'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column('chat_sessions', sa.Column('last_seq', sa.Integer(), server_default='0', nullable=False))
+    op.add_column('chat_messages', sa.Column('seq', sa.Integer(), nullable=True))
+    # Number existing messages in the order history used to return them
+    op.execute("""
+        UPDATE chat_messages SET seq = numbered.seq
+        FROM (
+            SELECT id, row_number() OVER (PARTITION BY session_id ORDER BY created_at, id) AS seq
+            FROM chat_messages
+        ) AS numbered
+        WHERE chat_messages.id = numbered.id
+    """)
+    op.execute("""
+        UPDATE chat_sessions SET last_seq = coalesce(
+            (SELECT max(seq) FROM chat_messages WHERE chat_messages.session_id = chat_sessions.id), 0
+        )
+    """)
+    op.alter_column('chat_messages', 'seq', nullable=False)
+    op.create_index('ux_chat_messages_session_id_seq', 'chat_messages', ['session_id', 'seq'], unique=True)
+
+
+def downgrade() -> None:
+    op.drop_index('ux_chat_messages_session_id_seq', table_name='chat_messages')
+    op.drop_column('chat_messages', 'seq')
+    op.drop_column('chat_sessions', 'last_seq')
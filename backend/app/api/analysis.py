@@ -1,9 +1,13 @@
 # backend/app/api/analysis.py
 from fastapi import APIRouter, Depends, HTTPException, status
+from sqlalchemy import func
 from sqlalchemy.orm import Session
 from app.db.session import get_db
 from app.services import openai_service
 from app.models.user import User
+from app.models.analysis import TextAnalysis
+from app.services import match_sync, sql_scoring
+from datetime import datetime
 
 router = APIRouter()
 
@@ -21,19 +25,38 @@ async def analyze_text(text: str, user_id: int, db: Session = Depends(get_db)):
             context=f"User: {user.full_name}, Traits: {user.trait_scores}"
         )
         
+        # Record the analysis; matching reads the latest one per user
+        text_analysis = TextAnalysis(
+            user_id=user_id,
+            text_content=text,
+            trait_scores=analysis_result.get('trait_scores', {}),
+            suggestions=analysis_result.get('suggestions', [])
+        )
+        db.add(text_analysis)
+        sql_scoring.store_trait_vector(db, user_id, text_analysis.trait_scores)
+        
         # Update user traits (weighted average with previous scores)
         if user.trait_scores and analysis_result.get('trait_scores'):
             # This would be a more sophisticated merging algorithm
+            # Copy before merging: in-place JSON mutations are not flushed by SQLAlchemy
+            trait_scores = dict(user.trait_scores)
             for trait, score in analysis_result['trait_scores'].items():
-                if trait in user.trait_scores:
-                    user.trait_scores[trait] = (user.trait_scores[trait] + score) / 2
+                if trait in trait_scores:
+                    trait_scores[trait] = (trait_scores[trait] + score) / 2
                 else:
-                    user.trait_scores[trait] = score
+                    trait_scores[trait] = score
+            user.trait_scores = trait_scores
         else:
             user.trait_scores = analysis_result.get('trait_scores', {})
+        user.last_analysis_date = datetime.utcnow()
+        # New traits make stored LLM analyses of this user stale
+        user.updated_at = func.now()
         
         db.commit()
         
+        # Keep the in-memory matching state in sync with the new latest analysis
+        match_sync.traits_changed(user_id, text_analysis.trait_scores)
+        
         return {
             "success": True,
             "analysis": analysis_result,
@@ -1,36 +1,272 @@
 # backend/app/api/chat.py (additional endpoints)
-from fastapi import APIRouter, Depends, HTTPException, WebSocket, WebSocketDisconnect
+from fastapi import APIRouter, Body, Depends, HTTPException, Query, WebSocket, WebSocketDisconnect, status
+from fastapi.concurrency import run_in_threadpool
+from jose import JWTError, jwt
+from sqlalchemy import func
 from sqlalchemy.orm import Session
-from typing import List
-from app.db.session import get_db
+from typing import Any, Dict, List, Optional, Set, Tuple
+from app.db.session import get_db, SessionLocal
 from app.models.chat import ChatSession, ChatMessage
 from app.models.user import User
-from app.schemas.chat import ChatMessageCreate, ChatMessageResponse
-from app.core.security import get_current_user
+from app.schemas.chat import (
+    ChatHistoryMessage, ChatHistoryResponse, ChatInboxEntry, ChatInboxResponse, ChatMessageCreate,
+    ChatMessageResponse, ChatSyncRequest, ChatSyncResponse, ChatSyncSession
+)
+from app.core.config import settings
+from app.core.security import ALGORITHM, SECRET_KEY, get_current_user
+from app.services import chat_service
+from app.services.chat_backplane import chat_backplane, session_channel, user_channel
+from app.services.connection_manager import Connection, connection_manager
+from app.services.hive_service import HiveService
+from app.services.openai_service import OpenAIService
+import asyncio
 import json
+import logging
+import time
 
 router = APIRouter()
+logger = logging.getLogger(__name__)
 
-# ... (your existing websocket and connection manager code remains)
+# Suggestion and subscription tasks outlive the frame that started them
+_background_tasks: Set[asyncio.Task] = set()
 
-@router.get("/chat/{session_id}/history")
+def _spawn(coroutine):
+    task = asyncio.create_task(coroutine)
+    _background_tasks.add(task)
+    task.add_done_callback(_background_tasks.discard)
+
+def _run_with_db(function, *args):
+    db = SessionLocal()
+    try:
+        return function(db, *args)
+    finally:
+        db.close()
+
+async def in_db(function, *args):
+    """Run blocking database work off the event loop that serves every socket."""
+    return await run_in_threadpool(_run_with_db, function, *args)
+
+def _moderate(content: str) -> Dict[str, Any]:
+    # HiveService calls the API with blocking requests, so it gets a thread and loop of its own
+    return asyncio.run(HiveService.moderate_content(content))
+
+def _frame(frame_type: str, data: Dict[str, Any]) -> Dict[str, Any]:
+    return {"type": frame_type, "data": data, "timestamp": int(time.time() * 1000)}
+
+def _token_user_id(db: Session, token: Optional[str]) -> Optional[int]:
+    if not token:
+        return None
+    try:
+        email = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM]).get("sub")
+    except JWTError:
+        return None
+    user = db.query(User).filter(User.email == email).first()
+    return user.id if user else None
+
+def _participant(db: Session, session_id: int, user_id: int) -> Optional[int]:
+    session = chat_service.get_participant_session(db, session_id, user_id)
+    if session is None or not session.is_active:
+        return None
+    return chat_service.other_participant(session, user_id)
+
+def _store_message(
+    db: Session,
+    session_id: int,
+    sender_id: int,
+    content: str,
+    moderation: Dict[str, Any]
+) -> Optional[Tuple[Dict[str, Any], int]]:
+    session = chat_service.get_participant_session(db, session_id, sender_id)
+    if session is None or not session.is_active:
+        return None
+    message = chat_service.append_message(db, session, sender_id, content, moderation)
+    return chat_service.message_payload(message), chat_service.other_participant(session, sender_id)
+
+def _session_id(data: Dict[str, Any]) -> Optional[int]:
+    try:
+        return int(data.get("sessionId"))
+    except (TypeError, ValueError):
+        return None
+
+async def _join(connection: Connection, session_id: int, other_id: int):
+    """Subscribe this worker to a session's channel on behalf of one connection."""
+    if connection.closed or session_id in connection.sessions:
+        return
+    connection.sessions[session_id] = other_id
+    await chat_backplane.subscribe(session_channel(session_id))
+
+async def _leave(connection: Connection):
+    for session_id in list(connection.sessions):
+        await chat_backplane.unsubscribe(session_channel(session_id))
+    await chat_backplane.unsubscribe(user_channel(connection.user_id))
+
+def deliver_frame(frame: Dict[str, Any], user_ids: List[int]):
+    """Backplane handler: hand a published frame to this worker's sockets of user_ids."""
+    data = frame["data"]
+    if frame["type"] == "session_opened":
+        # Internal: connections opened before the session start listening to it
+        for user_id in user_ids:
+            for connection in connection_manager.connections_of(user_id):
+                _spawn(_join(connection, data["sessionId"], data["otherUserId"]))
+        return
+    for user_id in user_ids:
+        delivered = connection_manager.send_to_user(user_id, frame)
+        # Suggestions come from the worker holding the recipient's socket
+        if delivered and frame["type"] == "chat_message" and user_id != data["senderId"]:
+            _spawn(send_suggestions(data["sessionId"], user_id, data["message"]))
+
+async def handle_chat_message(connection: Connection, data: Dict[str, Any]):
+    session_id = _session_id(data)
+    content = str(data.get("message") or "").strip()
+    if session_id is None or not content:
+        connection_manager.send(connection, _frame("error", {"detail": "sessionId and message are required"}))
+        return
+    
+    moderation = await run_in_threadpool(_moderate, content)
+    stored = await in_db(_store_message, session_id, connection.user_id, content, moderation)
+    if stored is None:
+        connection_manager.send(connection, _frame("error", {"detail": "Not authorized to access this chat session"}))
+        return
+    payload, recipient_id = stored
+    await _join(connection, session_id, recipient_id)
+    channel = session_channel(session_id)
+    
+    if moderation.get("should_flag"):
+        # Flagged messages are kept for review but never reach the recipient
+        chat_backplane.publish(channel, _frame("moderation_warning", {
+            "sessionId": session_id,
+            "messageId": payload["id"],
+            "tempId": data.get("tempId"),
+            "categories": moderation.get("categories", {}),
+        }), [connection.user_id])
+        return
+    
+    # Every tab of the sender gets the stored message; tempId lets the sending one reconcile
+    chat_backplane.publish(channel, _frame("chat_message", dict(payload, tempId=data.get("tempId"))), [connection.user_id])
+    chat_backplane.publish(channel, _frame("chat_message", payload), [recipient_id])
+
+async def send_suggestions(session_id: int, recipient_id: int, content: str):
+    try:
+        history = await in_db(chat_service.recent_history, session_id, settings.CHAT_SUGGESTION_HISTORY)
+        suggestions = await OpenAIService.generate_chat_suggestions(history, content)
+        connection_manager.send_to_user(recipient_id, _frame("ai_suggestions", dict(suggestions, sessionId=session_id)))
+    except Exception:
+        logger.exception("Chat suggestions for session %s failed", session_id)
+
+async def handle_typing_indicator(connection: Connection, data: Dict[str, Any]):
+    session_id = _session_id(data)
+    recipient_id = connection.sessions.get(session_id)
+    if recipient_id is None and session_id is not None:
+        recipient_id = await in_db(_participant, session_id, connection.user_id)
+        if recipient_id is not None:
+            await _join(connection, session_id, recipient_id)
+    if recipient_id is None:
+        connection_manager.send(connection, _frame("error", {"detail": "Not authorized to access this chat session"}))
+        return
+    chat_backplane.publish(session_channel(session_id), _frame("typing_indicator", {
+        "sessionId": session_id,
+        "userId": connection.user_id,
+        "isTyping": bool(data.get("isTyping")),
+    }), [recipient_id])
+
+async def handle_pong(connection: Connection, data: Dict[str, Any]):
+    # Receiving the frame already refreshed the connection's idle timer
+    pass
+
+FRAME_HANDLERS = {
+    "chat_message": handle_chat_message,
+    "typing_indicator": handle_typing_indicator,
+    "pong": handle_pong,
+}
+
+@router.websocket("/v1/ws/chat/{user_id}")
+async def chat_gateway(websocket: WebSocket, user_id: int, token: Optional[str] = None):
+    """Chat gateway; clients authenticate with ?token= and exchange {"type", "data", "timestamp"} frames."""
+    if await in_db(_token_user_id, token) != user_id:
+        await websocket.close(code=status.WS_1008_POLICY_VIOLATION)
+        return
+    
+    connection = await connection_manager.connect(websocket, user_id)
+    try:
+        await chat_backplane.subscribe(user_channel(user_id))
+        for session_id, other_id in (await in_db(chat_service.active_sessions, user_id)).items():
+            await _join(connection, session_id, other_id)
+        while True:
+            text = await websocket.receive_text()
+            connection_manager.touch(connection)
+            try:
+                frame = json.loads(text)
+                handler = FRAME_HANDLERS.get(frame.get("type"))
+                data = frame.get("data") or {}
+            except (ValueError, AttributeError):
+                connection_manager.send(connection, _frame("error", {"detail": "Frames must be JSON objects"}))
+                continue
+            if handler is None:
+                connection_manager.send(connection, _frame("error", {"detail": f"Unknown frame type {frame.get('type')!r}"}))
+                continue
+            # Frames from one socket are handled in order, so a sender's messages stay ordered
+            await handler(connection, data)
+    except WebSocketDisconnect:
+        pass
+    finally:
+        connection_manager.disconnect(connection)
+        await _leave(connection)
+
+@router.get("/chat/gateway/stats")
+async def get_gateway_stats():
+    return dict(connection_manager.stats(), backplane=chat_backplane.stats())
+
+@router.post("/chat/sync", response_model=ChatSyncResponse)
+async def sync_chats(
+    request: ChatSyncRequest,
+    limit: int = Query(100, ge=1, le=500, description="Newest new messages returned per session"),
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
+    """Catch a reconnecting client up in one round trip on every session that changed."""
+    try:
+        sessions, removed = chat_service.sync(db, current_user.id, request.sessions, limit, request.watermarks)
+        result = []
+        for session, messages, gap in sessions:
+            read_seq, other_read_seq = chat_service.read_watermarks(session, current_user.id)
+            result.append(ChatSyncSession(
+                session_id=session.id,
+                other_user_id=chat_service.other_participant(session, current_user.id),
+                is_active=session.is_active,
+                ended_at=session.ended_at,
+                last_seq=session.last_seq,
+                read_seq=read_seq,
+                other_read_seq=other_read_seq,
+                unread_count=chat_service.unread_count(session, current_user.id),
+                messages=[ChatHistoryMessage.model_validate(message) for message in messages],
+                gap=gap
+            ))
+        return ChatSyncResponse(sessions=result, removed=removed)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+@router.get("/chat/{session_id}/history", response_model=ChatHistoryResponse)
 async def get_chat_history(
-    session_id: str, 
+    session_id: int,
+    before: Optional[int] = Query(None, ge=1, description="Only messages with a lower seq (scroll back)"),
+    after: Optional[int] = Query(None, ge=0, description="Only messages with a higher seq (catch up)"),
+    limit: int = Query(50, ge=1, le=200),
     current_user: User = Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
     try:
         # Verify user has access to this chat session
-        session = db.query(ChatSession).filter(ChatSession.id == session_id).first()
-        if not session or (session.user_id_1 != current_user.id and session.user_id_2 != current_user.id):
+        session = chat_service.get_participant_session(db, session_id, current_user.id)
+        if session is None:
             raise HTTPException(status_code=403, detail="Not authorized to access this chat session")
         
-        # Get chat messages
-        messages = db.query(ChatMessage).filter(
-            ChatMessage.session_id == session_id
-        ).order_by(ChatMessage.created_at.asc()).all()
-        
-        return {"messages": messages}
+        messages, has_more = chat_service.history_page(db, session_id, current_user.id, before, after, limit)
+        return ChatHistoryResponse(
+            messages=[ChatHistoryMessage.model_validate(message) for message in messages],
+            has_more=has_more
+        )
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
@@ -64,12 +300,19 @@ async def create_chat_session(
         db.commit()
         db.refresh(new_session)
         
+        # Sockets both users already have open start listening to the new session
+        for member_id, other_id in ((user_id, target_user_id), (target_user_id, user_id)):
+            chat_backplane.publish(user_channel(member_id), _frame("session_opened", {
+                "sessionId": new_session.id,
+                "otherUserId": other_id,
+            }), [member_id])
+        
         return {"session_id": new_session.id, "is_new": True}
     except Exception as e:
         db.rollback()
         raise HTTPException(status_code=500, detail=str(e))
 
-@router.get("/chat/user/{user_id}/sessions")
+@router.get("/chat/user/{user_id}/sessions", response_model=ChatInboxResponse)
 async def get_chat_sessions(
     user_id: int, 
     current_user: User = Depends(get_current_user),
@@ -79,53 +322,58 @@ async def get_chat_sessions(
         raise HTTPException(status_code=403, detail="Not authorized to access these chat sessions")
     
     try:
-        # Get all chat sessions for the user
-        sessions = db.query(ChatSession).filter(
-            (ChatSession.user_id_1 == user_id) | (ChatSession.user_id_2 == user_id),
-            ChatSession.is_active == True
-        ).all()
-        
-        # Format response with user details
-        result = []
-        for session in sessions:
-            other_user_id = session.user_id_2 if session.user_id_1 == user_id else session.user_id_1
-            other_user = db.query(User).filter(User.id == other_user_id).first()
-            
-            # Get last message
-            last_message = db.query(ChatMessage).filter(
-                ChatMessage.session_id == session.id
-            ).order_by(ChatMessage.created_at.desc()).first()
-            
-            result.append({
-                "session_id": session.id,
-                "other_user_id": other_user_id,
-                "other_user_name": other_user.full_name if other_user else "Unknown",
-                "other_user_profile_picture": other_user.profile_picture if other_user else None,
-                "last_message": last_message.message_content if last_message else None,
-                "last_message_time": last_message.created_at if last_message else session.created_at,
-                "unread_count": 0  # You would need to implement this
-            })
+        # Sessions, the other user and the last message come from one query over the inbox fields
+        result = [
+            ChatInboxEntry(
+                session_id=session.id,
+                other_user_id=chat_service.other_participant(session, user_id),
+                other_user_name=other_user_name or "Unknown",
+                other_user_profile_picture=other_user_profile_picture,
+                last_message_id=session.last_message_id,
+                last_message=session.last_message_preview,
+                last_message_time=session.last_activity_at,
+                unread_count=chat_service.unread_count(session, user_id),
+                last_seq=session.last_seq or 0,
+                read_seq=chat_service.read_watermarks(session, user_id)[0],
+                other_read_seq=chat_service.read_watermarks(session, user_id)[1]
+            )
+            for session, other_user_name, other_user_profile_picture in chat_service.inbox(db, user_id)
+        ]
         
-        return {"sessions": result}
+        return ChatInboxResponse(sessions=result)
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 @router.post("/chat/{session_id}/read")
 async def mark_as_read(
-    session_id: str, 
-    message_ids: List[str],
+    session_id: int, 
+    message_ids: List[int] = Body(default=[], embed=True),
+    seq: Optional[int] = Query(None, ge=1, description="Mark everything up to this seq as read"),
     current_user: User = Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
     try:
         # Verify user has access to this chat session
-        session = db.query(ChatSession).filter(ChatSession.id == session_id).first()
-        if not session or (session.user_id_1 != current_user.id and session.user_id_2 != current_user.id):
+        session = chat_service.get_participant_session(db, session_id, current_user.id)
+        if session is None:
             raise HTTPException(status_code=403, detail="Not authorized to access this chat session")
         
-        # In a real implementation, you would update the read status of messages
-        # For now, we'll just return success
-        return {"message": "Messages marked as read"}
+        if seq is None and message_ids:
+            # Reading a message reads everything before it
+            seq = db.query(func.max(ChatMessage.seq)).filter(
+                ChatMessage.session_id == session_id,
+                ChatMessage.id.in_(message_ids)
+            ).scalar()
+        if seq and chat_service.mark_read(db, session, current_user.id, seq):
+            chat_backplane.publish(session_channel(session_id), _frame("read_receipt", {
+                "sessionId": session_id,
+                "userId": current_user.id,
+                "readSeq": seq,
+            }), [chat_service.other_participant(session, current_user.id)])
+        
+        return {"message": "Messages marked as read", "read_seq": chat_service.read_watermarks(session, current_user.id)[0]}
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
@@ -142,8 +390,12 @@ async def send_typing_indicator(
         if not session or (session.user_id_1 != current_user.id and session.user_id_2 != current_user.id):
             raise HTTPException(status_code=403, detail="Not authorized to access this chat session")
         
-        # In a real implementation, you would broadcast the typing indicator via WebSocket
-        # For now, we'll just return success
+        recipient_id = chat_service.other_participant(session, current_user.id)
+        chat_backplane.publish(session_channel(session.id), _frame("typing_indicator", {
+            "sessionId": session.id,
+            "userId": current_user.id,
+            "isTyping": is_typing,
+        }), [recipient_id])
         return {"message": "Typing indicator sent"}
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
@@ -181,9 +433,8 @@ async def clear_chat_history(
         if not session or (session.user_id_1 != current_user.id and session.user_id_2 != current_user.id):
             raise HTTPException(status_code=403, detail="Not authorized to clear this chat history")
         
-        # Delete all messages in the session
-        db.query(ChatMessage).filter(ChatMessage.session_id == session_id).delete()
-        db.commit()
+        # Delete all messages in the session and empty its inbox entry
+        chat_service.clear_history(db, session)
         
         return {"message": "Chat history cleared"}
     except Exception as e:
@@ -1,79 +1,450 @@
 # backend/app/api/matching.py
-from fastapi import APIRouter, Depends, HTTPException, status
+import asyncio
+import os
+import time
+import numpy as np
+from datetime import datetime, timedelta, timezone
+from fastapi import APIRouter, Depends, HTTPException, Query, Response, status
+from sqlalchemy import func
 from sqlalchemy.orm import Session
-from typing import List, Optional, Dict, Any
-from app.db.session import get_db
+from typing import List, Optional, Dict, Any, Set, Tuple
+from app.db.session import get_db, SessionLocal
 from app.models.user import User
 from app.models.analysis import VoiceAnalysis, TextAnalysis, CompatibilityMatch
-from app.services import openai_service
+from app.models.interest import Interest, UserInterest
+from app.models.match_deck import MatchDeck, MatchDeckCandidate
+from app.models.swipe import Swipe, MutualMatch
+from app.services import openai_service, feature_snapshot, matching_engine, match_ranking, match_sync, sql_scoring, compatibility_analysis
+from app.services.ann_index import trait_array, trait_index
+from app.services.deck_rescorer import deck_rescorer
+from app.services.geo import geo_index, haversine_km
+from app.services.interest_index import interest_index, normalize_interest
+from app.services.like_index import like_index
+from app.services.match_cache import match_cache, profile_versions
+from app.services.pair_cache import pair_cache
+from app.services.scoring_pipeline import MatchContext, analysis_pipeline, numpy_pipeline, pipeline_metrics, sql_pipeline
+from app.services.seen_filter import seen_filter
+from app.services.swipe_writer import SwipeEvent, swipe_writer
+from app.services.trait_store import trait_store
+from app.core.config import settings
 
 router = APIRouter()
 
 @router.get("/matches/{user_id}", response_model=List[dict])
 async def get_matches(
     user_id: int, 
-    max_distance: Optional[int] = None,
+    response: Response,
+    max_distance: Optional[float] = Query(None, gt=0, description="Maximum distance in km"),
     min_age: Optional[int] = None,
     max_age: Optional[int] = None,
-    interests: Optional[List[str]] = None,
+    interests: Optional[List[str]] = Query(None, description="Only users listing all of these interests"),
+    limit: int = Query(20, ge=1, le=100),
+    cursor: Optional[str] = None,
     db: Session = Depends(get_db)
 ):
     """
-    Get potential matches for a user based on compatibility analysis with filters
+    Get potential matches for a user based on compatibility analysis with filters.
+    
+    Pass the X-Next-Cursor response header back as `cursor` to fetch the next page.
     """
     try:
-        # Get current user
-        current_user = db.query(User).filter(User.id == user_id).first()
-        if not current_user:
-            raise HTTPException(status_code=404, detail="User not found")
-        
-        # Build query with filters
-        query = db.query(User).filter(User.id != user_id, User.is_active == True)
-        
-        # Apply filters
-        if min_age is not None:
-            query = query.filter(User.age >= min_age)
-        if max_age is not None:
-            query = query.filter(User.age <= max_age)
-        if interests:
-            # This would require a more sophisticated approach in a real implementation
-            pass
-        
-        all_users = query.all()
-        matches = []
-        
-        for user in all_users:
-            # Calculate compatibility based on available data
-            compatibility_score = calculate_compatibility(current_user, user, db)
-            
-            # Get user's latest text analysis for interests (if available)
-            user_interests = get_user_interests(user.id, db)
-            
-            matches.append({
-                "user_id": user.id,
-                "name": user.full_name,
-                "age": user.age,
-                "gender": user.gender,
-                "location": user.location,
-                "bio": user.bio,
-                "profile_picture": user.profile_picture,
-                "compatibility_score": compatibility_score,
-                "interests": user_interests[:3] if user_interests else []
-            })
-        
-        # Sort by compatibility score (highest first)
-        matches.sort(key=lambda x: x["compatibility_score"], reverse=True)
+        matches, next_cursor = await find_matches(
+            user_id, db,
+            min_age=min_age,
+            max_age=max_age,
+            max_distance=max_distance,
+            interests=interests,
+            limit=limit,
+            cursor=cursor
+        )
+        if next_cursor:
+            response.headers["X-Next-Cursor"] = next_cursor
+        return matches
         
-        return matches[:20]  # Return top 20 matches
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+@router.get("/matches/{user_id}/potential")
+async def get_potential_matches(
+    user_id: int,
+    limit: int = Query(10, ge=1, le=100),
+    cursor: Optional[str] = None,
+    db: Session = Depends(get_db)
+):
+    try:
+        matches, next_cursor = await find_matches(user_id, db, limit=limit, cursor=cursor)
+        profiles = [
+            {
+                "id": match["user_id"],
+                "full_name": match["name"],
+                "age": match["age"],
+                "location": match["location"],
+                "bio": match["bio"],
+                "profile_picture": match["profile_picture"],
+                "interests": match["interests"],
+                "compatibility_score": match["compatibility_score"],
+                "analysis_summary": match["analysis_summary"],
+                "trait_scores": trait_store.get(match["user_id"]) or {}
+            }
+            for match in matches
+        ]
+        return {"profiles": profiles, "next_cursor": next_cursor}
         
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
-def calculate_compatibility(user1: User, user2: User, db: Session) -> float:
+async def find_matches(
+    user_id: int,
+    db: Session,
+    min_age: Optional[int] = None,
+    max_age: Optional[int] = None,
+    max_distance: Optional[float] = None,
+    interests: Optional[List[str]] = None,
+    limit: int = 20,
+    cursor: Optional[str] = None
+):
+    """Rank candidates for user_id and return (page of match dicts, next cursor), paging through the cached deck."""
+    try:
+        after = match_ranking.decode_cursor(cursor) if cursor else None
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    
+    # Get current user
+    current_user = db.query(User).filter(User.id == user_id).first()
+    if not current_user:
+        raise HTTPException(status_code=404, detail="User not found")
+    
+    if max_distance is not None and current_user.latitude is None:
+        raise HTTPException(status_code=400, detail="Set a recognised location to filter by distance")
+    
+    filters = {"min_age": min_age, "max_age": max_age, "max_distance": max_distance, "interests": interests}
+    cache_key = match_cache.key(user_id, **filters)
+    deck = match_cache.get(cache_key)
+    if deck is None:
+        epoch = profile_versions.epoch
+        deck = None
+        if not any(filters.values()):
+            deck = load_precomputed_deck(current_user, db)
+        if deck is None:
+            deck = await rank_candidates(current_user, db, filters, match_cache.depth)
+            # Precomputed scores may predate changes to users outside the deck's candidates
+            pair_cache.put_many(user_id, deck)
+        if after is None:
+            deck = await analyze_deck(current_user, db, deck)
+        match_cache.put(cache_key, deck, epoch, analyzed=after is None)
+    elif after is None and not match_cache.is_analyzed(cache_key):
+        # Re-scored in the background, where no LLM calls are made
+        epoch = match_cache.epoch_of(cache_key)
+        deck = await analyze_deck(current_user, db, deck)
+        if epoch is not None:
+            match_cache.put(cache_key, deck, epoch, analyzed=True)
+    
+    # Profiles swiped since the deck was ranked drop out here
+    ensure_seen_filter(db)
+    seen = seen_filter.seen_mask(user_id, np.array([candidate_id for _, candidate_id in deck], dtype=np.int64))
+    
+    # Keep only the top `limit` (plus one to know whether another page exists)
+    ranked = [
+        candidate for candidate, is_seen in zip(deck, seen.tolist())
+        if not is_seen and (
+            after is None or candidate[0] < after[0] or (candidate[0] == after[0] and candidate[1] > after[1])
+        )
+    ][:limit + 1]
+    if len(ranked) <= limit and len(deck) >= match_cache.depth:
+        # The page runs past the cached deck: score the rest of the population live
+        ranked = await rank_candidates(current_user, db, filters, limit + 1, after)
+        pair_cache.put_many(user_id, ranked)
+        if after is None:
+            ranked = await analyze_deck(current_user, db, ranked)
+    
+    next_cursor = None
+    if len(ranked) > limit:
+        ranked = ranked[:limit]
+        next_cursor = match_ranking.encode_cursor(*ranked[-1])
+    
+    return build_match_dicts(current_user, ranked, db), next_cursor
+
+async def rank_candidates(
+    current_user: User,
+    db: Session,
+    filters: Dict[str, Any],
+    k: int,
+    after: Optional[match_ranking.RankedCandidate] = None
+) -> List[match_ranking.RankedCandidate]:
+    """Best k (score, user_id) pairs for current_user after `after`, scored by the configured MATCHING_ENGINE pipeline."""
+    user_id = current_user.id
+    
+    # Build query with filters, selecting only the columns scoring needs
+    query = db.query(User.id, User.age, User.gender, User.location)\
+        .filter(User.id != user_id, User.is_active == True)
+    
+    # Apply filters
+    if filters.get("min_age") is not None:
+        query = query.filter(User.age >= filters["min_age"])
+    if filters.get("max_age") is not None:
+        query = query.filter(User.age <= filters["max_age"])
+    if filters.get("max_distance") is not None:
+        # Only the grid buckets around the user are scanned, then cut by exact distance
+        ensure_geo_index(db)
+        nearby_ids = geo_index.within(current_user.latitude, current_user.longitude, filters["max_distance"])
+        query = query.filter(User.id.in_(nearby_ids.tolist()))
+    if filters.get("interests"):
+        # Intersect the interest bitmaps before any candidate is loaded or scored
+        ensure_interest_index(db)
+        interested_ids = interest_index.users_with_all(filters["interests"])
+        if not len(interested_ids):
+            return []
+        query = query.filter(User.id.in_(interested_ids.tolist()))
+    
+    # Candidate generation: on large populations only the nearest trait vectors
+    # are scored; demographic scoring below re-ranks them
+    ensure_trait_store(db)
+    if use_trait_index(user_id):
+        eligible_ids = None
+        if any(filters.values()):
+            # Search among the users that pass the filters, not the nearest of everyone
+            eligible_ids = np.fromiter((row_id for row_id, in query.with_entities(User.id)), dtype=np.int64)
+        if eligible_ids is None or len(eligible_ids) > settings.MATCHING_ANN_CANDIDATES:
+            candidate_ids = trait_index.search(
+                trait_array(trait_store.get(user_id)),
+                settings.MATCHING_ANN_CANDIDATES,
+                exclude=user_id,
+                allowed=eligible_ids
+            )
+            query = query.filter(User.id.in_(candidate_ids.tolist()))
+    
+    ensure_seen_filter(db)
+    ensure_interest_index(db)
+    # The SQL engine ranks inside the database so only the top k rows cross the wire
+    if settings.MATCHING_ENGINE == "sql" and sql_scoring.supports(trait_store.get(user_id)):
+        pipeline = sql_pipeline
+    else:
+        pipeline = numpy_pipeline
+    return await pipeline.run(MatchContext(current_user, db, query, k, after))
+
+async def analyze_deck(
+    current_user: User,
+    db: Session,
+    deck: List[match_ranking.RankedCandidate]
+) -> List[match_ranking.RankedCandidate]:
+    """Run the LLM compatibility stage on the top of a deck about to be served."""
+    return await analysis_pipeline.run(MatchContext(current_user, db, None, len(deck)), deck)
+
+def rank_population(
+    current_user: User,
+    population: matching_engine.CandidateColumns,
+    k: int
+) -> List[match_ranking.RankedCandidate]:
+    """Unfiltered ranking of current_user against preloaded columns of the active population, for batch jobs."""
+    user_id = current_user.id
+    positions = np.flatnonzero(population.user_ids != user_id)
+    if use_trait_index(user_id):
+        candidate_ids = trait_index.search(
+            trait_array(trait_store.get(user_id)),
+            settings.MATCHING_ANN_CANDIDATES,
+            exclude=user_id
+        )
+        positions = positions[np.isin(population.user_ids[positions], candidate_ids)]
+    return score_columns(current_user, population.take(positions), k)
+
+def score_columns(
+    current_user: User,
+    columns: matching_engine.CandidateColumns,
+    k: int,
+    after: Optional[match_ranking.RankedCandidate] = None
+) -> List[match_ranking.RankedCandidate]:
+    scores = matching_engine.score_candidates(
+        current_user,
+        trait_store.get(current_user.id),
+        columns,
+        has_analysis=current_user.id in trait_store,
+        shared_interests=interest_index.shared_counts(current_user.id, columns.user_ids)
+    )
+    return match_ranking.select_top_k(columns.user_ids, scores, k, after)
+
+def rescore_deck(cache_key):
+    """Re-rank one invalidated deck in the background; unfiltered decks are also stored as precomputed decks."""
+    user_id, min_age, max_age, max_distance, interests = cache_key
+    db = SessionLocal()
+    try:
+        current_user = db.query(User).filter(User.id == user_id, User.is_active == True).first()
+        if current_user is None or (max_distance is not None and current_user.latitude is None):
+            return
+        filters = {"min_age": min_age, "max_age": max_age, "max_distance": max_distance, "interests": list(interests)}
+        epoch = profile_versions.epoch
+        deck = asyncio.run(rank_candidates(current_user, db, filters, match_cache.depth))
+        if not match_cache.put(cache_key, deck, epoch):
+            return
+        pair_cache.put_many(user_id, deck)
+        if not any(filters.values()):
+            db.merge(MatchDeck(
+                user_id=user_id,
+                candidates=[[score, candidate_id] for score, candidate_id in deck],
+                computed_at=func.now()
+            ))
+            db.flush()
+            store_deck_candidates(db, {user_id: [candidate_id for _, candidate_id in deck]})
+            db.commit()
+    finally:
+        db.close()
+
+def decks_admitting(user_id: int) -> List[Tuple]:
+    """Keys of cached decks user_id would now enter: the filters admit them and they beat the deck's last score."""
+    admission = match_cache.admission_scores()
+    if not admission:
+        return []
+    db = SessionLocal()
+    try:
+        rows = db.query(User.id, User.age, User.gender, User.location, User.latitude, User.longitude)\
+            .filter(User.id.in_({key[0] for key, _ in admission} | {user_id}), User.is_active == True)\
+            .order_by(User.id)\
+            .all()
+    finally:
+        db.close()
+    newcomer = next((row for row in rows if row.id == user_id), None)
+    if newcomer is None:
+        return []
+    owners = [row for row in rows if row.id != user_id]
+    columns = matching_engine.build_columns_from_store(owners, trait_store)
+    scores = matching_engine.score_candidates(
+        newcomer,
+        trait_store.get(user_id),
+        columns,
+        has_analysis=user_id in trait_store,
+        shared_interests=interest_index.shared_counts(user_id, columns.user_ids)
+    )
+    owner_scores = {row.id: (score, row) for row, score in zip(owners, scores.tolist())}
+    interests = {normalize_interest(name) for name in interest_index.get(user_id)}
+    
+    keys = []
+    for key, threshold in admission:
+        owner_id, min_age, max_age, max_distance, wanted_interests = key
+        if owner_id not in owner_scores or owner_scores[owner_id][0] < threshold:
+            continue
+        owner = owner_scores[owner_id][1]
+        if (min_age is not None or max_age is not None) and newcomer.age is None:
+            continue
+        if (min_age is not None and newcomer.age < min_age) or (max_age is not None and newcomer.age > max_age):
+            continue
+        if not set(wanted_interests) <= interests:
+            continue
+        if max_distance is not None:
+            if None in (owner.latitude, newcomer.latitude):
+                continue
+            distance = haversine_km(owner.latitude, owner.longitude, np.array([newcomer.latitude]), np.array([newcomer.longitude]))
+            if distance[0] > max_distance:
+                continue
+        if seen_filter.seen_mask(owner_id, np.array([user_id], dtype=np.int64))[0]:
+            continue
+        keys.append(key)
+    return keys
+
+def store_deck_candidates(db: Session, decks: Dict[int, List[int]]):
+    """Replace the match_deck_candidates rows of the given owners' decks (owner id -> candidate ids)."""
+    db.query(MatchDeckCandidate)\
+        .filter(MatchDeckCandidate.owner_id.in_(list(decks)))\
+        .delete(synchronize_session=False)
+    db.bulk_insert_mappings(MatchDeckCandidate, [
+        {"candidate_id": candidate_id, "owner_id": owner_id}
+        for owner_id, candidate_ids in decks.items()
+        for candidate_id in set(candidate_ids)
+    ])
+
+def load_precomputed_deck(current_user: User, db: Session) -> Optional[List[match_ranking.RankedCandidate]]:
+    """The user's fresh precomputed deck with changed candidates re-scored, or None when it is missing or stale."""
+    cutoff = datetime.now(timezone.utc) - timedelta(seconds=settings.MATCH_DECK_MAX_AGE_SECONDS)
+    deck = db.query(MatchDeck)\
+        .filter(MatchDeck.user_id == current_user.id, MatchDeck.computed_at >= cutoff)\
+        .first()
+    if deck is None:
+        return None
+    candidate_ids = [candidate_id for _, candidate_id in deck.candidates]
+    changed = changed_since(db, deck.computed_at, [current_user.id] + candidate_ids)
+    if current_user.id in changed:
+        return None
+    
+    active = db.query(User.id, User.age, User.gender, User.location)\
+        .filter(User.id.in_(candidate_ids), User.is_active == True)\
+        .all()
+    active_ids = {row.id for row in active}
+    ranked = [
+        (score, candidate_id) for score, candidate_id in deck.candidates
+        if candidate_id in active_ids and candidate_id not in changed
+    ]
+    rescore = [row for row in active if row.id in changed]
+    if rescore:
+        ensure_trait_store(db)
+        ensure_interest_index(db)
+        columns = matching_engine.build_columns_from_store(rescore, trait_store)
+        ranked = sorted(
+            ranked + score_columns(current_user, columns, len(rescore)),
+            key=lambda candidate: (-candidate[0], candidate[1])
+        )
+    return ranked
+
+def changed_since(db: Session, since: datetime, user_ids: Optional[List[int]] = None) -> Set[int]:
+    """Users (of user_ids, or all) whose profile or trait analysis changed after `since`."""
+    profiles = db.query(User.id).filter(User.updated_at > since)
+    analyses = db.query(TextAnalysis.user_id).filter(TextAnalysis.created_at > since)
+    if user_ids is not None:
+        profiles = profiles.filter(User.id.in_(user_ids))
+        analyses = analyses.filter(TextAnalysis.user_id.in_(user_ids))
+    return {user_id for user_id, in profiles.union(analyses)}
+
+def build_match_dicts(current_user: User, ranked, db: Session) -> List[Dict[str, Any]]:
+    page_ids = [candidate_id for _, candidate_id in ranked]
+    users_by_id = {
+        user.id: user
+        for user in db.query(User).filter(User.id.in_(page_ids), User.is_active == True).all()
+    }
+    analyses = get_latest_text_analyses(page_ids, db)
+    ensure_interest_index(db)
+    shared_counts = interest_index.shared_counts(current_user.id, np.array(page_ids, dtype=np.int64))
+    # LLM analyses exist for the top of the deck; stale ones are not shown
+    compatibility_analyses = compatibility_analysis.fresh_analyses(db, current_user, list(users_by_id.values()))
+    
+    matches = []
+    for (compatibility_score, candidate_id), shared_count in zip(ranked, shared_counts.tolist()):
+        user = users_by_id.get(candidate_id)
+        if not user:
+            continue
+        
+        # Get user's latest text analysis for interests (if available)
+        user_interests = get_user_interests(user.id, db, analyses)
+        
+        compatibility_match = compatibility_analyses.get(user.id)
+        matches.append({
+            "user_id": user.id,
+            "name": user.full_name,
+            "age": user.age,
+            "gender": user.gender,
+            "location": user.location,
+            "bio": user.bio,
+            "profile_picture": user.profile_picture,
+            "compatibility_score": compatibility_score,
+            "interests": user_interests[:3] if user_interests else [],
+            "shared_interests": shared_count,
+            "analysis_summary": compatibility_match.analysis_summary if compatibility_match else None,
+            "matching_factors": compatibility_match.matching_factors if compatibility_match else None
+        })
+    return matches
+
+def calculate_compatibility(
+    user1: User,
+    user2: User,
+    db: Session,
+    analyses: Optional[Dict[int, TextAnalysis]] = None,
+    interests: Optional[Dict[int, List[str]]] = None
+) -> float:
     score = 0.0
     
     score += calculate_demographic_compatibility(user1, user2)
-    score += calculate_personality_compatibility(user1.id, user2.id, db)
+    score += calculate_personality_compatibility(user1.id, user2.id, db, analyses)
+    score += calculate_interest_compatibility(user1.id, user2.id, db, interests)
     
     return min(score, 1.0)
 
@@ -95,11 +466,18 @@ def calculate_demographic_compatibility(user1: User, user2: User) -> float:
     
     return score
 
-def calculate_personality_compatibility(user_id1: int, user_id2: int, db: Session) -> float:
+def calculate_personality_compatibility(
+    user_id1: int,
+    user_id2: int,
+    db: Session,
+    analyses: Optional[Dict[int, TextAnalysis]] = None
+) -> float:
     score = 0.0
     
-    text_analysis1 = get_latest_text_analysis(user_id1, db)
-    text_analysis2 = get_latest_text_analysis(user_id2, db)
+    if analyses is None:
+        analyses = get_latest_text_analyses([user_id1, user_id2], db)
+    text_analysis1 = analyses.get(user_id1)
+    text_analysis2 = analyses.get(user_id2)
     
     if text_analysis1 and text_analysis2:
         traits1 = text_analysis1.trait_scores or {}
@@ -112,14 +490,179 @@ def calculate_personality_compatibility(user_id1: int, user_id2: int, db: Sessio
     
     return min(score, 0.5)
 
+def calculate_interest_compatibility(
+    user_id1: int,
+    user_id2: int,
+    db: Session,
+    interests: Optional[Dict[int, List[str]]] = None
+) -> float:
+    if interests is None:
+        interests = load_user_interests(db, [user_id1, user_id2])
+    shared = set(interests.get(user_id1, [])) & set(interests.get(user_id2, []))
+    return min(len(shared) * settings.MATCHING_INTEREST_BONUS, settings.MATCHING_INTEREST_BONUS_MAX)
+
 def get_latest_text_analysis(user_id: int, db: Session) -> Optional[TextAnalysis]:
     return db.query(TextAnalysis)\
         .filter(TextAnalysis.user_id == user_id)\
-        .order_by(TextAnalysis.created_at.desc())\
+        .order_by(TextAnalysis.created_at.desc(), TextAnalysis.id.desc())\
         .first()
 
-def get_user_interests(user_id: int, db: Session) -> List[str]:
-    text_analysis = get_latest_text_analysis(user_id, db)
+def get_latest_text_analyses(user_ids, db: Session) -> Dict[int, TextAnalysis]:
+    """Latest TextAnalysis of each of user_ids (a list or a select of ids), in one window-function query."""
+    if isinstance(user_ids, (list, tuple, set)):
+        if not user_ids:
+            return {}
+        user_ids = list(user_ids)
+    
+    ranked = db.query(
+        TextAnalysis.id.label("id"),
+        func.row_number().over(
+            partition_by=TextAnalysis.user_id,
+            order_by=(TextAnalysis.created_at.desc(), TextAnalysis.id.desc())
+        ).label("rank")
+    ).filter(TextAnalysis.user_id.in_(user_ids)).subquery()
+    
+    latest = db.query(TextAnalysis)\
+        .join(ranked, TextAnalysis.id == ranked.c.id)\
+        .filter(ranked.c.rank == 1)\
+        .all()
+    return {text_analysis.user_id: text_analysis for text_analysis in latest}
+
+def warm_trait_store(db: Session):
+    """Fill the trait store from the feature snapshot or a saved snapshot when there is one, else from the analyses."""
+    snapshot_path = settings.TRAIT_STORE_SNAPSHOT_PATH
+    features = feature_snapshot.open_current(settings.FEATURE_SNAPSHOT_DIR)
+    if features is not None:
+        changes = analyses_since(db, features.created_at)
+        match_sync.replace_traits(
+            lambda: trait_store.attach(features, changes), features, [user_id for user_id, _ in changes]
+        )
+    elif snapshot_path and os.path.exists(snapshot_path):
+        match_sync.replace_traits(lambda: trait_store.load(analyses_since(db, trait_store.restore(snapshot_path))))
+    else:
+        match_sync.replace_traits(lambda: trait_store.load(analyses_since(db, None)))
+    trait_store.is_warm = True
+
+def reload_trait_store() -> bool:
+    """Re-map the feature snapshot once CURRENT has moved past the mapped version; returns whether it did."""
+    features = feature_snapshot.open_current(settings.FEATURE_SNAPSHOT_DIR)
+    if features is None or features.version == trait_store.snapshot_version:
+        return False
+    db = SessionLocal()
+    try:
+        read_at = time.time()
+        changes = analyses_since(db, features.created_at)
+        match_sync.replace_traits(
+            lambda: trait_store.attach(features, changes), features, [user_id for user_id, _ in changes]
+        )
+        # Analyses written while the first read ran, applied to the old matrix meanwhile
+        match_sync.load_traits(analyses_since(db, read_at - 1))
+    finally:
+        db.close()
+    return True
+
+def analyses_since(db: Session, taken_at: Optional[float]) -> List[Tuple[int, Optional[Dict[str, float]]]]:
+    """(user_id, trait_scores) of the latest analysis of users analysed at or after taken_at, or of everyone."""
+    if taken_at is not None:
+        changed_users = db.query(TextAnalysis.user_id)\
+            .filter(TextAnalysis.created_at >= datetime.fromtimestamp(taken_at, tz=timezone.utc))\
+            .distinct()
+    else:
+        changed_users = db.query(User.id)
+    return [
+        (changed_user_id, text_analysis.trait_scores)
+        for changed_user_id, text_analysis in get_latest_text_analyses(changed_users, db).items()
+    ]
+
+def ensure_trait_store(db: Session):
+    if not trait_store.is_warm:
+        warm_trait_store(db)
+
+def warm_geo_index(db: Session):
+    """From the feature snapshot and the users changed since it when there is one, else from the users table."""
+    features = feature_snapshot.open_current(settings.FEATURE_SNAPSHOT_DIR)
+    located_users = db.query(User.id, User.latitude, User.longitude, User.is_active)
+    if features is not None and features.latitudes is not None:
+        located = features.is_active & ~np.isnan(features.latitudes)
+        for located_user_id, latitude, longitude in zip(
+            features.user_ids[located].tolist(),
+            features.latitudes[located].tolist(),
+            features.longitudes[located].tolist()
+        ):
+            geo_index.upsert(located_user_id, latitude, longitude)
+        located_users = located_users.filter(
+            User.updated_at >= datetime.fromtimestamp(features.created_at, tz=timezone.utc)
+        )
+    else:
+        located_users = located_users\
+            .filter(User.is_active == True, User.latitude.isnot(None), User.longitude.isnot(None))
+    for located_user_id, latitude, longitude, is_active in located_users.yield_per(10000):
+        if is_active and latitude is not None and longitude is not None:
+            geo_index.upsert(located_user_id, latitude, longitude)
+        else:
+            geo_index.remove(located_user_id)
+    geo_index.is_warm = True
+
+def ensure_geo_index(db: Session):
+    if not geo_index.is_warm:
+        warm_geo_index(db)
+
+def warm_interest_index(db: Session):
+    """From the feature snapshot and the users changed since it when there is one, else from user_interests."""
+    features = feature_snapshot.open_current(settings.FEATURE_SNAPSHOT_DIR)
+    user_interests = features.user_interests() if features is not None else None
+    if user_interests is None:
+        user_interests = load_user_interests(db)
+    else:
+        # Interest edits bump updated_at
+        changed_users = db.query(User.id)\
+            .filter(User.updated_at >= datetime.fromtimestamp(features.created_at, tz=timezone.utc))
+        changed = load_user_interests(db, changed_users)
+        for changed_user_id, in changed_users:
+            if changed_user_id in changed:
+                user_interests[changed_user_id] = changed[changed_user_id]
+            else:
+                user_interests.pop(changed_user_id, None)
+    interest_index.load(user_interests)
+    interest_index.is_warm = True
+
+def load_user_interests(db: Session, user_ids=None) -> Dict[int, List[str]]:
+    """Interest names of user_ids (a list or a select of ids), or of every user."""
+    user_interests: Dict[int, List[str]] = {}
+    rows = db.query(UserInterest.user_id, Interest.name)\
+        .join(Interest, Interest.id == UserInterest.interest_id)\
+        .order_by(UserInterest.user_id, Interest.name)
+    if user_ids is not None:
+        rows = rows.filter(UserInterest.user_id.in_(user_ids))
+    for interested_user_id, name in rows.yield_per(10000):
+        user_interests.setdefault(interested_user_id, []).append(name)
+    return user_interests
+
+def ensure_interest_index(db: Session):
+    if not interest_index.is_warm:
+        warm_interest_index(db)
+
+def use_trait_index(user_id: int) -> bool:
+    """Approximate search only pays off on large populations and needs the user's traits."""
+    return (
+        settings.MATCHING_ANN_ENABLED
+        and len(trait_index) >= settings.MATCHING_ANN_MIN_POPULATION
+        and user_id in trait_store
+    )
+
+def get_user_interests(
+    user_id: int,
+    db: Session,
+    analyses: Optional[Dict[int, TextAnalysis]] = None
+) -> List[str]:
+    """Stored profile interests, falling back to the user's strongest traits."""
+    ensure_interest_index(db)
+    stored_interests = interest_index.get(user_id)
+    if stored_interests:
+        return stored_interests
+    if analyses is None:
+        analyses = get_latest_text_analyses([user_id], db)
+    text_analysis = analyses.get(user_id)
     if text_analysis and text_analysis.trait_scores:
         traits = text_analysis.trait_scores
         sorted_traits = sorted(traits.items(), key=lambda x: x[1], reverse=True)
@@ -128,61 +671,160 @@ def get_user_interests(user_id: int, db: Session) -> List[str]:
 
 @router.post("/matches/{user_id}/like/{target_user_id}")
 async def like_user(user_id: int, target_user_id: int, db: Session = Depends(get_db)):
+    """Record a like; it is acknowledged once buffered and persisted by swipe_writer."""
     try:
-        user = db.query(User).filter(User.id == user_id).first()
-        target_user = db.query(User).filter(User.id == target_user_id).first()
+        check_swipe_users(user_id, target_user_id, db)
         
-        if not user or not target_user:
-            raise HTTPException(status_code=404, detail="User not found")
+        is_match = likes_user(target_user_id, user_id, db)
+        # The pair was usually scored moments ago when the match deck was built
+        compatibility_score = pair_cache.get(user_id, target_user_id)
+        if is_match and compatibility_score is None:
+            users = {
+                user.id: user
+                for user in db.query(User).filter(User.id.in_([user_id, target_user_id])).all()
+            }
+            analyses = get_latest_text_analyses([user_id, target_user_id], db)
+            compatibility_score = calculate_compatibility(users[user_id], users[target_user_id], db, analyses)
+            pair_cache.put(user_id, target_user_id, compatibility_score)
         
-        compatibility_score = calculate_compatibility(user, target_user, db)
-        
-        match_record = CompatibilityMatch(
-            user_id_1=user_id,
-            user_id_2=target_user_id,
-            compatibility_score=compatibility_score,
-            analysis_summary=f"Match between user {user_id} and {target_user_id}",
-            matching_factors={"score": compatibility_score}
-        )
-        
-        db.add(match_record)
-        db.commit()
+        record_swipe(user_id, target_user_id, "like", db)
+        swipe_writer.submit(SwipeEvent(
+            user_id, target_user_id, "like",
+            match_score=compatibility_score if is_match else None
+        ))
         
         return {
             "message": f"User {user_id} liked user {target_user_id}",
-            "match": False,
+            "match": is_match,
             "compatibility_score": compatibility_score
         }
         
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+@router.post("/matches/{user_id}/dislike/{target_user_id}")
+async def dislike_user(user_id: int, target_user_id: int, db: Session = Depends(get_db)):
+    try:
+        check_swipe_users(user_id, target_user_id, db)
+        record_swipe(user_id, target_user_id, "dislike", db)
+        swipe_writer.submit(SwipeEvent(user_id, target_user_id, "dislike"))
+        return {"message": f"User {user_id} passed on user {target_user_id}"}
+        
+    except HTTPException:
+        raise
     except Exception as e:
-        db.rollback()
         raise HTTPException(status_code=500, detail=str(e))
 
+@router.delete("/matches/{user_id}/unmatch/{target_user_id}")
+async def unmatch_user(user_id: int, target_user_id: int, db: Session = Depends(get_db)):
+    """Withdraw a like and dissolve the mutual match, if any, on both sides."""
+    try:
+        check_swipe_users(user_id, target_user_id, db)
+        record_swipe(user_id, target_user_id, "unmatch", db)
+        swipe_writer.submit(SwipeEvent(user_id, target_user_id, "unmatch"))
+        return {"message": f"User {user_id} unmatched user {target_user_id}"}
+        
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+def record_swipe(user_id: int, target_user_id: int, action: str, db: Session):
+    """Update the like index and seen filter here and, through match_sync, in every other worker."""
+    ensure_like_index(db)
+    ensure_seen_filter(db)
+    match_sync.swiped(user_id, target_user_id, action)
+
+def check_swipe_users(user_id: int, target_user_id: int, db: Session):
+    if user_id == target_user_id:
+        raise HTTPException(status_code=400, detail="Users cannot swipe on themselves")
+    found = db.query(func.count(User.id)).filter(User.id.in_([user_id, target_user_id])).scalar()
+    if found != 2:
+        raise HTTPException(status_code=404, detail="User not found")
+
+def likes_user(liker_id: int, likee_id: int, db: Session) -> bool:
+    """Whether liker_id has liked likee_id, from the like index, confirmed on the swipes table on a miss."""
+    ensure_like_index(db)
+    if like_index.likes(liker_id, likee_id):
+        return True
+    return db.query(Swipe.id)\
+        .filter(Swipe.swiper_id == liker_id, Swipe.swipee_id == likee_id, Swipe.action == "like")\
+        .first() is not None
+
+def warm_like_index(db: Session):
+    likes = db.query(Swipe.swiper_id, Swipe.swipee_id).filter(Swipe.action == "like")
+    like_index.load(likes.yield_per(10000))
+    like_index.is_warm = True
+
+def ensure_like_index(db: Session):
+    if not like_index.is_warm:
+        warm_like_index(db)
+
+def warm_seen_filter(db: Session):
+    seen_filter.clear()
+    swipes = db.query(Swipe.swiper_id, Swipe.swipee_id).order_by(Swipe.swiper_id)
+    swiper_id, swiped_ids = None, []
+    for row_swiper_id, swipee_id in swipes.yield_per(10000):
+        if row_swiper_id != swiper_id:
+            if swiped_ids:
+                seen_filter.load(swiper_id, swiped_ids)
+            swiper_id, swiped_ids = row_swiper_id, []
+        swiped_ids.append(swipee_id)
+    if swiped_ids:
+        seen_filter.load(swiper_id, swiped_ids)
+    seen_filter.is_warm = True
+
+def ensure_seen_filter(db: Session):
+    if not seen_filter.is_warm:
+        warm_seen_filter(db)
+
 @router.get("/matches/{user_id}/mutual")
 async def get_mutual_matches(user_id: int, db: Session = Depends(get_db)):
     try:
-        mutual_matches = db.query(CompatibilityMatch)\
-            .filter(
-                (CompatibilityMatch.user_id_1 == user_id) | 
-                (CompatibilityMatch.user_id_2 == user_id)
-            )\
-            .order_by(CompatibilityMatch.compatibility_score.desc())\
+        mutual_matches = db.query(MutualMatch, User)\
+            .join(User, User.id == MutualMatch.matched_user_id)\
+            .filter(MutualMatch.user_id == user_id, User.is_active == True)\
+            .order_by(MutualMatch.compatibility_score.desc())\
             .limit(10)\
             .all()
         
-        results = []
-        for match in mutual_matches:
-            other_user_id = match.user_id_2 if match.user_id_1 == user_id else match.user_id_1
-            other_user = db.query(User).filter(User.id == other_user_id).first()
-            
-            if other_user:
-                results.append({
-                    "user_id": other_user.id,
-                    "name": other_user.full_name,
-                    "compatibility_score": match.compatibility_score
-                })
+        # Prefer current scores for pairs matching has scored since the match was recorded
+        current_scores = pair_cache.get_many(user_id, [other_user.id for _, other_user in mutual_matches])
+        
+        results = [
+            {
+                "user_id": other_user.id,
+                "name": other_user.full_name,
+                "compatibility_score": current_scores.get(other_user.id, match.compatibility_score),
+                "matched_at": match.created_at
+            }
+            for match, other_user in mutual_matches
+        ]
         
         return {"mutual_matches": results}
         
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
+
+@router.get("/matching/stats")
+async def get_matching_stats():
+    return {
+        "trait_store": trait_store.memory_stats(),
+        "trait_index": trait_index.stats(),
+        "match_cache": match_cache.stats(),
+        "deck_rescorer": deck_rescorer.stats(),
+        "pair_cache": pair_cache.stats(),
+        "geo_index": geo_index.stats(),
+        "interest_index": interest_index.stats(),
+        "like_index": like_index.stats(),
+        "swipe_writer": swipe_writer.stats(),
+        "seen_filter": seen_filter.memory_stats(),
+        "scoring_pipeline": pipeline_metrics.stats()
+    }
+
+@router.get("/matching/stats/seen/{user_id}")
+async def get_seen_filter_stats(user_id: int, db: Session = Depends(get_db)):
+    ensure_seen_filter(db)
+    return seen_filter.memory_stats(user_id)
@@ -1,12 +1,15 @@
 # backend/app/api/users.py
 from fastapi import APIRouter, Depends, HTTPException, status, UploadFile, File, Query
+from sqlalchemy import func
 from sqlalchemy.orm import Session
 from typing import List, Optional, Dict, Any
 from app.db.session import get_db
 from app.models.user import User
+from app.models.interest import Interest
 from app.schemas.user import UserCreate, UserResponse, UserUpdate
 from app.schemas.auth import LoginRequest, RegisterRequest, Token
-from app.services import openai_service, s3_service
+from app.services import openai_service, s3_service, match_sync
+from app.services.interest_index import normalize_interest
 from app.core.security import get_password_hash, verify_password, create_access_token
 
 router = APIRouter()
@@ -34,6 +37,7 @@ async def register(user_data: RegisterRequest, db: Session = Depends(get_db)):
     db.add(user)
     db.commit()
     db.refresh(user)
+    match_sync.profile_changed(user)
     
     # Create access token
     access_token = create_access_token(data={"sub": user.email})
@@ -79,14 +83,44 @@ async def update_user(user_id: int, user_data: UserUpdate, db: Session = Depends
     update_data = user_data.dict(exclude_unset=True)
     if 'password' in update_data:
         update_data['hashed_password'] = get_password_hash(update_data.pop('password'))
+    interest_names = None
+    if 'interests' in update_data:
+        interest_names = update_data.pop('interests') or []
     
     for field, value in update_data.items():
         setattr(user, field, value)
+    if 'location' in update_data:
+        match_sync.apply_location(user)
+    if interest_names is not None:
+        user.interests = get_or_create_interests(interest_names, db)
+        # Only user_interests changes otherwise; stored LLM analyses key freshness on updated_at
+        user.updated_at = func.now()
     
     db.commit()
     db.refresh(user)
+    
+    if interest_names is not None:
+        match_sync.interests_changed(user.id, [interest.name for interest in user.interests])
+    match_sync.profile_changed(user)
     return user
 
+def get_or_create_interests(names: List[str], db: Session) -> List[Interest]:
+    """Map free-text interest names onto shared Interest rows, creating new ones."""
+    normalized = list(dict.fromkeys(
+        normalize_interest(name)[:100] for name in names if name and name.strip()
+    ))
+    if not normalized:
+        return []
+    existing = {
+        interest.name: interest
+        for interest in db.query(Interest).filter(Interest.name.in_(normalized)).all()
+    }
+    for name in normalized:
+        if name not in existing:
+            existing[name] = Interest(name=name)
+            db.add(existing[name])
+    return [existing[name] for name in normalized]
+
 @router.post("/users/{user_id}/profile-picture")
 async def upload_profile_picture(
     user_id: int, 
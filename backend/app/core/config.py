@@ -22,6 +22,55 @@ class Settings(BaseSettings):
     ALGORITHM: str = "HS256"
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 30
     
+    # Matching
+    TRAIT_STORE_SNAPSHOT_PATH: Optional[str] = None
+    # Directory of versioned feature snapshots every worker maps (see feature_snapshot)
+    FEATURE_SNAPSHOT_DIR: Optional[str] = None
+    # How often workers check whether a rebuild has moved the snapshot's CURRENT pointer
+    FEATURE_SNAPSHOT_POLL_SECONDS: float = 30.0
+    # "numpy" scores candidates in-process; "sql" ranks them inside the database
+    MATCHING_ENGINE: str = "numpy"
+    # Approximate candidate generation; set MATCHING_ANN_ENABLED=false for exact search
+    MATCHING_ANN_ENABLED: bool = True
+    MATCHING_ANN_MIN_POPULATION: int = 5000
+    MATCHING_ANN_CANDIDATES: int = 300
+    MATCHING_ANN_PROBES: int = 16
+    # Compatibility bonus per interest two users share, capped at MATCHING_INTEREST_BONUS_MAX
+    MATCHING_INTEREST_BONUS: float = 0.05
+    MATCHING_INTEREST_BONUS_MAX: float = 0.15
+    # Per-user ranked match decks
+    MATCH_CACHE_MAX_ENTRIES: int = 10000
+    MATCH_CACHE_TTL_SECONDS: int = 300
+    MATCH_CACHE_DEPTH: int = 200
+    PAIR_CACHE_MAX_ENTRIES: int = 500000
+    PAIR_CACHE_TTL_SECONDS: int = 300
+    # Decks written by `python -m app.workers.precompute_matches`
+    MATCH_DECK_MAX_AGE_SECONDS: int = 86400
+    MATCH_PRECOMPUTE_SHARD_SIZE: int = 500
+    # Buffered swipe writes
+    SWIPE_BATCH_SIZE: int = 500
+    SWIPE_FLUSH_INTERVAL_SECONDS: float = 0.05
+    # Already-swiped exclusion in the match feed
+    SEEN_FILTER_ERROR_RATE: float = 0.01
+    SEEN_FILTER_INITIAL_CAPACITY: int = 64
+    # LLM compatibility analysis for the top of the first match page. Off by default:
+    # each analysis is a paid OpenAI call on the request path; set e.g. 5 to opt in
+    MATCHING_LLM_TOP_N: int = 0
+    MATCHING_LLM_CONCURRENCY: int = 4
+    MATCHING_LLM_TIMEOUT_SECONDS: float = 10.0
+    # Share of the LLM score blended into the ranking score of the top N
+    MATCHING_LLM_RERANK_WEIGHT: float = 0.0
+    
+    # Chat WebSocket gateway
+    CHAT_WS_SEND_QUEUE_SIZE: int = 256
+    CHAT_WS_SEND_TIMEOUT_SECONDS: float = 10.0
+    CHAT_WS_HEARTBEAT_SECONDS: float = 30.0
+    CHAT_WS_IDLE_TIMEOUT_SECONDS: float = 90.0
+    CHAT_SUGGESTION_HISTORY: int = 10
+    # redis://[:password@]host:port fans chat frames and matching-state changes out across
+    # workers; unset delivers in-process, which is only correct with a single worker
+    CHAT_BACKPLANE_URL: Optional[str] = None
+    
     class Config:
         env_file = ".env"
 
@@ -1,10 +1,17 @@
 # backend/app/main.py (updated)
+import asyncio
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from app.api import users, analysis, chat, matching, journal, notifications, profile
-from app.db.session import engine
-from app.models import user, analysis as analysis_models, chat as chat_models, journal as journal_models, notification as notification_models
+from app.db.session import engine, SessionLocal
+from app.models import user, analysis as analysis_models, chat as chat_models, journal as journal_models, notification as notification_models, interest as interest_models, match_deck as match_deck_models, swipe as swipe_models
 from app.core.config import settings
+from app.services import match_sync
+from app.services.chat_backplane import chat_backplane
+from app.services.connection_manager import connection_manager
+from app.services.deck_rescorer import deck_rescorer
+from app.services.swipe_writer import swipe_writer
+from app.services.trait_store import trait_store
 
 # Create tables
 user.Base.metadata.create_all(bind=engine)
@@ -12,6 +19,9 @@ analysis_models.Base.metadata.create_all(bind=engine)
 chat_models.Base.metadata.create_all(bind=engine)
 journal_models.Base.metadata.create_all(bind=engine)
 notification_models.Base.metadata.create_all(bind=engine)
+interest_models.Base.metadata.create_all(bind=engine)
+match_deck_models.Base.metadata.create_all(bind=engine)
+swipe_models.Base.metadata.create_all(bind=engine)
 
 app = FastAPI(title="AI Dating App API", version="1.0.0")
 
@@ -33,6 +43,43 @@ app.include_router(journal.router, prefix="/api", tags=["journal"])
 app.include_router(notifications.router, prefix="/api", tags=["notifications"])
 app.include_router(profile.router, prefix="/api", tags=["profile"])
 
+@app.on_event("startup")
+async def warm_matching_state():
+    db = SessionLocal()
+    try:
+        matching.warm_trait_store(db)
+        matching.warm_geo_index(db)
+        matching.warm_interest_index(db)
+        matching.warm_like_index(db)
+        matching.warm_seen_filter(db)
+    finally:
+        db.close()
+    deck_rescorer.start(matching.rescore_deck, matching.decks_admitting)
+
+@app.on_event("startup")
+async def start_chat_backplane():
+    await chat_backplane.start(chat.deliver_frame)
+    # Matching-state changes made by other workers arrive over the same backplane
+    await chat_backplane.listen(match_sync.MATCHING_CHANNEL, match_sync.apply_remote)
+    if settings.FEATURE_SNAPSHOT_DIR:
+        app.state.snapshot_follower = asyncio.create_task(
+            match_sync.follow_snapshots(matching.reload_trait_store, settings.FEATURE_SNAPSHOT_POLL_SECONDS)
+        )
+
+@app.on_event("shutdown")
+async def save_matching_state():
+    deck_rescorer.stop()
+    swipe_writer.stop()
+    if settings.TRAIT_STORE_SNAPSHOT_PATH:
+        trait_store.snapshot(settings.TRAIT_STORE_SNAPSHOT_PATH)
+
+@app.on_event("shutdown")
+async def close_chat_connections():
+    if getattr(app.state, "snapshot_follower", None) is not None:
+        app.state.snapshot_follower.cancel()
+    await connection_manager.close_all()
+    await chat_backplane.stop()
+
 @app.get("/")
 async def root():
     return {"message": "AI Dating App API"}
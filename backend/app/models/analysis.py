@@ -1,5 +1,5 @@
 # backend/app/models/analysis.py
-from sqlalchemy import Column, Integer, String, DateTime, JSON, Float, ForeignKey
+from sqlalchemy import Column, Integer, String, DateTime, JSON, Float, ForeignKey, Index
 from sqlalchemy.sql import func
 from sqlalchemy.orm import relationship
 from app.db.base import Base
@@ -29,6 +29,11 @@ class TextAnalysis(Base):
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     
     user = relationship("User")
+    
+    __table_args__ = (
+        # Serves the "latest analysis per user" lookups used by matching
+        Index("ix_text_analysis_user_id_created_at", "user_id", "created_at"),
+    )
 
 class CompatibilityMatch(Base):
     __tablename__ = "compatibility_matches"
@@ -40,3 +45,22 @@ class CompatibilityMatch(Base):
     analysis_summary = Column(String, nullable=True)
     matching_factors = Column(JSON, default={})
     created_at = Column(DateTime(timezone=True), server_default=func.now())
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
+    
+    __table_args__ = (
+        # Pairs are stored with user_id_1 < user_id_2
+        Index("ix_compatibility_matches_user_ids", "user_id_1", "user_id_2"),
+    )
+
+class UserTraitVector(Base):
+    """Trait scores of each user's latest TextAnalysis as columns, for SQL-side scoring."""
+    __tablename__ = "user_trait_vectors"
+    
+    user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), primary_key=True)
+    openness = Column(Float, nullable=True)
+    conscientiousness = Column(Float, nullable=True)
+    extraversion = Column(Float, nullable=True)
+    agreeableness = Column(Float, nullable=True)
+    neuroticism = Column(Float, nullable=True)
+    # Traits outside the five columns; their presence makes SQL scoring inexact
+    extra_traits = Column(JSON, default={})
@@ -1,5 +1,5 @@
 # backend/app/models/chat.py
-from sqlalchemy import Column, Integer, String, DateTime, JSON, Boolean, ForeignKey
+from sqlalchemy import Column, Integer, String, DateTime, JSON, Boolean, ForeignKey, Index
 from sqlalchemy.sql import func
 from sqlalchemy.orm import relationship
 from app.db.base import Base
@@ -11,18 +11,38 @@ class ChatSession(Base):
     user_id_1 = Column(Integer, ForeignKey("users.id"))
     user_id_2 = Column(Integer, ForeignKey("users.id"))
     is_active = Column(Boolean, default=True)
+    # seq of the newest message; bumped in the same transaction that inserts it
+    last_seq = Column(Integer, nullable=False, default=0, server_default="0")
+    # Read watermarks: the highest seq each participant has read
+    read_seq_1 = Column(Integer, nullable=False, default=0, server_default="0")
+    read_seq_2 = Column(Integer, nullable=False, default=0, server_default="0")
+    # Inbox fields, kept current by chat_service on every insert, read and clear
+    last_message_id = Column(Integer, nullable=True)
+    last_message_preview = Column(String(120), nullable=True)
+    # Time of the newest message, or of creation for a session without one
+    last_activity_at = Column(DateTime(timezone=True), nullable=False, server_default=func.now())
+    unread_count_1 = Column(Integer, nullable=False, default=0, server_default="0")
+    unread_count_2 = Column(Integer, nullable=False, default=0, server_default="0")
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     ended_at = Column(DateTime(timezone=True), nullable=True)
     
     user1 = relationship("User", foreign_keys=[user_id_1])
     user2 = relationship("User", foreign_keys=[user_id_2])
     messages = relationship("ChatMessage", back_populates="session")
+    
+    __table_args__ = (
+        # A participant's inbox, newest first, whichever side of the pair they are on
+        Index("ix_chat_sessions_user_id_1_last_activity_at", "user_id_1", "last_activity_at"),
+        Index("ix_chat_sessions_user_id_2_last_activity_at", "user_id_2", "last_activity_at"),
+    )
 
 class ChatMessage(Base):
     __tablename__ = "chat_messages"
     
     id = Column(Integer, primary_key=True, index=True)
     session_id = Column(Integer, ForeignKey("chat_sessions.id"))
+    # Position within the session, 1, 2, 3, ...; the keyset history pages on
+    seq = Column(Integer, nullable=False)
     sender_id = Column(Integer, ForeignKey("users.id"))
     message_content = Column(String, nullable=False)
     ai_analysis = Column(JSON, default={})  # Tone, empathy score, suggestions
@@ -32,3 +52,7 @@ class ChatMessage(Base):
     
     session = relationship("ChatSession", back_populates="messages")
     sender = relationship("User")
+    
+    __table_args__ = (
+        Index("ux_chat_messages_session_id_seq", "session_id", "seq", unique=True),
+    )
@@ -0,0 +1,20 @@
+# backend/app/models/interest.py
+from sqlalchemy import Column, Integer, String, ForeignKey, Index
+from app.db.base import Base
+
+class Interest(Base):
+    __tablename__ = "interests"
+    
+    id = Column(Integer, primary_key=True, index=True)
+    # Normalized: lowercased with single spaces
+    name = Column(String(100), unique=True, index=True, nullable=False)
+
+class UserInterest(Base):
+    __tablename__ = "user_interests"
+    
+    user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), primary_key=True)
+    interest_id = Column(Integer, ForeignKey("interests.id", ondelete="CASCADE"), primary_key=True)
+    
+    __table_args__ = (
+        Index("ix_user_interests_interest_id", "interest_id"),
+    )
@@ -0,0 +1,28 @@
+# backend/app/models/match_deck.py
+from sqlalchemy import Column, Integer, String, DateTime, JSON, ForeignKey
+from sqlalchemy.sql import func
+from app.db.base import Base
+
+class MatchDeck(Base):
+    __tablename__ = "match_decks"
+    
+    user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), primary_key=True)
+    # Ranked [[score, user_id], ...], best first
+    candidates = Column(JSON, nullable=False, default=[])
+    computed_at = Column(DateTime(timezone=True), nullable=False, index=True)
+
+class MatchDeckCandidate(Base):
+    """Reverse index of match_decks.candidates: which owners' decks rank a candidate."""
+    __tablename__ = "match_deck_candidates"
+    
+    candidate_id = Column(Integer, primary_key=True)
+    owner_id = Column(Integer, ForeignKey("match_decks.user_id", ondelete="CASCADE"), primary_key=True, index=True)
+
+class MatchPrecomputeRun(Base):
+    __tablename__ = "match_precompute_runs"
+    
+    id = Column(Integer, primary_key=True, index=True)
+    mode = Column(String, nullable=False)
+    started_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
+    finished_at = Column(DateTime(timezone=True), nullable=True)
+    users_scored = Column(Integer, default=0)
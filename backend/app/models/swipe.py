@@ -0,0 +1,32 @@
+# backend/app/models/swipe.py
+from sqlalchemy import Column, Integer, String, DateTime, Float, ForeignKey, Index
+from sqlalchemy.sql import func
+from app.db.base import Base
+
+class Swipe(Base):
+    __tablename__ = "swipes"
+    
+    id = Column(Integer, primary_key=True, index=True)
+    swiper_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
+    swipee_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
+    # "like" or "dislike"
+    action = Column(String(10), nullable=False)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    
+    __table_args__ = (
+        # One swipe per direction; also serves the reciprocal "did they like me" lookup
+        Index("ux_swipes_swiper_id_swipee_id", "swiper_id", "swipee_id", unique=True),
+    )
+
+class MutualMatch(Base):
+    __tablename__ = "mutual_matches"
+    
+    # Stored once per direction so each user's matches are a single index range
+    user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), primary_key=True)
+    matched_user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), primary_key=True)
+    compatibility_score = Column(Float, nullable=False)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    
+    __table_args__ = (
+        Index("ix_mutual_matches_user_id_score", "user_id", "compatibility_score"),
+    )
@@ -1,7 +1,9 @@
 # backend/app/models/user.py
 from sqlalchemy import Column, Integer, String, Boolean, DateTime, JSON, Float, Text
+from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 from app.db.base import Base
+from app.models.interest import Interest
 
 class User(Base):
     __tablename__ = "users"
@@ -12,11 +14,16 @@ class User(Base):
     full_name = Column(String, nullable=True)
     is_active = Column(Boolean, default=True)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now(), index=True)
     
     # Profile fields
     age = Column(Integer, nullable=True)
     gender = Column(String, nullable=True)
     location = Column(String, nullable=True)
+    # Resolved from location through the offline gazetteer
+    latitude = Column(Float, nullable=True)
+    longitude = Column(Float, nullable=True)
+    geohash = Column(String(12), nullable=True, index=True)
     bio = Column(Text, nullable=True)
     profile_picture = Column(String, nullable=True)
     
@@ -28,3 +35,5 @@ class User(Base):
     trait_scores = Column(JSON, default={})
     emotional_badges = Column(JSON, default=[])
     last_analysis_date = Column(DateTime(timezone=True), nullable=True)
+    
+    interests = relationship(Interest, secondary="user_interests", order_by=Interest.name, lazy="selectin")
@@ -1,6 +1,6 @@
 # backend/app/schemas/chat.py
 from pydantic import BaseModel
-from typing import List, Optional
+from typing import Dict, List, Optional, Tuple
 from datetime import datetime
 
 class ChatMessageCreate(BaseModel):
@@ -19,3 +19,63 @@ class ChatMessageResponse(BaseModel):
 
     class Config:
         from_attributes = True
+
+class ChatHistoryMessage(BaseModel):
+    id: int
+    seq: int
+    session_id: int
+    sender_id: int
+    message_content: str
+    is_flagged: bool
+    created_at: datetime
+
+    class Config:
+        from_attributes = True
+
+class ChatHistoryResponse(BaseModel):
+    messages: List[ChatHistoryMessage]
+    # Older messages exist before the page, or newer ones after it when paging with after
+    has_more: bool
+
+class ChatSyncRequest(BaseModel):
+    # Session id -> seq of the newest message the client holds (0 for none)
+    sessions: Dict[int, int] = {}
+    # Session id -> (read_seq, other_read_seq) the client holds; sessions where these
+    # and the seq above are current are left out of the response
+    watermarks: Dict[int, Tuple[int, int]] = {}
+
+class ChatSyncSession(BaseModel):
+    session_id: int
+    other_user_id: int
+    is_active: bool
+    ended_at: Optional[datetime] = None
+    last_seq: int
+    read_seq: int
+    other_read_seq: int
+    unread_count: int
+    messages: List[ChatHistoryMessage]
+    # Older unseen messages were left out; fetch them with history?before=<first seq>
+    gap: bool
+
+class ChatSyncResponse(BaseModel):
+    sessions: List[ChatSyncSession]
+    # Requested sessions the user can no longer see
+    removed: List[int]
+
+class ChatInboxEntry(BaseModel):
+    session_id: int
+    other_user_id: int
+    other_user_name: str
+    other_user_profile_picture: Optional[str] = None
+    last_message_id: Optional[int] = None
+    # The first PREVIEW_LENGTH characters of the last message
+    last_message: Optional[str] = None
+    last_message_time: datetime
+    unread_count: int
+    # Seq of the session's newest message; clients pass it to /chat/sync after a reconnect
+    last_seq: int = 0
+    read_seq: int = 0
+    other_read_seq: int = 0
+
+class ChatInboxResponse(BaseModel):
+    sessions: List[ChatInboxEntry]
@@ -1,5 +1,5 @@
 # backend/app/schemas/user.py
-from pydantic import BaseModel, EmailStr
+from pydantic import BaseModel, EmailStr, field_validator
 from typing import Optional, Dict, List
 from datetime import datetime
 
@@ -21,6 +21,7 @@ class UserUpdate(BaseModel):
     profile_picture: Optional[str] = None
     trait_scores: Optional[Dict[str, float]] = None
     emotional_badges: Optional[List[str]] = None
+    interests: Optional[List[str]] = None
     is_active: Optional[bool] = None
 
 class UserResponse(UserBase):
@@ -30,12 +31,20 @@ class UserResponse(UserBase):
     age: Optional[int] = None
     gender: Optional[str] = None
     location: Optional[str] = None
+    latitude: Optional[float] = None
+    longitude: Optional[float] = None
     bio: Optional[str] = None
     profile_picture: Optional[str] = None
     trait_scores: Dict[str, float]
     emotional_badges: List[str]
+    interests: List[str] = []
     is_active: bool
     created_at: datetime
 
+    @field_validator("interests", mode="before")
+    @classmethod
+    def interest_names(cls, value):
+        return [getattr(interest, "name", interest) for interest in value or []]
+
     class Config:
         from_attributes = True
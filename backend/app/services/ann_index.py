@@ -0,0 +1,279 @@
+# backend/app/services/ann_index.py
+import threading
+import numpy as np
+from typing import Any, Callable, Dict, Iterable, Optional, Sequence
+from app.core.config import settings
+from app.services.matching_engine import BASE_TRAITS
+from app.services.trait_store import TraitStore, trait_store
+
+# Traits a user never received sit at the middle of the [0, 1] scale so they
+# neither attract nor repel neighbours
+MISSING_TRAIT_VALUE = 0.5
+
+
+def trait_array(traits: Optional[Dict[str, float]], trait_names: Sequence[str] = BASE_TRAITS) -> np.ndarray:
+    return np.array(
+        [float(traits[trait]) if traits and trait in traits else MISSING_TRAIT_VALUE for trait in trait_names],
+        dtype=np.float32
+    )
+
+
+class IVFIndex:
+    """Inverted-file L1 nearest-neighbour index over the rows of a TraitStore, updated incrementally."""
+
+    RETRAIN_FACTOR = 4
+    MIN_TRAINING_SIZE = 256
+    KMEANS_ITERATIONS = 10
+    # Rows whose vectors are read from the store at once while assigning lists
+    ASSIGN_CHUNK_ROWS = 65536
+
+    def __init__(self, store: TraitStore, dims: int = len(BASE_TRAITS), n_probe: int = 8, seed: int = 0):
+        self._lock = threading.RLock()
+        self.store = store
+        self.dims = dims
+        self.n_probe = n_probe
+        self._rng = np.random.default_rng(seed)
+        self._reset()
+
+    def _reset(self, capacity: int = 1024):
+        # List and position of each store row, -1 for rows not in the index
+        self._row_list = np.full(capacity, -1, dtype=np.int32)
+        self._row_position = np.full(capacity, -1, dtype=np.int32)
+        self._size = 0
+        self._centroids = np.full((1, self.dims), MISSING_TRAIT_VALUE, dtype=np.float32)
+        self._lists = [np.empty(16, dtype=np.int32)]
+        self._list_sizes = np.zeros(1, dtype=np.int64)
+        self._trained_size = 0
+
+    def __len__(self) -> int:
+        return self._size
+
+    def __contains__(self, user_id: int) -> bool:
+        with self._lock:
+            return self._indexed(int(self.store.rows([user_id])[0]))
+
+    # Storage ------------------------------------------------------------------
+
+    def _indexed(self, row: int) -> bool:
+        return 0 <= row < len(self._row_list) and self._row_list[row] >= 0
+
+    def _vectors(self, rows: np.ndarray) -> np.ndarray:
+        # take_rows returns a copy, so the NaNs can be filled in place
+        return np.nan_to_num(self.store.take_rows(rows)[:, :self.dims], copy=False, nan=MISSING_TRAIT_VALUE)
+
+    def _ensure_row(self, row: int):
+        if row >= len(self._row_list):
+            capacity = max(row + 1, len(self._row_list) * 2)
+            for name in ("_row_list", "_row_position"):
+                grown = np.full(capacity, -1, dtype=np.int32)
+                grown[:len(getattr(self, name))] = getattr(self, name)
+                setattr(self, name, grown)
+
+    def _append_to_list(self, list_id: int, row: int):
+        size = self._list_sizes[list_id]
+        if size == len(self._lists[list_id]):
+            self._lists[list_id] = np.resize(self._lists[list_id], max(16, size * 2))
+        self._lists[list_id][size] = row
+        self._row_list[row] = list_id
+        self._row_position[row] = size
+        self._list_sizes[list_id] = size + 1
+
+    def _remove_from_list(self, row: int):
+        list_id = self._row_list[row]
+        position = self._row_position[row]
+        last = self._list_sizes[list_id] - 1
+        moved_row = self._lists[list_id][last]
+        self._lists[list_id][position] = moved_row
+        self._row_position[moved_row] = position
+        self._list_sizes[list_id] = last
+        self._row_list[row] = -1
+
+    def _nearest_lists(self, vectors: np.ndarray, count: int = 1) -> np.ndarray:
+        count = min(count, len(self._centroids))
+        # Bound the (rows, lists, dims) distance tensor to ~4M floats per chunk
+        chunk = max(1, (1 << 22) // (len(self._centroids) * self.dims))
+        result = np.empty((len(vectors), count), dtype=np.int64)
+        for start in range(0, len(vectors), chunk):
+            block = vectors[start:start + chunk]
+            distances = np.abs(block[:, None, :] - self._centroids[None, :, :]).sum(axis=2)
+            if count == 1:
+                result[start:start + chunk, 0] = distances.argmin(axis=1)
+                continue
+            nearest = np.argpartition(distances, count - 1, axis=1)[:, :count]
+            order = np.take_along_axis(distances, nearest, axis=1).argsort(axis=1)
+            result[start:start + chunk] = np.take_along_axis(nearest, order, axis=1)
+        return result
+
+    # Training -----------------------------------------------------------------
+
+    def _train(self):
+        rows = np.flatnonzero(self._row_list >= 0)
+        n_lists = max(1, int(np.sqrt(len(rows))))
+        if len(rows) < self.MIN_TRAINING_SIZE:
+            n_lists = 1
+
+        sample_rows = rows
+        if len(rows) > n_lists * 64:
+            sample_rows = np.sort(self._rng.choice(rows, n_lists * 64, replace=False))
+        sample = self._vectors(sample_rows)
+        centroids = sample[self._rng.choice(len(sample), n_lists, replace=False)].copy() \
+            if len(sample) else np.full((1, self.dims), MISSING_TRAIT_VALUE, dtype=np.float32)
+
+        for _ in range(self.KMEANS_ITERATIONS if n_lists > 1 else 0):
+            self._centroids = centroids
+            assignment = self._nearest_lists(sample)[:, 0]
+            order = np.argsort(assignment, kind="stable")
+            bounds = np.searchsorted(assignment[order], np.arange(n_lists + 1))
+            for list_id in range(n_lists):
+                if bounds[list_id] < bounds[list_id + 1]:
+                    # Medians minimise L1 within a cluster
+                    members = sample[order[bounds[list_id]:bounds[list_id + 1]]]
+                    centroids[list_id] = np.median(members, axis=0)
+
+        self._centroids = centroids
+        assignment = np.empty(len(rows), dtype=np.int64)
+        for start in range(0, len(rows), self.ASSIGN_CHUNK_ROWS):
+            chunk = rows[start:start + self.ASSIGN_CHUNK_ROWS]
+            assignment[start:start + len(chunk)] = self._nearest_lists(self._vectors(chunk))[:, 0]
+        order = np.argsort(assignment, kind="stable")
+        bounds = np.searchsorted(assignment[order], np.arange(len(centroids) + 1))
+        self._lists = []
+        for list_id in range(len(centroids)):
+            members = rows[order[bounds[list_id]:bounds[list_id + 1]]].astype(np.int32)
+            self._lists.append(np.resize(members, max(16, len(members) * 2)))
+            self._row_list[members] = list_id
+            self._row_position[members] = np.arange(len(members), dtype=np.int32)
+        self._list_sizes = np.diff(bounds).astype(np.int64)
+        self._trained_size = len(rows)
+
+    def _maybe_retrain(self):
+        if self._size >= self.MIN_TRAINING_SIZE and self._size >= self._trained_size * self.RETRAIN_FACTOR:
+            self._train()
+
+    # Public API ---------------------------------------------------------------
+
+    def build(self):
+        """Index every row of the store and train the inverted lists from scratch."""
+        with self._lock:
+            size = len(self.store)
+            self._reset(max(1024, size))
+            self._row_list[:size] = 0
+            self._size = size
+            self._train()
+
+    def attach(self, arrays: Dict[str, np.ndarray]):
+        """Use lists exported by a snapshot builder over the same store rows, without copying them."""
+        with self._lock:
+            offsets = arrays["list_offsets"]
+            self._centroids = np.asarray(arrays["centroids"], dtype=np.float32)
+            self._lists = [arrays["list_rows"][offsets[index]:offsets[index + 1]] for index in range(len(offsets) - 1)]
+            self._list_sizes = np.diff(offsets).astype(np.int64)
+            self._row_list = arrays["row_list"]
+            self._row_position = arrays["row_position"]
+            self._size = int(offsets[-1])
+            self._trained_size = self._size
+
+    def export(self) -> Dict[str, np.ndarray]:
+        """The trained lists as flat arrays, for feature_snapshot.write_snapshot."""
+        with self._lock:
+            size = len(self.store)
+            return {
+                "centroids": self._centroids.copy(),
+                "list_offsets": np.concatenate([[0], np.cumsum(self._list_sizes)]).astype(np.int64),
+                "list_rows": np.concatenate([
+                    rows[:list_size] for rows, list_size in zip(self._lists, self._list_sizes)
+                ]).astype(np.int32),
+                "row_list": self._row_list[:size].copy(),
+                "row_position": self._row_position[:size].copy(),
+            }
+
+    def rebuild(
+        self,
+        refill: Callable[[], Any],
+        snapshot: Optional[Any] = None,
+        changed_user_ids: Iterable[int] = (),
+    ):
+        """Run refill, which renumbers the store rows, then re-index from snapshot's lists or by training."""
+        with self._lock:
+            refill()
+            if snapshot is not None and snapshot.ann is not None:
+                self.attach(snapshot.ann)
+                for user_id in changed_user_ids:
+                    self.upsert(user_id)
+            else:
+                self.build()
+
+    def upsert(self, user_id: int):
+        """(Re-)index the user's current store row."""
+        with self._lock:
+            row = int(self.store.rows([user_id])[0])
+            if row < 0:
+                return
+            self._ensure_row(row)
+            if self._row_list[row] >= 0:
+                self._remove_from_list(row)
+            else:
+                self._size += 1
+            self._append_to_list(int(self._nearest_lists(self._vectors(np.array([row])))[0, 0]), row)
+            self._maybe_retrain()
+
+    def remove(self, user_id: int):
+        with self._lock:
+            row = int(self.store.rows([user_id])[0])
+            if not self._indexed(row):
+                return
+            self._remove_from_list(row)
+            self._size -= 1
+
+    def search(
+        self,
+        vector: np.ndarray,
+        k: int,
+        exclude: Optional[int] = None,
+        n_probe: Optional[int] = None,
+        allowed: Optional[np.ndarray] = None,
+    ) -> np.ndarray:
+        """Up to k user ids by increasing L1 distance to vector, restricted to `allowed` when given."""
+        with self._lock:
+            vector = np.asarray(vector, dtype=np.float32)
+            n_probe = n_probe or self.n_probe
+            allowed_rows = None
+            if allowed is not None:
+                allowed_rows = np.zeros(len(self._row_list), dtype=bool)
+                rows = self.store.rows(allowed)
+                allowed_rows[rows[(rows >= 0) & (rows < len(allowed_rows))]] = True
+            probes = self._nearest_lists(vector[None, :], n_probe if allowed is None else len(self._centroids))[0]
+            
+            found, count = [], 0
+            for start in range(0, len(probes), n_probe):
+                for list_id in probes[start:start + n_probe]:
+                    rows = self._lists[list_id][:self._list_sizes[list_id]]
+                    if allowed_rows is not None:
+                        rows = rows[allowed_rows[rows]]
+                    found.append(rows)
+                    count += len(rows)
+                if allowed is None or count > k:
+                    break
+            rows = np.concatenate(found) if found else np.empty(0, dtype=np.int32)
+            if exclude is not None:
+                rows = rows[rows != self.store.rows([exclude])[0]]
+            if not len(rows):
+                return np.empty(0, dtype=np.int64)
+            distances = np.abs(self._vectors(rows) - vector).sum(axis=1)
+            if len(rows) > k:
+                nearest = np.argpartition(distances, k - 1)[:k]
+                rows, distances = rows[nearest], distances[nearest]
+            return self.store.row_user_ids(rows[np.argsort(distances, kind="stable")])
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {
+                "vectors": self._size,
+                "lists": len(self._centroids),
+                "n_probe": self.n_probe,
+                "trained_size": self._trained_size,
+                "largest_list": int(self._list_sizes.max()) if len(self._list_sizes) else 0,
+            }
+
+
+trait_index = IVFIndex(trait_store, n_probe=settings.MATCHING_ANN_PROBES)
@@ -0,0 +1,348 @@
+# backend/app/services/chat_backplane.py
+"""Pub/sub backplane carrying chat and matching frames between uvicorn workers, batched per event loop tick."""
+import asyncio
+import json
+import logging
+import time
+from abc import ABC, abstractmethod
+from collections import deque
+from typing import Any, Callable, Deque, Dict, Iterable, List, Optional, Tuple
+from urllib.parse import urlparse
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+Frame = Dict[str, Any]
+# handler(frame, user_ids) delivers a received frame to this worker's sockets
+Handler = Callable[[Frame, List[int]], None]
+# An entry is {"frame", "userIds", "sentAt"}; a batch maps channel -> entries
+Batch = Dict[str, List[Dict[str, Any]]]
+
+
+def session_channel(session_id: int) -> str:
+    return f"chat:session:{session_id}"
+
+
+def user_channel(user_id: int) -> str:
+    return f"chat:user:{user_id}"
+
+
+def _running_loop() -> Optional[asyncio.AbstractEventLoop]:
+    try:
+        return asyncio.get_running_loop()
+    except RuntimeError:
+        return None
+
+
+class Backplane(ABC):
+    name = "backplane"
+
+    def __init__(self, latency_samples: int = 4096):
+        self._handler: Optional[Handler] = None
+        self._channel_handlers: Dict[str, Handler] = {}
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._subscriptions: Dict[str, int] = {}
+        self._pending: Batch = {}
+        self._flush_task: Optional[asyncio.Task] = None
+        # Publish-to-deliver seconds of recently received frames
+        self._latencies: Deque[float] = deque(maxlen=latency_samples)
+        self.published = 0
+        self.flushes = 0
+        self.channel_messages = 0
+        self.received = 0
+        self.dropped = 0
+
+    @property
+    def started(self) -> bool:
+        return self._loop is not None
+
+    async def start(self, handler: Handler):
+        self._handler = handler
+        self._loop = asyncio.get_running_loop()
+        await self._open()
+
+    async def stop(self):
+        """Send what is still pending, then disconnect."""
+        if self._flush_task is not None:
+            await self._flush_task
+        await self._close()
+        self._subscriptions.clear()
+        self._channel_handlers.clear()
+        self._loop = None
+
+    async def listen(self, channel: str, handler: Handler):
+        """Subscribe to channel with a handler of its own instead of the chat one."""
+        self._channel_handlers[channel] = handler
+        await self.subscribe(channel)
+
+    async def subscribe(self, channel: str):
+        """Reference-counted: only the first local subscriber subscribes upstream."""
+        count = self._subscriptions.get(channel, 0)
+        self._subscriptions[channel] = count + 1
+        if not count:
+            await self._subscribe(channel)
+
+    async def unsubscribe(self, channel: str):
+        count = self._subscriptions.get(channel, 0)
+        if count > 1:
+            self._subscriptions[channel] = count - 1
+        elif count == 1:
+            del self._subscriptions[channel]
+            await self._unsubscribe(channel)
+
+    def publish(self, channel: str, frame: Frame, user_ids: Iterable[int]):
+        """Queue a frame for user_ids on channel, sent with this tick's flush; callable from any thread once started."""
+        if self._loop is not None and _running_loop() is not self._loop:
+            self._loop.call_soon_threadsafe(self.publish, channel, frame, list(user_ids))
+            return
+        self._pending.setdefault(channel, []).append(
+            {"frame": frame, "userIds": list(user_ids), "sentAt": time.time()}
+        )
+        self.published += 1
+        if self._flush_task is None:
+            self._flush_task = asyncio.create_task(self._flush())
+
+    async def _flush(self):
+        # The task first runs on the next tick, by which time every publish of this one is pending
+        try:
+            while self._pending:
+                batch, self._pending = self._pending, {}
+                self.flushes += 1
+                self.channel_messages += len(batch)
+                try:
+                    await self._send(batch)
+                except Exception:
+                    self.dropped += sum(len(entries) for entries in batch.values())
+                    logger.exception("Chat backplane publish failed")
+        finally:
+            self._flush_task = None
+
+    def _received(self, channel: str, entries: List[Dict[str, Any]]):
+        if channel not in self._subscriptions:
+            # Unsubscribed while the message was in flight
+            return
+        handler = self._channel_handlers.get(channel, self._handler)
+        now = time.time()
+        for entry in entries:
+            self._latencies.append(max(now - entry["sentAt"], 0.0))
+            self.received += 1
+            try:
+                handler(entry["frame"], entry["userIds"])
+            except Exception:
+                logger.exception("Delivering a frame from %s failed", channel)
+
+    @abstractmethod
+    async def _open(self):
+        ...
+
+    @abstractmethod
+    async def _close(self):
+        ...
+
+    @abstractmethod
+    async def _subscribe(self, channel: str):
+        ...
+
+    @abstractmethod
+    async def _unsubscribe(self, channel: str):
+        ...
+
+    @abstractmethod
+    async def _send(self, batch: Batch):
+        ...
+
+    def stats(self) -> Dict[str, Any]:
+        latencies = sorted(self._latencies)
+
+        def percentile(fraction: float) -> float:
+            if not latencies:
+                return 0.0
+            return round(latencies[min(int(fraction * len(latencies)), len(latencies) - 1)] * 1000, 3)
+
+        return {
+            "backend": self.name,
+            "channels": len(self._subscriptions),
+            "published": self.published,
+            "flushes": self.flushes,
+            "channel_messages": self.channel_messages,
+            "frames_per_flush": round((self.published - self.pending()) / self.flushes, 2) if self.flushes else 0.0,
+            "received": self.received,
+            "dropped": self.dropped,
+            "latency_p50_ms": percentile(0.5),
+            "latency_p99_ms": percentile(0.99),
+            "latency_max_ms": round(latencies[-1] * 1000, 3) if latencies else 0.0,
+        }
+
+    def pending(self) -> int:
+        return sum(len(entries) for entries in self._pending.values())
+
+
+class InProcessBackplane(Backplane):
+    """Single-worker mode: a flush hands each batch straight to the local subscribers."""
+    name = "in_process"
+
+    async def _open(self):
+        pass
+
+    async def _close(self):
+        pass
+
+    async def _subscribe(self, channel: str):
+        pass
+
+    async def _unsubscribe(self, channel: str):
+        pass
+
+    async def _send(self, batch: Batch):
+        for channel, entries in batch.items():
+            self._received(channel, entries)
+
+
+class RespError(Exception):
+    pass
+
+
+def encode_command(*args) -> bytes:
+    parts = [b"*%d\r\n" % len(args)]
+    for arg in args:
+        if isinstance(arg, str):
+            arg = arg.encode()
+        parts.append(b"$%d\r\n%s\r\n" % (len(arg), arg))
+    return b"".join(parts)
+
+
+async def read_reply(reader: asyncio.StreamReader) -> Any:
+    """Read one RESP2 reply; error replies are returned as RespError, not raised."""
+    line = await reader.readline()
+    if not line.endswith(b"\r\n"):
+        raise ConnectionError("Connection closed by the backplane server")
+    kind, rest = line[:1], line[1:-2]
+    if kind == b"+":
+        return rest
+    if kind == b"-":
+        return RespError(rest.decode(errors="replace"))
+    if kind == b":":
+        return int(rest)
+    if kind == b"$":
+        length = int(rest)
+        if length < 0:
+            return None
+        return (await reader.readexactly(length + 2))[:-2]
+    if kind == b"*":
+        length = int(rest)
+        if length < 0:
+            return None
+        return [await read_reply(reader) for _ in range(length)]
+    raise ConnectionError(f"Unexpected reply from the backplane server: {line[:32]!r}")
+
+
+class RespBackplane(Backplane):
+    """Redis pub/sub over two plain asyncio connections; frames of a failed flush are dropped."""
+    name = "resp"
+
+    def __init__(self, url: str, reconnect_delay: float = 1.0, **kwargs):
+        super().__init__(**kwargs)
+        parsed = urlparse(url)
+        self.host = parsed.hostname or "localhost"
+        self.port = parsed.port or 6379
+        self.password = parsed.password
+        self.reconnect_delay = reconnect_delay
+        self._publisher: Optional[Tuple[asyncio.StreamReader, asyncio.StreamWriter]] = None
+        self._subscriber: Optional[Tuple[asyncio.StreamReader, asyncio.StreamWriter]] = None
+        self._listener: Optional[asyncio.Task] = None
+        self.reconnects = 0
+
+    async def _connect(self) -> Tuple[asyncio.StreamReader, asyncio.StreamWriter]:
+        reader, writer = await asyncio.open_connection(self.host, self.port)
+        if self.password:
+            writer.write(encode_command("AUTH", self.password))
+            reply = await read_reply(reader)
+            if isinstance(reply, RespError):
+                writer.close()
+                raise reply
+        return reader, writer
+
+    async def _open(self):
+        self._publisher = await self._connect()
+        self._subscriber = await self._connect()
+        self._listener = asyncio.create_task(self._listen())
+
+    async def _close(self):
+        if self._listener is not None:
+            self._listener.cancel()
+            self._listener = None
+        for connection in (self._publisher, self._subscriber):
+            if connection is not None:
+                connection[1].close()
+        self._publisher = self._subscriber = None
+
+    async def _write_subscriber(self, *args):
+        try:
+            self._subscriber[1].write(encode_command(*args))
+            await self._subscriber[1].drain()
+        except (ConnectionError, TypeError):
+            # The listener re-subscribes every channel once it has reconnected
+            pass
+
+    async def _subscribe(self, channel: str):
+        await self._write_subscriber("SUBSCRIBE", channel)
+
+    async def _unsubscribe(self, channel: str):
+        await self._write_subscriber("UNSUBSCRIBE", channel)
+
+    async def _send(self, batch: Batch):
+        if self._publisher is None:
+            self._publisher = await self._connect()
+        reader, writer = self._publisher
+        try:
+            writer.write(b"".join(
+                encode_command("PUBLISH", channel, json.dumps(entries, default=str))
+                for channel, entries in batch.items()
+            ))
+            await writer.drain()
+            replies = [await read_reply(reader) for _ in batch]
+        except (ConnectionError, asyncio.IncompleteReadError):
+            writer.close()
+            self._publisher = None
+            raise
+        errors = [reply for reply in replies if isinstance(reply, RespError)]
+        if errors:
+            raise errors[0]
+
+    async def _listen(self):
+        while True:
+            try:
+                reader = self._subscriber[0]
+                while True:
+                    reply = await read_reply(reader)
+                    if isinstance(reply, list) and len(reply) == 3 and reply[0] == b"message":
+                        self._received(reply[1].decode(), json.loads(reply[2]))
+            except asyncio.CancelledError:
+                raise
+            except (ConnectionError, asyncio.IncompleteReadError, OSError, TypeError):
+                logger.warning("Chat backplane subscriber connection lost; reconnecting")
+            if self._subscriber is not None:
+                self._subscriber[1].close()
+            self._subscriber = None
+            await asyncio.sleep(self.reconnect_delay)
+            try:
+                self._subscriber = await self._connect()
+            except (OSError, RespError):
+                continue
+            self.reconnects += 1
+            if self._subscriptions:
+                await self._write_subscriber("SUBSCRIBE", *self._subscriptions)
+
+    def stats(self) -> Dict[str, Any]:
+        return dict(super().stats(), reconnects=self.reconnects)
+
+
+def create_backplane(url: Optional[str]) -> Backplane:
+    if not url:
+        return InProcessBackplane()
+    if urlparse(url).scheme not in ("redis", "resp"):
+        raise ValueError(f"Unsupported chat backplane URL {url!r}")
+    return RespBackplane(url)
+
+
+chat_backplane = create_backplane(settings.CHAT_BACKPLANE_URL)
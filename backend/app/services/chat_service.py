@@ -0,0 +1,247 @@
+# backend/app/services/chat_service.py
+from typing import Any, Dict, List, Optional, Tuple
+from sqlalchemy import and_, case, func, or_, update
+from sqlalchemy.orm import Session, load_only
+from app.models.chat import ChatSession, ChatMessage
+from app.models.user import User
+
+PREVIEW_LENGTH = 120
+# Per-participant columns, by which side of the pair (user_id_1 or user_id_2) the user is on
+READ_SEQ = {1: ChatSession.read_seq_1, 2: ChatSession.read_seq_2}
+UNREAD_COUNT = {1: ChatSession.unread_count_1, 2: ChatSession.unread_count_2}
+
+
+def get_participant_session(db: Session, session_id: int, user_id: int) -> Optional[ChatSession]:
+    """The chat session if user_id takes part in it, otherwise None."""
+    session = db.query(ChatSession).filter(ChatSession.id == session_id).first()
+    if session is None or user_id not in (session.user_id_1, session.user_id_2):
+        return None
+    return session
+
+
+def other_participant(session: ChatSession, user_id: int) -> int:
+    return session.user_id_2 if session.user_id_1 == user_id else session.user_id_1
+
+
+def _side(session: ChatSession, user_id: int) -> int:
+    return 1 if session.user_id_1 == user_id else 2
+
+
+def active_sessions(db: Session, user_id: int) -> Dict[int, int]:
+    """Active session id -> other participant, for every session user_id takes part in."""
+    rows = db.query(ChatSession.id, ChatSession.user_id_1, ChatSession.user_id_2).filter(
+        (ChatSession.user_id_1 == user_id) | (ChatSession.user_id_2 == user_id),
+        ChatSession.is_active == True
+    ).all()
+    return {session_id: user_id_2 if user_id_1 == user_id else user_id_1 for session_id, user_id_1, user_id_2 in rows}
+
+
+def append_message(
+    db: Session,
+    session: ChatSession,
+    sender_id: int,
+    content: str,
+    moderation_result: Optional[Dict[str, Any]] = None,
+) -> ChatMessage:
+    """Store a message with the session's next seq and update the inbox fields in the same commit."""
+    moderation_result = moderation_result or {}
+    flagged = bool(moderation_result.get("should_flag"))
+    # The UPDATE holds the session row lock until commit, so concurrent senders get distinct, increasing seqs
+    seq = db.execute(
+        update(ChatSession)
+        .where(ChatSession.id == session.id)
+        .values(last_seq=ChatSession.last_seq + 1)
+        .returning(ChatSession.last_seq)
+    ).scalar_one()
+    message = ChatMessage(
+        session_id=session.id,
+        seq=seq,
+        sender_id=sender_id,
+        message_content=content,
+        moderation_result=moderation_result,
+        is_flagged=flagged,
+    )
+    db.add(message)
+    if not flagged:
+        db.flush()
+        sender_side = _side(session, sender_id)
+        recipient_side = 3 - sender_side
+        # Sending reads the session up to the new message; the recipient has one more unread
+        db.execute(update(ChatSession).where(ChatSession.id == session.id).values({
+            ChatSession.last_message_id: message.id,
+            ChatSession.last_message_preview: content[:PREVIEW_LENGTH],
+            ChatSession.last_activity_at: func.now(),
+            READ_SEQ[sender_side]: seq,
+            UNREAD_COUNT[sender_side]: 0,
+            UNREAD_COUNT[recipient_side]: UNREAD_COUNT[recipient_side] + 1,
+        }))
+    db.commit()
+    db.refresh(message)
+    return message
+
+
+def recent_history(db: Session, session_id: int, limit: int) -> List[Dict[str, Any]]:
+    """The last `limit` messages of a session, oldest first, as plain dicts for prompts."""
+    messages = db.query(ChatMessage)\
+        .filter(ChatMessage.session_id == session_id, ChatMessage.is_flagged == False)\
+        .order_by(ChatMessage.seq.desc())\
+        .limit(limit)\
+        .all()
+    return [{"sender_id": message.sender_id, "content": message.message_content} for message in reversed(messages)]
+
+
+# Columns of a message that history and sync return
+MESSAGE_COLUMNS = (
+    ChatMessage.id, ChatMessage.seq, ChatMessage.session_id, ChatMessage.sender_id,
+    ChatMessage.message_content, ChatMessage.is_flagged, ChatMessage.created_at,
+)
+
+
+def _visible_to(user_id: int):
+    # Flagged messages are only shown to their sender
+    return (ChatMessage.is_flagged == False) | (ChatMessage.sender_id == user_id)
+
+
+def read_watermarks(session: ChatSession, user_id: int) -> Tuple[int, int]:
+    """(how far user_id has read, how far the other participant has read)."""
+    if session.user_id_1 == user_id:
+        return session.read_seq_1, session.read_seq_2
+    return session.read_seq_2, session.read_seq_1
+
+
+def unread_count(session: ChatSession, user_id: int) -> int:
+    return session.unread_count_1 if session.user_id_1 == user_id else session.unread_count_2
+
+
+def mark_read(db: Session, session: ChatSession, user_id: int, seq: int) -> bool:
+    """Move user_id's read watermark up to seq and recount unread; False when nothing moved."""
+    side = _side(session, user_id)
+    # What stays unread is the other participant's visible messages past the new watermark
+    remaining = db.query(func.count(ChatMessage.id)).filter(
+        ChatMessage.session_id == session.id,
+        ChatMessage.seq > seq,
+        ChatMessage.sender_id == other_participant(session, user_id),
+        ChatMessage.is_flagged == False
+    ).scalar_subquery()
+    moved = db.query(ChatSession)\
+        .filter(ChatSession.id == session.id, READ_SEQ[side] < seq, ChatSession.last_seq >= seq)\
+        .update({READ_SEQ[side]: seq, UNREAD_COUNT[side]: remaining}, synchronize_session=False)
+    db.commit()
+    return bool(moved)
+
+
+def clear_history(db: Session, session: ChatSession):
+    """Delete every message of a session; seqs keep counting from last_seq."""
+    db.query(ChatMessage).filter(ChatMessage.session_id == session.id).delete(synchronize_session=False)
+    db.query(ChatSession).filter(ChatSession.id == session.id).update({
+        ChatSession.last_message_id: None,
+        ChatSession.last_message_preview: None,
+        ChatSession.read_seq_1: ChatSession.last_seq,
+        ChatSession.read_seq_2: ChatSession.last_seq,
+        ChatSession.unread_count_1: 0,
+        ChatSession.unread_count_2: 0,
+    }, synchronize_session=False)
+    db.commit()
+
+
+def inbox(db: Session, user_id: int) -> List[Tuple[ChatSession, Optional[str], Optional[str]]]:
+    """(session, other user's name, other user's picture) for user_id's active sessions, most recent first."""
+    other_id = case((ChatSession.user_id_1 == user_id, ChatSession.user_id_2), else_=ChatSession.user_id_1)
+    return db.query(ChatSession, User.full_name, User.profile_picture)\
+        .outerjoin(User, User.id == other_id)\
+        .filter(
+            (ChatSession.user_id_1 == user_id) | (ChatSession.user_id_2 == user_id),
+            ChatSession.is_active == True
+        )\
+        .order_by(ChatSession.last_activity_at.desc(), ChatSession.id.desc())\
+        .all()
+
+
+def history_page(
+    db: Session,
+    session_id: int,
+    viewer_id: int,
+    before: Optional[int] = None,
+    after: Optional[int] = None,
+    limit: int = 50,
+) -> Tuple[List[ChatMessage], bool]:
+    """One window of a session's history in seq order and whether more lies beyond it; flagged messages only reach their sender."""
+    query = db.query(ChatMessage)\
+        .options(load_only(*MESSAGE_COLUMNS))\
+        .filter(ChatMessage.session_id == session_id, _visible_to(viewer_id))
+    if before is not None:
+        query = query.filter(ChatMessage.seq < before)
+    if after is not None:
+        messages = query.filter(ChatMessage.seq > after).order_by(ChatMessage.seq.asc()).limit(limit + 1).all()
+    else:
+        messages = query.order_by(ChatMessage.seq.desc()).limit(limit + 1).all()
+    has_more = len(messages) > limit
+    messages = messages[:limit]
+    if after is None:
+        messages.reverse()
+    return messages, has_more
+
+
+def sync(
+    db: Session,
+    user_id: int,
+    known: Dict[int, int],
+    limit: int,
+    known_watermarks: Optional[Dict[int, Tuple[int, int]]] = None,
+) -> Tuple[List[Tuple[ChatSession, List[ChatMessage], bool]], List[int]]:
+    """(session, new messages, gap) for each session that changed since `known`/`known_watermarks`, plus removed ids."""
+    sessions = db.query(ChatSession).filter(
+        (ChatSession.user_id_1 == user_id) | (ChatSession.user_id_2 == user_id),
+        or_(ChatSession.is_active == True, ChatSession.id.in_(list(known)))
+    ).order_by(ChatSession.id).all()
+    removed = sorted(set(known) - {session.id for session in sessions})
+    known_watermarks = known_watermarks or {}
+    sessions = [
+        session for session in sessions
+        if not (
+            session.is_active
+            and session.id in known_watermarks
+            and session.last_seq == known.get(session.id)
+            and tuple(known_watermarks[session.id]) == read_watermarks(session, user_id)
+        )
+    ]
+
+    behind = [session for session in sessions if session.last_seq > known.get(session.id, 0)]
+    delta: Dict[int, List[ChatMessage]] = {session.id: [] for session in behind}
+    if behind:
+        rank = func.row_number().over(partition_by=ChatMessage.session_id, order_by=ChatMessage.seq.desc())
+        ranked = db.query(ChatMessage.id.label("id"), rank.label("rank"))\
+            .filter(
+                or_(*[
+                    and_(ChatMessage.session_id == session.id, ChatMessage.seq > known.get(session.id, 0))
+                    for session in behind
+                ]),
+                _visible_to(user_id)
+            ).subquery()
+        messages = db.query(ChatMessage)\
+            .options(load_only(*MESSAGE_COLUMNS))\
+            .join(ranked, ranked.c.id == ChatMessage.id)\
+            .filter(ranked.c.rank <= limit + 1)\
+            .order_by(ChatMessage.session_id, ChatMessage.seq)\
+            .all()
+        for message in messages:
+            delta[message.session_id].append(message)
+
+    result = []
+    for session in sessions:
+        messages = delta.get(session.id, [])
+        gap = len(messages) > limit
+        result.append((session, messages[1:] if gap else messages, gap))
+    return result, removed
+
+
+def message_payload(message: ChatMessage) -> Dict[str, Any]:
+    """Data of a chat_message frame."""
+    return {
+        "id": message.id,
+        "seq": message.seq,
+        "sessionId": message.session_id,
+        "senderId": message.sender_id,
+        "message": message.message_content,
+        "createdAt": message.created_at,
+    }
@@ -0,0 +1,121 @@
+# backend/app/services/compatibility_analysis.py
+"""LLM compatibility analyses for the best-ranked candidates, stored per pair until either user changes."""
+import asyncio
+import logging
+import weakref
+from typing import Dict, List, Optional
+from sqlalchemy import func, tuple_
+from sqlalchemy.orm import Session
+from app.core.config import settings
+from app.models.analysis import CompatibilityMatch
+from app.models.user import User
+from app.services.interest_index import interest_index
+from app.services.openai_service import OpenAIService
+from app.services.trait_store import trait_store
+
+logger = logging.getLogger(__name__)
+
+LLM_SOURCE = "llm"
+
+# asyncio primitives belong to one event loop
+_semaphores: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, asyncio.Semaphore]" = weakref.WeakKeyDictionary()
+
+
+def _llm_slots() -> asyncio.Semaphore:
+    loop = asyncio.get_running_loop()
+    semaphore = _semaphores.get(loop)
+    if semaphore is None:
+        semaphore = _semaphores[loop] = asyncio.Semaphore(settings.MATCHING_LLM_CONCURRENCY)
+    return semaphore
+
+
+def _pair(user_id: int, other_id: int):
+    return (user_id, other_id) if user_id < other_id else (other_id, user_id)
+
+
+def _profile(user: User) -> Dict:
+    return {
+        "age": user.age,
+        "gender": user.gender,
+        "location": user.location,
+        "bio": user.bio,
+        "interests": interest_index.get(user.id),
+        "trait_scores": trait_store.get(user.id) or {},
+    }
+
+
+def is_fresh(match: CompatibilityMatch, *users: User) -> bool:
+    return match.updated_at is not None and all(
+        user.updated_at is None or user.updated_at <= match.updated_at for user in users
+    )
+
+
+def latest_analyses(db: Session, user: User, others: List[User]) -> Dict[int, CompatibilityMatch]:
+    """Newest stored LLM analysis between user and each of others, fresh or not."""
+    if not others:
+        return {}
+    rows = db.query(CompatibilityMatch)\
+        .filter(tuple_(CompatibilityMatch.user_id_1, CompatibilityMatch.user_id_2).in_(
+            [_pair(user.id, other.id) for other in others]
+        ))\
+        .order_by(CompatibilityMatch.updated_at.desc(), CompatibilityMatch.id.desc())\
+        .all()
+    
+    latest = {}
+    for match in rows:
+        if (match.matching_factors or {}).get("source") != LLM_SOURCE:
+            continue
+        other_id = match.user_id_2 if match.user_id_1 == user.id else match.user_id_1
+        latest.setdefault(other_id, match)
+    return latest
+
+
+def fresh_analyses(db: Session, user: User, others: List[User]) -> Dict[int, CompatibilityMatch]:
+    others_by_id = {other.id: other for other in others}
+    return {
+        other_id: match
+        for other_id, match in latest_analyses(db, user, others).items()
+        if is_fresh(match, user, others_by_id[other_id])
+    }
+
+
+async def _analyze(user: User, other: User) -> Dict:
+    async with _llm_slots():
+        return await asyncio.wait_for(
+            OpenAIService.generate_compatibility_analysis(_profile(user), _profile(other)),
+            settings.MATCHING_LLM_TIMEOUT_SECONDS
+        )
+
+
+async def ensure_analyses(db: Session, user: User, others: List[User]) -> Dict[int, CompatibilityMatch]:
+    """Fresh analyses between user and each of others, generating missing or stale ones concurrently."""
+    others_by_id = {other.id: other for other in others}
+    latest = latest_analyses(db, user, others)
+    found = {
+        other_id: match for other_id, match in latest.items()
+        if is_fresh(match, user, others_by_id[other_id])
+    }
+    missing = [other for other in others if other.id not in found]
+    if not missing:
+        return found
+    
+    results = await asyncio.gather(*(_analyze(user, other) for other in missing), return_exceptions=True)
+    for other, result in zip(missing, results):
+        if isinstance(result, BaseException):
+            logger.warning("Compatibility analysis for %s and %s failed: %r", user.id, other.id, result)
+            continue
+        user_id_1, user_id_2 = _pair(user.id, other.id)
+        match = latest.get(other.id) or CompatibilityMatch(user_id_1=user_id_1, user_id_2=user_id_2)
+        match.compatibility_score = float(result.get("compatibility_score", 0.0))
+        match.analysis_summary = result.get("analysis_summary")
+        match.matching_factors = {
+            "source": LLM_SOURCE,
+            "strengths": result.get("strengths", []),
+            "considerations": result.get("considerations", []),
+        }
+        # Set explicitly: an unchanged re-analysis would otherwise not be written at all
+        match.updated_at = func.now()
+        db.add(match)
+        found[other.id] = match
+    db.commit()
+    return found
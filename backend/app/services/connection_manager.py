@@ -0,0 +1,181 @@
+# backend/app/services/connection_manager.py
+"""Registry of this worker's chat WebSockets, each with a bounded send queue, heartbeats and slow-consumer eviction."""
+import asyncio
+import json
+import logging
+import time
+from typing import Any, Dict, List, Optional, Set
+from fastapi import WebSocket
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+CLOSE_GOING_AWAY = 1001
+CLOSE_TRY_AGAIN_LATER = 1013
+
+
+class Connection:
+    __slots__ = ("websocket", "user_id", "queue", "writer", "last_seen", "closed", "sessions")
+
+    def __init__(self, websocket: WebSocket, user_id: int, queue_size: int):
+        self.websocket = websocket
+        self.user_id = user_id
+        self.queue: "asyncio.Queue[Optional[str]]" = asyncio.Queue(maxsize=queue_size)
+        self.writer: Optional[asyncio.Task] = None
+        self.last_seen = time.monotonic()
+        self.closed = False
+        # Chat session id -> other participant, filled as the user sends to sessions
+        self.sessions: Dict[int, int] = {}
+
+
+class ConnectionManager:
+    def __init__(
+        self,
+        queue_size: int,
+        send_timeout: float,
+        heartbeat_interval: float,
+        idle_timeout: float,
+    ):
+        self._connections: Dict[int, Set[Connection]] = {}
+        self._sweeper: Optional[asyncio.Task] = None
+        self._closing: Set[asyncio.Task] = set()
+        self.queue_size = queue_size
+        self.send_timeout = send_timeout
+        self.heartbeat_interval = heartbeat_interval
+        self.idle_timeout = idle_timeout
+        self.accepted = 0
+        self.frames_queued = 0
+        self.frames_sent = 0
+        self.slow_consumers = 0
+        self.idle_closed = 0
+
+    def __len__(self) -> int:
+        return sum(len(connections) for connections in self._connections.values())
+
+    async def connect(self, websocket: WebSocket, user_id: int) -> Connection:
+        await websocket.accept()
+        connection = Connection(websocket, user_id, self.queue_size)
+        connection.writer = asyncio.create_task(self._write(connection))
+        self._connections.setdefault(user_id, set()).add(connection)
+        self.accepted += 1
+        if self._sweeper is None or self._sweeper.done():
+            self._sweeper = asyncio.create_task(self._sweep())
+        return connection
+
+    def disconnect(self, connection: Connection):
+        """Forget a connection whose socket is gone; its writer is stopped."""
+        connection.closed = True
+        connections = self._connections.get(connection.user_id)
+        if connections is not None:
+            connections.discard(connection)
+            if not connections:
+                del self._connections[connection.user_id]
+        if connection.writer is not None and connection.writer is not asyncio.current_task():
+            connection.writer.cancel()
+
+    async def close(self, connection: Connection, code: int):
+        if connection.closed:
+            return
+        self.disconnect(connection)
+        await self._close_socket(connection.websocket, code)
+
+    def close_later(self, connection: Connection, code: int):
+        """Disconnect now and close the socket from a task of its own, so no caller waits on the peer."""
+        if connection.closed:
+            return
+        self.disconnect(connection)
+        task = asyncio.create_task(self._close_socket(connection.websocket, code))
+        self._closing.add(task)
+        task.add_done_callback(self._closing.discard)
+
+    async def _close_socket(self, websocket: WebSocket, code: int):
+        try:
+            # A stalled peer never acknowledges the close frame
+            await asyncio.wait_for(websocket.close(code=code), self.send_timeout)
+        except Exception:
+            # The client may already be gone
+            pass
+
+    def touch(self, connection: Connection):
+        connection.last_seen = time.monotonic()
+
+    def send(self, connection: Connection, frame: Dict[str, Any]) -> bool:
+        """Queue a frame for one connection; a full queue disconnects it as a slow consumer."""
+        if connection.closed:
+            return False
+        try:
+            connection.queue.put_nowait(json.dumps(frame, default=str))
+        except asyncio.QueueFull:
+            self.slow_consumers += 1
+            logger.info("Disconnecting slow consumer for user %s", connection.user_id)
+            self.close_later(connection, CLOSE_TRY_AGAIN_LATER)
+            return False
+        self.frames_queued += 1
+        return True
+
+    def send_to_user(self, user_id: int, frame: Dict[str, Any]) -> int:
+        """Queue a frame for every connection of user_id on this worker; returns how many took it."""
+        return sum(self.send(connection, frame) for connection in list(self._connections.get(user_id, ())))
+
+    def connections_of(self, user_id: int) -> List[Connection]:
+        return list(self._connections.get(user_id, ()))
+
+    def is_connected(self, user_id: int) -> bool:
+        return user_id in self._connections
+
+    async def _write(self, connection: Connection):
+        while True:
+            payload = await connection.queue.get()
+            try:
+                await asyncio.wait_for(connection.websocket.send_text(payload), self.send_timeout)
+            except asyncio.TimeoutError:
+                self.slow_consumers += 1
+                await self.close(connection, CLOSE_TRY_AGAIN_LATER)
+                return
+            except Exception:
+                self.disconnect(connection)
+                return
+            self.frames_sent += 1
+
+    async def _sweep(self):
+        while self._connections:
+            await asyncio.sleep(self.heartbeat_interval)
+            now = time.monotonic()
+            for connections in list(self._connections.values()):
+                for connection in list(connections):
+                    idle = now - connection.last_seen
+                    if idle >= self.idle_timeout:
+                        self.idle_closed += 1
+                        self.close_later(connection, CLOSE_GOING_AWAY)
+                    elif idle >= self.heartbeat_interval:
+                        self.send(connection, {"type": "ping", "data": {}, "timestamp": int(time.time() * 1000)})
+
+    async def close_all(self):
+        for connections in list(self._connections.values()):
+            for connection in list(connections):
+                self.close_later(connection, CLOSE_GOING_AWAY)
+        if self._sweeper is not None:
+            self._sweeper.cancel()
+            self._sweeper = None
+        if self._closing:
+            await asyncio.gather(*self._closing)
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "users": len(self._connections),
+            "connections": len(self),
+            "accepted": self.accepted,
+            "frames_queued": self.frames_queued,
+            "frames_sent": self.frames_sent,
+            "queued_now": sum(connection.queue.qsize() for connections in self._connections.values() for connection in connections),
+            "slow_consumers": self.slow_consumers,
+            "idle_closed": self.idle_closed,
+        }
+
+
+connection_manager = ConnectionManager(
+    queue_size=settings.CHAT_WS_SEND_QUEUE_SIZE,
+    send_timeout=settings.CHAT_WS_SEND_TIMEOUT_SECONDS,
+    heartbeat_interval=settings.CHAT_WS_HEARTBEAT_SECONDS,
+    idle_timeout=settings.CHAT_WS_IDLE_TIMEOUT_SECONDS,
+)
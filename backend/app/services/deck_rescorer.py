@@ -0,0 +1,133 @@
+# backend/app/services/deck_rescorer.py
+import logging
+import threading
+import time
+from collections import OrderedDict
+from typing import Callable, Dict, Hashable, Iterable, List, Optional
+from app.services.match_cache import MatchCache, match_cache
+
+logger = logging.getLogger(__name__)
+
+
+class DeckRescorer:
+    """Background re-scoring of the cached decks a change invalidated or that the changed user would now enter."""
+
+    def __init__(self, cache: MatchCache):
+        self._cache = cache
+        self._condition = threading.Condition()
+        self._pending: "OrderedDict[Hashable, int]" = OrderedDict()
+        self._newcomers: "OrderedDict[int, int]" = OrderedDict()
+        self._thread: Optional[threading.Thread] = None
+        self._running = False
+        self._rescore: Optional[Callable[[Hashable], None]] = None
+        self._admitting: Optional[Callable[[int], List[Hashable]]] = None
+        self.changes = 0
+        self.fanout_total = 0
+        self.fanout_max = 0
+        self.admitted = 0
+        self.rescored = 0
+        self.skipped = 0
+        self.failed = 0
+        self.rescore_seconds = 0.0
+
+    def start(self, rescore: Callable[[Hashable], None], admitting: Optional[Callable[[int], List[Hashable]]] = None):
+        with self._condition:
+            self._rescore = rescore
+            self._admitting = admitting
+            if self._running:
+                return
+            self._running = True
+            self._thread = threading.Thread(target=self._run, name="deck-rescorer", daemon=True)
+            self._thread.start()
+
+    def stop(self):
+        """Stop the worker; decks still queued are dropped and recomputed on demand."""
+        with self._condition:
+            self._running = False
+            self._pending.clear()
+            self._newcomers.clear()
+            self._condition.notify()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def changed(self, keys: Iterable[Hashable], epoch: int, user_id: Optional[int] = None):
+        """Record the fan-out of one profile change and queue its decks and the changed user."""
+        keys = list(keys)
+        with self._condition:
+            self.changes += 1
+            self.fanout_total += len(keys)
+            self.fanout_max = max(self.fanout_max, len(keys))
+            if not self._running:
+                return
+            self._queue(keys, epoch)
+            if user_id is not None and self._admitting is not None:
+                self._newcomers.pop(user_id, None)
+                self._newcomers[user_id] = epoch
+            self._condition.notify()
+
+    def _queue(self, keys: List[Hashable], epoch: int):
+        for key in keys:
+            self._pending.pop(key, None)
+            self._pending[key] = epoch
+
+    def _admit(self, user_id: int, epoch: int):
+        try:
+            keys = self._cache.invalidate_keys(self._admitting(user_id))
+        except Exception:
+            logger.exception("Finding decks user %s enters failed", user_id)
+            return
+        with self._condition:
+            self.admitted += len(keys)
+            self.fanout_total += len(keys)
+            self._queue(keys, epoch)
+
+    def _run(self):
+        while True:
+            with self._condition:
+                while self._running and not self._pending and not self._newcomers:
+                    self._condition.wait()
+                if not self._running:
+                    return
+                if self._newcomers:
+                    user_id, epoch = self._newcomers.popitem(last=False)
+                    key = None
+                else:
+                    key, epoch = self._pending.popitem(last=False)
+                rescore = self._rescore
+            
+            if key is None:
+                self._admit(user_id, epoch)
+                continue
+
+            cached_epoch = self._cache.epoch_of(key)
+            if cached_epoch is not None and cached_epoch >= epoch:
+                self.skipped += 1
+                continue
+            start = time.perf_counter()
+            try:
+                rescore(key)
+                self.rescored += 1
+            except Exception:
+                logger.exception("Re-scoring deck %s failed", key)
+                self.failed += 1
+            self.rescore_seconds += time.perf_counter() - start
+
+    def stats(self) -> Dict[str, float]:
+        with self._condition:
+            return {
+                "pending": len(self._pending),
+                "pending_newcomers": len(self._newcomers),
+                "changes": self.changes,
+                "fanout_total": self.fanout_total,
+                "fanout_max": self.fanout_max,
+                "fanout_mean": round(self.fanout_total / self.changes, 2) if self.changes else 0.0,
+                "admitted": self.admitted,
+                "rescored": self.rescored,
+                "skipped": self.skipped,
+                "failed": self.failed,
+                "mean_rescore_ms": round(self.rescore_seconds * 1000 / self.rescored, 3) if self.rescored else 0.0,
+            }
+
+
+deck_rescorer = DeckRescorer(match_cache)
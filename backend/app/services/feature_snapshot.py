@@ -0,0 +1,232 @@
+# backend/app/services/feature_snapshot.py
+"""Versioned, memory-mapped snapshots of the matching features, published through a CURRENT pointer file."""
+import json
+import mmap
+import os
+import numpy as np
+from typing import Dict, List, Optional, Tuple
+from app.services.matching_engine import STORE_DECIMALS, CandidateColumns
+
+MAGIC = b"MTCHFEAT"
+FORMAT_VERSION = 1
+POINTER_NAME = "CURRENT"
+ALIGNMENT = 64
+# Spare trait rows written past the last user so new analyses fill mapped rows
+# instead of forcing the store to copy its matrix into private memory
+TRAIT_HEADROOM_FRACTION = 0.125
+
+
+def _aligned(offset: int) -> int:
+    return (offset + ALIGNMENT - 1) // ALIGNMENT * ALIGNMENT
+
+
+def _file_name(version: int) -> str:
+    return f"features-{version:08d}.bin"
+
+
+def current_version(directory: str) -> int:
+    """Version named by the CURRENT pointer, or 0 when there is no snapshot yet."""
+    try:
+        with open(os.path.join(directory, POINTER_NAME)) as pointer_file:
+            name = pointer_file.read().strip()
+    except FileNotFoundError:
+        return 0
+    return int(name[len("features-"):-len(".bin")])
+
+
+class FeatureSnapshot:
+    """Read side of one snapshot file: numpy views over a single copy-on-write mmap."""
+
+    def __init__(self, path: str):
+        self.path = path
+        with open(path, "rb") as snapshot_file:
+            prefix = snapshot_file.read(16)
+            if prefix[:8] != MAGIC:
+                raise ValueError(f"{path} is not a feature snapshot")
+            format_version, header_length = np.frombuffer(prefix[8:], dtype="<u4")
+            if format_version != FORMAT_VERSION:
+                raise ValueError(f"Unsupported feature snapshot version in {path}")
+            header = json.loads(snapshot_file.read(int(header_length)))
+            # ACCESS_COPY pages are shared until written and writes never reach the file
+            self._mmap = mmap.mmap(snapshot_file.fileno(), 0, access=mmap.ACCESS_COPY)
+
+        self.version: int = header["version"]
+        self.created_at: float = header["created_at"]
+        self.trait_names: List[str] = header["trait_names"]
+        self.location_vocab: Dict[str, int] = header["location_vocab"]
+        self.gender_vocab: Dict[str, int] = header["gender_vocab"]
+        self.trait_count: int = header["trait_count"]
+        arrays = {
+            name: np.frombuffer(
+                self._mmap, dtype=spec["dtype"], count=int(np.prod(spec["shape"])), offset=spec["offset"]
+            ).reshape(spec["shape"])
+            for name, spec in header["arrays"].items()
+        }
+        self.user_ids = arrays["user_ids"]
+        self.is_active = arrays["is_active"].view(bool)
+        self.ages = arrays["ages"]
+        self.gender_codes = arrays["gender_codes"]
+        self.location_codes = arrays["location_codes"]
+        self.trait_rows = arrays["trait_rows"]
+        self.trait_user_ids = arrays["trait_user_ids"]
+        self.traits = arrays["traits"]
+        # NaN where a user has no coordinates; None in snapshots written without them
+        self.latitudes: Optional[np.ndarray] = arrays.get("latitudes")
+        self.longitudes: Optional[np.ndarray] = arrays.get("longitudes")
+        self.interest_names: List[str] = header.get("interest_names", [])
+        self._interest_offsets: Optional[np.ndarray] = arrays.get("interest_offsets")
+        self._interest_codes: Optional[np.ndarray] = arrays.get("interest_codes")
+        # IVFIndex.export() arrays over the trait rows, if the builder trained one
+        self.ann: Optional[Dict[str, np.ndarray]] = {
+            name[len("ann_"):]: array for name, array in arrays.items() if name.startswith("ann_")
+        } or None
+
+    def __len__(self) -> int:
+        return len(self.user_ids)
+
+    def population(self) -> CandidateColumns:
+        """Columns of the active users, in id order, as build_columns_from_store would give them."""
+        positions = np.flatnonzero(self.is_active)
+        trait_rows = self.trait_rows[positions]
+        has_analysis = trait_rows >= 0
+        traits = np.full((len(positions), len(self.trait_names)), np.nan)
+        traits[has_analysis] = np.round(self.traits[trait_rows[has_analysis]].astype(np.float64), STORE_DECIMALS)
+        return CandidateColumns(
+            self.user_ids[positions], self.ages[positions], self.location_codes[positions],
+            self.gender_codes[positions], traits, has_analysis,
+            self.location_vocab, self.gender_vocab, list(self.trait_names)
+        )
+
+    def user_interests(self) -> Optional[Dict[int, List[str]]]:
+        """Interest names per user id, or None when the snapshot was written without them."""
+        if self._interest_offsets is None:
+            return None
+        names = np.array(self.interest_names, dtype=object)
+        offsets = self._interest_offsets
+        return {
+            int(self.user_ids[position]): names[self._interest_codes[offsets[position]:offsets[position + 1]]].tolist()
+            for position in np.flatnonzero(np.diff(offsets))
+        }
+
+    def nbytes(self) -> int:
+        return len(self._mmap)
+
+
+def write_snapshot(
+    directory: str,
+    columns: CandidateColumns,
+    is_active: np.ndarray,
+    trait_user_ids: np.ndarray,
+    traits: np.ndarray,
+    trait_names: List[str],
+    created_at: float,
+    ann: Optional[Dict[str, np.ndarray]] = None,
+    coordinates: Optional[Tuple[np.ndarray, np.ndarray]] = None,
+    user_interests: Optional[Dict[int, List[str]]] = None,
+    keep: int = 2,
+) -> str:
+    """Write a new snapshot version and atomically swap CURRENT to it; returns its path."""
+    os.makedirs(directory, exist_ok=True)
+    order = np.argsort(columns.user_ids, kind="stable")
+    user_ids = np.asarray(columns.user_ids, dtype=np.int64)[order]
+    trait_user_ids = np.asarray(trait_user_ids, dtype=np.int64)
+    sorter = np.argsort(trait_user_ids)
+    positions = np.minimum(np.searchsorted(trait_user_ids[sorter], user_ids), max(len(sorter) - 1, 0))
+    trait_rows = np.full(len(user_ids), -1, dtype=np.int32)
+    if len(sorter):
+        found = trait_user_ids[sorter[positions]] == user_ids
+        trait_rows[found] = sorter[positions[found]]
+
+    capacity = len(trait_user_ids) + max(1024, int(len(trait_user_ids) * TRAIT_HEADROOM_FRACTION))
+    padded_traits = np.full((capacity, len(trait_names)), np.nan, dtype=np.float32)
+    padded_traits[:len(traits)] = traits
+    padded_user_ids = np.zeros(capacity, dtype=np.int64)
+    padded_user_ids[:len(trait_user_ids)] = trait_user_ids
+
+    arrays = {
+        "user_ids": user_ids,
+        "is_active": np.asarray(is_active, dtype=bool)[order].view(np.uint8),
+        "ages": np.asarray(columns.ages, dtype=np.float64)[order],
+        "gender_codes": np.asarray(columns.gender_codes, dtype=np.int32)[order],
+        "location_codes": np.asarray(columns.location_codes, dtype=np.int32)[order],
+        "trait_rows": trait_rows,
+        "trait_user_ids": padded_user_ids,
+        "traits": padded_traits,
+    }
+    if coordinates is not None:
+        arrays["latitudes"] = np.asarray(coordinates[0], dtype=np.float64)[order]
+        arrays["longitudes"] = np.asarray(coordinates[1], dtype=np.float64)[order]
+    interest_vocab: Dict[str, int] = {}
+    if user_interests is not None:
+        # CSR layout: the codes of user_ids[i] are interest_codes[offsets[i]:offsets[i + 1]]
+        codes, offsets = [], [0]
+        for user_id in user_ids.tolist():
+            for name in user_interests.get(user_id, ()):
+                codes.append(interest_vocab.setdefault(name, len(interest_vocab)))
+            offsets.append(len(codes))
+        arrays["interest_offsets"] = np.array(offsets, dtype=np.int64)
+        arrays["interest_codes"] = np.array(codes, dtype=np.int32)
+    if ann is not None:
+        for name in ("row_list", "row_position"):
+            # Padded like the traits so rows added later index into mapped pages too
+            padded = np.full(capacity, -1, dtype=np.int32)
+            padded[:len(ann[name])] = ann[name]
+            ann = dict(ann, **{name: padded})
+        arrays.update({f"ann_{name}": array for name, array in ann.items()})
+    version = current_version(directory) + 1
+    header = {
+        "version": version,
+        "created_at": created_at,
+        "trait_names": list(trait_names),
+        "trait_count": len(trait_user_ids),
+        "location_vocab": columns.location_vocab,
+        "gender_vocab": columns.gender_vocab,
+        "interest_names": list(interest_vocab),
+        "arrays": {},
+    }
+    # Offsets depend on the header length, so lay the arrays out until it is stable
+    header_length = 0
+    while True:
+        offset = _aligned(16 + header_length)
+        for name, array in arrays.items():
+            header["arrays"][name] = {"dtype": array.dtype.str, "shape": list(array.shape), "offset": offset}
+            offset = _aligned(offset + array.nbytes)
+        encoded = json.dumps(header).encode()
+        if len(encoded) == header_length:
+            break
+        header_length = len(encoded)
+
+    path = os.path.join(directory, _file_name(version))
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "wb") as snapshot_file:
+        snapshot_file.write(MAGIC + np.array([FORMAT_VERSION, header_length], dtype="<u4").tobytes() + encoded)
+        for name, array in arrays.items():
+            snapshot_file.seek(header["arrays"][name]["offset"])
+            snapshot_file.write(np.ascontiguousarray(array).tobytes())
+        snapshot_file.flush()
+        os.fsync(snapshot_file.fileno())
+    os.replace(tmp_path, path)
+
+    pointer_path = os.path.join(directory, POINTER_NAME)
+    with open(f"{pointer_path}.tmp", "w") as pointer_file:
+        pointer_file.write(_file_name(version))
+        pointer_file.flush()
+        os.fsync(pointer_file.fileno())
+    os.replace(f"{pointer_path}.tmp", pointer_path)
+
+    for old_version in range(version - keep, 0, -1):
+        old_path = os.path.join(directory, _file_name(old_version))
+        if not os.path.exists(old_path):
+            break
+        os.remove(old_path)
+    return path
+
+
+def open_current(directory: Optional[str]) -> Optional[FeatureSnapshot]:
+    """Map the snapshot CURRENT points at, or None when there is none."""
+    if not directory:
+        return None
+    version = current_version(directory)
+    if not version:
+        return None
+    return FeatureSnapshot(os.path.join(directory, _file_name(version)))
@@ -0,0 +1,151 @@
+# backend/app/services/geo.py
+import csv
+import math
+import os
+import threading
+import numpy as np
+from functools import lru_cache
+from typing import Dict, Optional, Tuple
+
+GAZETTEER_PATH = os.path.join(os.path.dirname(os.path.dirname(__file__)), "data", "gazetteer.csv")
+EARTH_RADIUS_KM = 6371.0088
+GEOHASH_ALPHABET = "0123456789bcdefghjkmnpqrstuvwxyz"
+
+Coordinates = Tuple[float, float]
+
+
+@lru_cache(maxsize=1)
+def _gazetteer() -> Dict[str, Coordinates]:
+    with open(GAZETTEER_PATH, newline="") as gazetteer_file:
+        return {
+            row["name"]: (float(row["latitude"]), float(row["longitude"]))
+            for row in csv.DictReader(gazetteer_file)
+        }
+
+
+@lru_cache(maxsize=65536)
+def resolve_location(location: Optional[str]) -> Optional[Coordinates]:
+    """Coordinates of a free-text User.location from the bundled gazetteer, or None for unknown places."""
+    if not location:
+        return None
+    normalized = " ".join(location.lower().split())
+    gazetteer = _gazetteer()
+    if normalized in gazetteer:
+        return gazetteer[normalized]
+    city = normalized.split(",")[0].strip()
+    return gazetteer.get(city)
+
+
+def geohash_encode(latitude: float, longitude: float, precision: int = 9) -> str:
+    lat_range, lon_range = [-90.0, 90.0], [-180.0, 180.0]
+    chars, bits, bit_count, even = [], 0, 0, True
+    while len(chars) < precision:
+        value_range, value = (lon_range, longitude) if even else (lat_range, latitude)
+        middle = (value_range[0] + value_range[1]) / 2
+        bits <<= 1
+        if value >= middle:
+            bits |= 1
+            value_range[0] = middle
+        else:
+            value_range[1] = middle
+        even = not even
+        bit_count += 1
+        if bit_count == 5:
+            chars.append(GEOHASH_ALPHABET[bits])
+            bits, bit_count = 0, 0
+    return "".join(chars)
+
+
+def haversine_km(latitude: float, longitude: float, latitudes: np.ndarray, longitudes: np.ndarray) -> np.ndarray:
+    """Great-circle distance from one point to many, in kilometres."""
+    lat1, lon1 = math.radians(latitude), math.radians(longitude)
+    lat2, lon2 = np.radians(latitudes), np.radians(longitudes)
+    a = np.sin((lat2 - lat1) / 2) ** 2 + math.cos(lat1) * np.cos(lat2) * np.sin((lon2 - lon1) / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * np.arcsin(np.sqrt(np.minimum(a, 1.0)))
+
+
+class GeoGridIndex:
+    """Grid-bucket index of user coordinates; radius queries scan the overlapping cells, then cut by exact distance."""
+
+    def __init__(self, cell_degrees: float = 0.5):
+        self._lock = threading.RLock()
+        self.cell_degrees = cell_degrees
+        self._buckets: Dict[Tuple[int, int], set] = {}
+        self._cell_by_user: Dict[int, Tuple[int, int]] = {}
+        # Coordinates indexed directly by user id so bucket contents gather without a Python loop
+        self._latitudes = np.full(1024, np.nan)
+        self._longitudes = np.full(1024, np.nan)
+        self._lon_cells = int(round(360.0 / cell_degrees))
+        self.is_warm = False
+
+    def __len__(self) -> int:
+        return len(self._cell_by_user)
+
+    def _cell(self, latitude: float, longitude: float) -> Tuple[int, int]:
+        lon_cell = int(math.floor((longitude + 180.0) / self.cell_degrees)) % self._lon_cells
+        return int(math.floor(latitude / self.cell_degrees)), lon_cell
+
+    def upsert(self, user_id: int, latitude: float, longitude: float):
+        with self._lock:
+            self.remove(user_id)
+            if user_id >= len(self._latitudes):
+                size = max(user_id + 1, len(self._latitudes) * 2)
+                self._latitudes = np.concatenate([self._latitudes, np.full(size - len(self._latitudes), np.nan)])
+                self._longitudes = np.concatenate([self._longitudes, np.full(size - len(self._longitudes), np.nan)])
+            cell = self._cell(latitude, longitude)
+            self._cell_by_user[user_id] = cell
+            self._latitudes[user_id] = latitude
+            self._longitudes[user_id] = longitude
+            self._buckets.setdefault(cell, set()).add(user_id)
+
+    def remove(self, user_id: int):
+        with self._lock:
+            cell = self._cell_by_user.pop(user_id, None)
+            if cell is not None:
+                bucket = self._buckets[cell]
+                bucket.discard(user_id)
+                if not bucket:
+                    del self._buckets[cell]
+                self._latitudes[user_id] = np.nan
+                self._longitudes[user_id] = np.nan
+
+    def within(self, latitude: float, longitude: float, radius_km: float) -> np.ndarray:
+        """Return ids of users within radius_km of the point."""
+        with self._lock:
+            lat_delta = math.degrees(radius_km / EARTH_RADIUS_KM)
+            low_row = self._cell(max(latitude - lat_delta, -90.0), 0.0)[0]
+            high_row = self._cell(min(latitude + lat_delta, 90.0), 0.0)[0]
+
+            # Widen the longitude window for the most poleward latitude in the box
+            cos_lat = math.cos(math.radians(min(abs(latitude) + lat_delta, 90.0)))
+            if cos_lat < 1e-6 or lat_delta / cos_lat >= 180.0:
+                lon_cells = set(range(self._lon_cells))
+            else:
+                lon_delta = lat_delta / cos_lat
+                first = int(math.floor((longitude - lon_delta + 180.0) / self.cell_degrees))
+                last = int(math.floor((longitude + lon_delta + 180.0) / self.cell_degrees))
+                lon_cells = {cell % self._lon_cells for cell in range(first, last + 1)}
+
+            user_ids = []
+            for lat_cell in range(low_row, high_row + 1):
+                for lon_cell in lon_cells:
+                    bucket = self._buckets.get((lat_cell, lon_cell))
+                    if bucket:
+                        user_ids.extend(bucket)
+
+            if not user_ids:
+                return np.empty(0, dtype=np.int64)
+            user_ids = np.array(user_ids, dtype=np.int64)
+            distances = haversine_km(latitude, longitude, self._latitudes[user_ids], self._longitudes[user_ids])
+            return np.sort(user_ids[distances <= radius_km])
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {
+                "users": len(self._cell_by_user),
+                "buckets": len(self._buckets),
+                "largest_bucket": max((len(bucket) for bucket in self._buckets.values()), default=0),
+            }
+
+
+geo_index = GeoGridIndex()
@@ -0,0 +1,211 @@
+# backend/app/services/interest_index.py
+import threading
+import numpy as np
+from typing import Dict, Iterable, List, Optional, Set
+
+# Containers switch from sorted arrays to bitsets above this cardinality, where a
+# 65536-bit bitset (8 KiB) becomes smaller than a uint16 array
+ARRAY_CONTAINER_LIMIT = 4096
+BITSET_WORDS = 65536 // 64
+
+
+def normalize_interest(name: str) -> str:
+    return " ".join(name.lower().split())
+
+
+def _bitset_from_array(values: np.ndarray) -> np.ndarray:
+    words = np.zeros(BITSET_WORDS, dtype=np.uint64)
+    np.bitwise_or.at(words, values >> 6, np.left_shift(np.uint64(1), (values & 63).astype(np.uint64)))
+    return words
+
+
+def _array_from_bitset(words: np.ndarray) -> np.ndarray:
+    bits = np.unpackbits(words.view(np.uint8), bitorder="little")
+    return np.flatnonzero(bits).astype(np.uint16)
+
+
+def _bitset_contains(words: np.ndarray, values: np.ndarray) -> np.ndarray:
+    values = values.astype(np.uint64)
+    return (words[values >> np.uint64(6)] >> (values & np.uint64(63))) & np.uint64(1) == 1
+
+
+def _normalize(container):
+    """Pick the smaller representation for a container; None when it is empty."""
+    if container.dtype == np.uint64:
+        cardinality = int(np.unpackbits(container.view(np.uint8)).sum())
+        if cardinality == 0:
+            return None
+        return _array_from_bitset(container) if cardinality <= ARRAY_CONTAINER_LIMIT else container
+    if not len(container):
+        return None
+    return _bitset_from_array(container) if len(container) > ARRAY_CONTAINER_LIMIT else container
+
+
+class Bitmap:
+    """Roaring-style bitmap of user ids: sorted uint16 arrays while sparse, 65536-bit bitsets once dense."""
+
+    __slots__ = ("_containers",)
+
+    def __init__(self):
+        self._containers: Dict[int, np.ndarray] = {}
+
+    @classmethod
+    def from_ids(cls, user_ids: Iterable[int]) -> "Bitmap":
+        bitmap = cls()
+        values = np.unique(np.fromiter(user_ids, dtype=np.int64))
+        highs = values >> 16
+        for high in np.unique(highs):
+            container = _normalize((values[highs == high] & 0xFFFF).astype(np.uint16))
+            if container is not None:
+                bitmap._containers[int(high)] = container
+        return bitmap
+
+    def __len__(self) -> int:
+        return sum(
+            int(np.unpackbits(container.view(np.uint8)).sum()) if container.dtype == np.uint64 else len(container)
+            for container in self._containers.values()
+        )
+
+    def add(self, user_id: int):
+        high, low = user_id >> 16, user_id & 0xFFFF
+        container = self._containers.get(high)
+        if container is None:
+            self._containers[high] = np.array([low], dtype=np.uint16)
+        elif container.dtype == np.uint64:
+            container[low >> 6] |= np.uint64(1) << np.uint64(low & 63)
+        else:
+            position = np.searchsorted(container, low)
+            if position == len(container) or container[position] != low:
+                self._containers[high] = _normalize(np.insert(container, position, low).astype(np.uint16))
+
+    def discard(self, user_id: int):
+        high, low = user_id >> 16, user_id & 0xFFFF
+        container = self._containers.get(high)
+        if container is None:
+            return
+        if container.dtype == np.uint64:
+            container[low >> 6] &= ~(np.uint64(1) << np.uint64(low & 63))
+            updated = _normalize(container)
+        else:
+            position = np.searchsorted(container, low)
+            if position == len(container) or container[position] != low:
+                return
+            updated = _normalize(np.delete(container, position))
+        if updated is None:
+            del self._containers[high]
+        else:
+            self._containers[high] = updated
+
+    def __and__(self, other: "Bitmap") -> "Bitmap":
+        result = Bitmap()
+        for high in self._containers.keys() & other._containers.keys():
+            left, right = self._containers[high], other._containers[high]
+            if left.dtype == np.uint64 and right.dtype == np.uint64:
+                container = left & right
+            elif left.dtype == np.uint64:
+                container = right[_bitset_contains(left, right)]
+            elif right.dtype == np.uint64:
+                container = left[_bitset_contains(right, left)]
+            else:
+                container = np.intersect1d(left, right, assume_unique=True)
+            container = _normalize(container)
+            if container is not None:
+                result._containers[high] = container
+        return result
+
+    def contains_many(self, user_ids: np.ndarray) -> np.ndarray:
+        """Vectorized membership test for an array of user ids."""
+        user_ids = np.asarray(user_ids, dtype=np.int64)
+        found = np.zeros(len(user_ids), dtype=bool)
+        highs = user_ids >> 16
+        for high in np.unique(highs):
+            container = self._containers.get(int(high))
+            if container is None:
+                continue
+            selected = highs == high
+            lows = (user_ids[selected] & 0xFFFF).astype(np.uint16)
+            if container.dtype == np.uint64:
+                found[selected] = _bitset_contains(container, lows)
+            else:
+                positions = np.minimum(np.searchsorted(container, lows), len(container) - 1)
+                found[selected] = container[positions] == lows
+        return found
+
+    def to_array(self) -> np.ndarray:
+        parts = []
+        for high in sorted(self._containers):
+            container = self._containers[high]
+            lows = _array_from_bitset(container) if container.dtype == np.uint64 else container
+            parts.append((np.int64(high) << 16) | lows.astype(np.int64))
+        return np.concatenate(parts) if parts else np.empty(0, dtype=np.int64)
+
+    @property
+    def nbytes(self) -> int:
+        return sum(container.nbytes for container in self._containers.values())
+
+
+class InterestIndex:
+    """Inverted index from normalized interest name to a Bitmap of user ids."""
+
+    def __init__(self):
+        self._lock = threading.RLock()
+        self._bitmaps: Dict[str, Bitmap] = {}
+        self._user_interests: Dict[int, List[str]] = {}
+        self.is_warm = False
+
+    def load(self, user_interests: Dict[int, List[str]]):
+        """Replace the index from a user id -> interest names mapping."""
+        with self._lock:
+            members: Dict[str, List[int]] = {}
+            self._user_interests = {}
+            for user_id, names in user_interests.items():
+                normalized = list(dict.fromkeys(normalize_interest(name) for name in names))
+                self._user_interests[user_id] = normalized
+                for name in normalized:
+                    members.setdefault(name, []).append(user_id)
+            self._bitmaps = {name: Bitmap.from_ids(user_ids) for name, user_ids in members.items()}
+
+    def set_user_interests(self, user_id: int, names: Iterable[str]):
+        with self._lock:
+            normalized = list(dict.fromkeys(normalize_interest(name) for name in names))
+            for name in set(self._user_interests.get(user_id, [])) - set(normalized):
+                self._bitmaps[name].discard(user_id)
+            for name in normalized:
+                self._bitmaps.setdefault(name, Bitmap()).add(user_id)
+            if normalized:
+                self._user_interests[user_id] = normalized
+            else:
+                self._user_interests.pop(user_id, None)
+
+    def get(self, user_id: int) -> List[str]:
+        return list(self._user_interests.get(user_id, []))
+
+    def users_with_all(self, names: Iterable[str]) -> np.ndarray:
+        """Sorted ids of users who list every one of the given interests."""
+        with self._lock:
+            result: Optional[Bitmap] = None
+            for name in {normalize_interest(name) for name in names}:
+                bitmap = self._bitmaps.get(name)
+                if bitmap is None:
+                    return np.empty(0, dtype=np.int64)
+                result = bitmap if result is None else result & bitmap
+            return result.to_array() if result is not None else np.empty(0, dtype=np.int64)
+
+    def shared_counts(self, user_id: int, candidate_ids: np.ndarray) -> np.ndarray:
+        """Number of interests each candidate shares with user_id."""
+        with self._lock:
+            counts = np.zeros(len(candidate_ids), dtype=np.int32)
+            for name in self._user_interests.get(user_id, []):
+                counts += self._bitmaps[name].contains_many(candidate_ids)
+            return counts
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {
+                "interests": len(self._bitmaps),
+                "users": len(self._user_interests),
+                "bitmap_bytes": sum(bitmap.nbytes for bitmap in self._bitmaps.values()),
+            }
+
+
+interest_index = InterestIndex()
@@ -0,0 +1,41 @@
+# backend/app/services/like_index.py
+import threading
+from typing import Dict, Iterable, Tuple
+
+
+class LikeIndex:
+    """Process-local set of (liker, likee) like edges packed into ints."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._edges = set()
+        self.is_warm = False
+
+    @staticmethod
+    def _pack(liker_id: int, likee_id: int) -> int:
+        return (liker_id << 32) | likee_id
+
+    def load(self, likes: Iterable[Tuple[int, int]]):
+        edges = {self._pack(liker_id, likee_id) for liker_id, likee_id in likes}
+        with self._lock:
+            self._edges = edges
+
+    def add(self, liker_id: int, likee_id: int):
+        with self._lock:
+            self._edges.add(self._pack(liker_id, likee_id))
+
+    def discard(self, liker_id: int, likee_id: int):
+        with self._lock:
+            self._edges.discard(self._pack(liker_id, likee_id))
+
+    def likes(self, liker_id: int, likee_id: int) -> bool:
+        return self._pack(liker_id, likee_id) in self._edges
+
+    def __len__(self) -> int:
+        return len(self._edges)
+
+    def stats(self) -> Dict[str, int]:
+        return {"likes": len(self._edges)}
+
+
+like_index = LikeIndex()
@@ -0,0 +1,190 @@
+# backend/app/services/match_cache.py
+import threading
+import time
+from collections import OrderedDict, deque
+from typing import Dict, Hashable, Iterable, List, Optional, Set, Tuple
+from app.core.config import settings
+from app.services.interest_index import normalize_interest
+from app.services.match_ranking import RankedCandidate
+
+
+class VersionRegistry:
+    """Process-local version counters per user, plus a population epoch and a log of recent bumps."""
+
+    def __init__(self, log_size: int = 4096):
+        self._lock = threading.Lock()
+        self._versions: Dict[int, int] = {}
+        self._recent: "deque[Tuple[int, int]]" = deque(maxlen=log_size)
+        self.epoch = 0
+
+    def bump(self, user_id: int) -> int:
+        with self._lock:
+            version = self._versions.get(user_id, 0) + 1
+            self._versions[user_id] = version
+            self.epoch += 1
+            self._recent.append((self.epoch, user_id))
+            return version
+
+    def get(self, user_id: int) -> int:
+        return self._versions.get(user_id, 0)
+
+    def changed_since(self, epoch: int) -> Optional[Set[int]]:
+        """Users bumped after `epoch`, or None when the log no longer reaches back that far."""
+        with self._lock:
+            if epoch >= self.epoch:
+                return set()
+            if not self._recent or self._recent[0][0] > epoch + 1:
+                return None
+            return {user_id for bump_epoch, user_id in self._recent if bump_epoch > epoch}
+
+
+class _Entry:
+    __slots__ = ("ranked", "epoch", "expires_at", "analyzed")
+
+    def __init__(self, ranked: List[RankedCandidate], epoch: int, expires_at: float, analyzed: bool):
+        self.ranked = ranked
+        self.epoch = epoch
+        self.expires_at = expires_at
+        # Whether the LLM stage has run on the top of the deck
+        self.analyzed = analyzed
+
+
+class MatchCache:
+    """LRU + TTL cache of ranked match decks, with a reverse index from user id to the decks they are in."""
+
+    def __init__(self, versions: VersionRegistry, max_entries: int, ttl_seconds: float, depth: int):
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[Hashable, _Entry]" = OrderedDict()
+        self._decks_by_user: Dict[int, Set[Hashable]] = {}
+        self.versions = versions
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.depth = depth
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.invalidations = 0
+
+    @staticmethod
+    def key(
+        user_id: int,
+        min_age: Optional[int] = None,
+        max_age: Optional[int] = None,
+        max_distance: Optional[float] = None,
+        interests: Optional[Iterable[str]] = None,
+    ) -> Tuple:
+        normalized_interests = tuple(sorted({normalize_interest(interest) for interest in interests or []}))
+        return (user_id, min_age, max_age, max_distance, normalized_interests)
+
+    @staticmethod
+    def _members(key: Hashable, entry: _Entry) -> Set[int]:
+        return {key[0]} | {user_id for _, user_id in entry.ranked}
+
+    def _remove(self, key: Hashable) -> _Entry:
+        entry = self._entries.pop(key)
+        for user_id in self._members(key, entry):
+            keys = self._decks_by_user.get(user_id)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self._decks_by_user[user_id]
+        return entry
+
+    def get(self, key: Hashable) -> Optional[List[RankedCandidate]]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            if entry.expires_at <= time.monotonic():
+                self._remove(key)
+                self.expirations += 1
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry.ranked
+
+    def epoch_of(self, key: Hashable) -> Optional[int]:
+        """Epoch the cached deck for key was computed at, without touching LRU order."""
+        with self._lock:
+            entry = self._entries.get(key)
+            return entry.epoch if entry is not None else None
+
+    def is_analyzed(self, key: Hashable) -> bool:
+        with self._lock:
+            entry = self._entries.get(key)
+            return entry is not None and entry.analyzed
+
+    def put(self, key: Hashable, ranked: List[RankedCandidate], epoch: int, analyzed: bool = False) -> bool:
+        """Store a deck computed at `epoch`, unless a user in it changed since; returns whether it was cached."""
+        with self._lock:
+            entry = _Entry(ranked, epoch, time.monotonic() + self.ttl_seconds, analyzed)
+            if epoch != self.versions.epoch:
+                changed = self.versions.changed_since(epoch)
+                if changed is None or changed & self._members(key, entry):
+                    return False
+            if key in self._entries:
+                self._remove(key)
+            self._entries[key] = entry
+            for user_id in self._members(key, entry):
+                self._decks_by_user.setdefault(user_id, set()).add(key)
+            while len(self._entries) > self.max_entries:
+                self._remove(next(iter(self._entries)))
+                self.evictions += 1
+            return True
+
+    def invalidate_user(self, user_id: int) -> List[Hashable]:
+        """Drop every deck user_id owns or appears in and return their keys."""
+        with self._lock:
+            keys = list(self._decks_by_user.get(user_id, ()))
+            for key in keys:
+                self._remove(key)
+            self.invalidations += len(keys)
+            return keys
+
+    def admission_scores(self) -> List[Tuple[Hashable, float]]:
+        """(key, score a newcomer must reach to enter the deck) for every live deck; -inf while not full."""
+        with self._lock:
+            now = time.monotonic()
+            return [
+                (key, entry.ranked[-1][0] if len(entry.ranked) >= self.depth else float("-inf"))
+                for key, entry in self._entries.items()
+                if entry.expires_at > now
+            ]
+
+    def invalidate_keys(self, keys: Iterable[Hashable]) -> List[Hashable]:
+        """Drop the given decks that are still cached and return their keys."""
+        with self._lock:
+            dropped = [key for key in keys if key in self._entries]
+            for key in dropped:
+                self._remove(key)
+            self.invalidations += len(dropped)
+            return dropped
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._decks_by_user.clear()
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "indexed_users": len(self._decks_by_user),
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "expirations": self.expirations,
+                "invalidations": self.invalidations,
+            }
+
+
+profile_versions = VersionRegistry()
+match_cache = MatchCache(
+    profile_versions,
+    max_entries=settings.MATCH_CACHE_MAX_ENTRIES,
+    ttl_seconds=settings.MATCH_CACHE_TTL_SECONDS,
+    depth=settings.MATCH_CACHE_DEPTH,
+)
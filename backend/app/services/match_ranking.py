@@ -0,0 +1,53 @@
+# backend/app/services/match_ranking.py
+import base64
+import heapq
+import json
+import numpy as np
+from typing import List, Optional, Tuple
+
+# (score, user_id) ordered by score descending, then user id ascending
+RankedCandidate = Tuple[float, int]
+
+
+def encode_cursor(score: float, user_id: int) -> str:
+    """Opaque cursor pointing just past (score, user_id) in ranking order."""
+    payload = json.dumps([repr(float(score)), int(user_id)]).encode()
+    return base64.urlsafe_b64encode(payload).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> RankedCandidate:
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        score, user_id = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        return float(score), int(user_id)
+    except (ValueError, TypeError):
+        raise ValueError("Invalid cursor")
+
+
+def after_cursor(user_ids: np.ndarray, scores: np.ndarray, cursor: Optional[RankedCandidate]) -> np.ndarray:
+    """Boolean mask of candidates ranked strictly after cursor."""
+    if cursor is None:
+        return np.ones(len(user_ids), dtype=bool)
+    score, user_id = cursor
+    return (scores < score) | ((scores == score) & (user_ids > user_id))
+
+
+def select_top_k(
+    user_ids: np.ndarray,
+    scores: np.ndarray,
+    k: int,
+    cursor: Optional[RankedCandidate] = None,
+) -> List[RankedCandidate]:
+    """The k best (score, user_id) pairs after cursor, selected with a bounded min-heap."""
+    if k <= 0:
+        return []
+    mask = after_cursor(user_ids, scores, cursor)
+    heap: List[Tuple[float, int]] = []
+    # Heap items are (score, -user_id) so the heap root is the current worst entry
+    for score, user_id in zip(scores[mask].tolist(), user_ids[mask].tolist()):
+        item = (score, -user_id)
+        if len(heap) < k:
+            heapq.heappush(heap, item)
+        elif item > heap[0]:
+            heapq.heapreplace(heap, item)
+    return [(score, -negated_id) for score, negated_id in sorted(heap, reverse=True)]
@@ -0,0 +1,142 @@
+# backend/app/services/match_sync.py
+"""Keeps every worker's in-memory matching state in step with writes, over the chat backplane."""
+import asyncio
+import logging
+import uuid
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+from app.core.config import settings
+from app.models.user import User
+from app.services import feature_snapshot
+from app.services.ann_index import trait_index
+from app.services.chat_backplane import chat_backplane
+from app.services.geo import geo_index, geohash_encode, resolve_location
+from app.services.interest_index import interest_index
+from app.services.deck_rescorer import deck_rescorer
+from app.services.like_index import like_index
+from app.services.match_cache import match_cache, profile_versions
+from app.services.seen_filter import seen_filter
+from app.services.trait_store import trait_store
+
+logger = logging.getLogger(__name__)
+
+MATCHING_CHANNEL = "matching:changes"
+# Tells this worker's own changes apart when the backplane echoes them back
+WORKER_ID = uuid.uuid4().hex
+
+
+def replace_traits(refill: Callable[[], Any], snapshot=None, changed_user_ids: Iterable[int] = ()):
+    """Run refill, which replaces the trait store contents, and re-index them (see IVFIndex.rebuild)."""
+    if settings.MATCHING_ANN_ENABLED:
+        trait_index.rebuild(refill, snapshot, changed_user_ids)
+    else:
+        refill()
+
+
+def load_traits(rows: Iterable[Tuple[int, Optional[Dict[str, float]]]]):
+    for user_id, traits in rows:
+        trait_store.upsert(user_id, traits)
+        if settings.MATCHING_ANN_ENABLED:
+            trait_index.upsert(user_id)
+
+
+def _user_changed(user_id: int):
+    """Bump the user's version and queue re-scoring of the cached decks they are in or may now enter."""
+    profile_versions.bump(user_id)
+    deck_rescorer.changed(match_cache.invalidate_user(user_id), profile_versions.epoch, user_id)
+
+
+def _publish(kind: str, **data):
+    if chat_backplane.started:
+        chat_backplane.publish(MATCHING_CHANNEL, {"type": kind, "origin": WORKER_ID, "data": data}, ())
+
+
+def _apply_traits(user_id: int, traits: Optional[Dict[str, float]]):
+    load_traits([(user_id, traits)])
+    _user_changed(user_id)
+
+
+def _apply_interests(user_id: int, interests: List[str]):
+    interest_index.set_user_interests(user_id, interests)
+    _user_changed(user_id)
+
+
+def _apply_profile(user_id: int, is_active: bool, latitude: Optional[float], longitude: Optional[float]):
+    if not is_active:
+        trait_index.remove(user_id)
+    elif settings.MATCHING_ANN_ENABLED and user_id in trait_store and user_id not in trait_index:
+        trait_index.upsert(user_id)
+    
+    if is_active and latitude is not None and longitude is not None:
+        geo_index.upsert(user_id, latitude, longitude)
+    else:
+        geo_index.remove(user_id)
+    _user_changed(user_id)
+
+
+def _apply_swipe(user_id: int, target_user_id: int, action: str):
+    if action == "like":
+        like_index.add(user_id, target_user_id)
+    else:
+        like_index.discard(user_id, target_user_id)
+    seen_filter.add(user_id, target_user_id)
+
+
+def traits_changed(user_id: int, traits: Optional[Dict[str, float]]):
+    _apply_traits(user_id, traits)
+    _publish("traits", userId=user_id, traits=traits)
+
+
+def interests_changed(user_id: int, interests: List[str]):
+    _apply_interests(user_id, interests)
+    _publish("interests", userId=user_id, interests=list(interests))
+
+
+def profile_changed(user: User):
+    _apply_profile(user.id, bool(user.is_active), user.latitude, user.longitude)
+    _publish("profile", userId=user.id, isActive=bool(user.is_active), latitude=user.latitude, longitude=user.longitude)
+
+
+def swiped(user_id: int, target_user_id: int, action: str):
+    """A like, dislike or unmatch: hide the profile from the feed and update the like edge."""
+    _apply_swipe(user_id, target_user_id, action)
+    _publish("swipe", userId=user_id, targetUserId=target_user_id, action=action)
+
+
+def apply_remote(frame: Dict[str, Any], user_ids: List[int]):
+    """Backplane handler for MATCHING_CHANNEL: apply a change made by another worker."""
+    if frame.get("origin") == WORKER_ID:
+        return
+    data = frame["data"]
+    kind = frame["type"]
+    if kind == "traits":
+        _apply_traits(data["userId"], data["traits"])
+    elif kind == "interests":
+        _apply_interests(data["userId"], data["interests"])
+    elif kind == "profile":
+        _apply_profile(data["userId"], data["isActive"], data["latitude"], data["longitude"])
+    elif kind == "swipe":
+        _apply_swipe(data["userId"], data["targetUserId"], data["action"])
+
+
+async def follow_snapshots(reload: Callable[[], bool], interval: float):
+    """Run reload (in a thread) whenever a rebuild has moved the snapshot's CURRENT pointer."""
+    while True:
+        await asyncio.sleep(interval)
+        version = feature_snapshot.current_version(settings.FEATURE_SNAPSHOT_DIR)
+        if not version or version == trait_store.snapshot_version:
+            continue
+        try:
+            if await asyncio.to_thread(reload):
+                logger.info("Re-mapped feature snapshot version %d", version)
+        except Exception:
+            logger.exception("Re-mapping feature snapshot version %d failed", version)
+
+
+def apply_location(user: User):
+    """Resolve user.location to stored coordinates; unknown places clear them."""
+    coordinates = resolve_location(user.location)
+    if coordinates is None:
+        user.latitude = user.longitude = user.geohash = None
+    else:
+        user.latitude, user.longitude = coordinates
+        user.geohash = geohash_encode(*coordinates)
@@ -0,0 +1,198 @@
+# backend/app/services/matching_engine.py
+import numpy as np
+from typing import Dict, List, Optional, Sequence
+from app.core.config import settings
+from app.models.user import User
+
+# Canonical trait ordering produced by OpenAIService.analyze_text. Traits outside
+# this list are appended to the column vocabulary in first-seen order.
+BASE_TRAITS = ("openness", "conscientiousness", "extraversion", "agreeableness", "neuroticism")
+
+MISSING_CODE = -1
+
+# Decimal places trait scores survive a float32 round trip with
+STORE_DECIMALS = 6
+
+
+class CandidateColumns:
+    """Column arrays of a candidate population; missing values are NaN or MISSING_CODE, as in the scalar path."""
+
+    def __init__(
+        self,
+        user_ids: np.ndarray,
+        ages: np.ndarray,
+        location_codes: np.ndarray,
+        gender_codes: np.ndarray,
+        traits: np.ndarray,
+        has_analysis: np.ndarray,
+        location_vocab: Dict[str, int],
+        gender_vocab: Dict[str, int],
+        trait_names: List[str],
+    ):
+        self.user_ids = user_ids
+        self.ages = ages
+        self.location_codes = location_codes
+        self.gender_codes = gender_codes
+        self.traits = traits
+        self.has_analysis = has_analysis
+        self.location_vocab = location_vocab
+        self.gender_vocab = gender_vocab
+        self.trait_names = trait_names
+
+    def __len__(self) -> int:
+        return len(self.user_ids)
+
+    def take(self, positions: np.ndarray) -> "CandidateColumns":
+        """Subset of the population at the given row positions, sharing vocabularies."""
+        return CandidateColumns(
+            self.user_ids[positions], self.ages[positions], self.location_codes[positions],
+            self.gender_codes[positions], self.traits[positions], self.has_analysis[positions],
+            self.location_vocab, self.gender_vocab, self.trait_names
+        )
+
+
+def _encode(value: Optional[str], vocab: Dict[str, int]) -> int:
+    if not value:
+        return MISSING_CODE
+    key = value.lower()
+    code = vocab.get(key)
+    if code is None:
+        code = len(vocab)
+        vocab[key] = code
+    return code
+
+
+def build_trait_names(trait_maps: Sequence[Optional[Dict[str, float]]]) -> List[str]:
+    names = list(BASE_TRAITS)
+    seen = set(names)
+    for traits in trait_maps:
+        for trait in traits or {}:
+            if trait not in seen:
+                seen.add(trait)
+                names.append(trait)
+    return names
+
+
+def trait_vector(traits: Optional[Dict[str, float]], trait_names: Sequence[str]) -> np.ndarray:
+    vector = np.full(len(trait_names), np.nan)
+    for index, trait in enumerate(trait_names):
+        if traits and trait in traits:
+            vector[index] = traits[trait]
+    return vector
+
+
+def _demographic_columns(users: Sequence[User]):
+    count = len(users)
+    user_ids = np.empty(count, dtype=np.int64)
+    ages = np.full(count, np.nan)
+    location_codes = np.empty(count, dtype=np.int32)
+    gender_codes = np.empty(count, dtype=np.int32)
+    location_vocab: Dict[str, int] = {}
+    gender_vocab: Dict[str, int] = {}
+
+    for row, user in enumerate(users):
+        user_ids[row] = user.id
+        if user.age:
+            ages[row] = user.age
+        location_codes[row] = _encode(user.location, location_vocab)
+        gender_codes[row] = _encode(user.gender, gender_vocab)
+
+    return user_ids, ages, location_codes, gender_codes, location_vocab, gender_vocab
+
+
+def build_columns(
+    users: Sequence[User],
+    trait_scores: Dict[int, Optional[Dict[str, float]]],
+    trait_names: Optional[List[str]] = None,
+) -> CandidateColumns:
+    """Load candidate demographics and trait scores (user id -> latest trait_scores) into column arrays."""
+    if trait_names is None:
+        trait_names = build_trait_names(trait_scores.values())
+    trait_index = {trait: index for index, trait in enumerate(trait_names)}
+
+    user_ids, ages, location_codes, gender_codes, location_vocab, gender_vocab = _demographic_columns(users)
+    traits = np.full((len(users), len(trait_names)), np.nan)
+    has_analysis = np.zeros(len(users), dtype=bool)
+
+    for row, user in enumerate(users):
+        if user.id in trait_scores:
+            has_analysis[row] = True
+            for trait, score in (trait_scores[user.id] or {}).items():
+                if trait in trait_index:
+                    traits[row, trait_index[trait]] = score
+
+    return CandidateColumns(
+        user_ids, ages, location_codes, gender_codes, traits, has_analysis,
+        location_vocab, gender_vocab, list(trait_names)
+    )
+
+
+def build_columns_from_store(users: Sequence[User], store) -> CandidateColumns:
+    """Like build_columns, but gathers trait rows from a TraitStore instead of JSON."""
+    user_ids, ages, location_codes, gender_codes, location_vocab, gender_vocab = _demographic_columns(users)
+    traits, has_analysis = store.gather(user_ids)
+    # float32 keeps ~7 significant digits; rounding recovers the float64 scores the
+    # analyses were written with, so rankings match the scalar path
+    traits = np.round(traits.astype(np.float64), STORE_DECIMALS)
+    return CandidateColumns(
+        user_ids, ages, location_codes, gender_codes, traits, has_analysis,
+        location_vocab, gender_vocab, list(store.trait_names[:traits.shape[1]])
+    )
+
+
+def score_demographics(user: User, columns: CandidateColumns) -> np.ndarray:
+    """Vectorized equivalent of calculate_demographic_compatibility."""
+    scores = np.zeros(len(columns))
+
+    if user.age:
+        age_diff = np.abs(columns.ages - user.age)
+        # NaN ages compare False on both bands, matching the scalar truthiness check
+        scores += np.where(age_diff <= 5, 0.3, np.where(age_diff <= 10, 0.15, 0.0))
+
+    if user.location:
+        code = columns.location_vocab.get(user.location.lower(), MISSING_CODE)
+        if code != MISSING_CODE:
+            scores += np.where(columns.location_codes == code, 0.2, 0.0)
+
+    if user.gender:
+        code = columns.gender_vocab.get(user.gender.lower(), MISSING_CODE)
+        if code != MISSING_CODE:
+            scores += np.where(columns.gender_codes == code, 0.1, 0.0)
+
+    return scores
+
+
+def score_personality(
+    traits: Optional[Dict[str, float]],
+    columns: CandidateColumns,
+    has_analysis: bool = True,
+) -> np.ndarray:
+    """Vectorized equivalent of calculate_personality_compatibility."""
+    if not has_analysis or not len(columns):
+        return np.zeros(len(columns))
+
+    current = trait_vector(traits, columns.trait_names)
+    diff = np.abs(columns.traits.astype(np.float64, copy=False) - current)
+    # Traits missing on either side are NaN and drop out like the scalar set intersection
+    terms = np.where(np.isnan(diff), 0.0, (1 - diff) * 0.1)
+    scores = np.minimum(terms.sum(axis=1), 0.5)
+    return np.where(columns.has_analysis, scores, 0.0)
+
+
+def score_interests(shared_counts: np.ndarray) -> np.ndarray:
+    """Vectorized equivalent of calculate_interest_compatibility, from shared interest counts."""
+    return np.minimum(shared_counts * settings.MATCHING_INTEREST_BONUS, settings.MATCHING_INTEREST_BONUS_MAX)
+
+
+def score_candidates(
+    user: User,
+    traits: Optional[Dict[str, float]],
+    columns: CandidateColumns,
+    has_analysis: bool = True,
+    shared_interests: Optional[np.ndarray] = None,
+) -> np.ndarray:
+    """Vectorized equivalent of calculate_compatibility; shared_interests are per-candidate shared interest counts."""
+    scores = score_demographics(user, columns) + score_personality(traits, columns, has_analysis)
+    if shared_interests is not None:
+        scores = scores + score_interests(shared_interests)
+    return np.minimum(scores, 1.0)
@@ -0,0 +1,97 @@
+# backend/app/services/pair_cache.py
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, Iterable, Optional, Tuple
+from app.core.config import settings
+from app.services.match_cache import VersionRegistry, profile_versions
+from app.services.match_ranking import RankedCandidate
+
+
+class PairScoreCache:
+    """Size-capped LRU of symmetric pair scores, dropped once either user's version moves or the TTL passes."""
+
+    def __init__(self, versions: VersionRegistry, max_entries: int, ttl_seconds: float):
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[Tuple[int, int], Tuple[float, int, int, float]]" = OrderedDict()
+        self.versions = versions
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    def _lookup(self, user_id: int, other_id: int) -> Optional[float]:
+        low, high = (user_id, other_id) if user_id < other_id else (other_id, user_id)
+        entry = self._entries.get((low, high))
+        if entry is None:
+            return None
+        score, low_version, high_version, expires_at = entry
+        if expires_at <= time.monotonic():
+            del self._entries[(low, high)]
+            self.expirations += 1
+            return None
+        if low_version != self.versions.get(low) or high_version != self.versions.get(high):
+            del self._entries[(low, high)]
+            return None
+        self._entries.move_to_end((low, high))
+        return score
+
+    def _store(self, user_id: int, other_id: int, score: float):
+        low, high = (user_id, other_id) if user_id < other_id else (other_id, user_id)
+        self._entries[(low, high)] = (
+            score, self.versions.get(low), self.versions.get(high), time.monotonic() + self.ttl_seconds
+        )
+        self._entries.move_to_end((low, high))
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def get(self, user_id: int, other_id: int) -> Optional[float]:
+        with self._lock:
+            score = self._lookup(user_id, other_id)
+            if score is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+            return score
+
+    def get_many(self, user_id: int, other_ids: Iterable[int]) -> Dict[int, float]:
+        """Return cached scores between user_id and each of other_ids; misses are omitted."""
+        with self._lock:
+            found = {}
+            for other_id in other_ids:
+                score = self._lookup(user_id, other_id)
+                if score is None:
+                    self.misses += 1
+                else:
+                    self.hits += 1
+                    found[other_id] = score
+            return found
+
+    def put(self, user_id: int, other_id: int, score: float):
+        with self._lock:
+            self._store(user_id, other_id, score)
+
+    def put_many(self, user_id: int, ranked: Iterable[RankedCandidate]):
+        with self._lock:
+            for score, other_id in ranked:
+                self._store(user_id, other_id, score)
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "expirations": self.expirations,
+            }
+
+
+pair_cache = PairScoreCache(
+    profile_versions,
+    max_entries=settings.PAIR_CACHE_MAX_ENTRIES,
+    ttl_seconds=settings.PAIR_CACHE_TTL_SECONDS,
+)
@@ -0,0 +1,225 @@
+# backend/app/services/scoring_pipeline.py
+"""Staged candidate scoring for the match feed: filters, scorers, a top-k selector and re-rankers."""
+import inspect
+import threading
+import time
+import numpy as np
+from typing import Any, Dict, List, Optional
+from sqlalchemy.orm import Query, Session
+from app.core.config import settings
+from app.models.user import User
+from app.services import compatibility_analysis, matching_engine, sql_scoring
+from app.services.interest_index import interest_index
+from app.services.match_ranking import RankedCandidate, select_top_k
+from app.services.seen_filter import seen_filter
+from app.services.trait_store import trait_store
+
+
+class MatchContext:
+    """Inputs shared by every stage of one ranking request."""
+
+    def __init__(
+        self,
+        user: User,
+        db: Session,
+        query: Optional[Query],
+        k: int,
+        after: Optional[RankedCandidate] = None,
+    ):
+        self.user = user
+        self.db = db
+        self.query = query
+        self.k = k
+        self.after = after
+        self.traits = trait_store.get(user.id)
+        self.has_analysis = user.id in trait_store
+
+
+class CandidateBatch:
+    """Candidates moving through a pipeline: scored columns, then a ranked list."""
+
+    def __init__(self, columns: Optional[matching_engine.CandidateColumns] = None):
+        self.columns = columns
+        self.scores = np.zeros(len(columns)) if columns is not None else None
+        self.ranked: Optional[List[RankedCandidate]] = None
+
+    def __len__(self) -> int:
+        if self.ranked is not None:
+            return len(self.ranked)
+        return len(self.columns) if self.columns is not None else 0
+
+    def take(self, positions: np.ndarray):
+        self.columns = self.columns.take(positions)
+        self.scores = self.scores[positions]
+
+
+class Stage:
+    name = "stage"
+    kind = "scorer"
+
+    def process(self, context: MatchContext, batch: CandidateBatch):
+        raise NotImplementedError
+
+
+class PipelineMetrics:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._stages: Dict[str, Dict[str, float]] = {}
+
+    def record(self, stage: Stage, candidates_in: int, candidates_out: int, seconds: float):
+        with self._lock:
+            metrics = self._stages.setdefault(stage.name, {
+                "kind": stage.kind, "calls": 0, "candidates_in": 0, "candidates_out": 0,
+                "total_ms": 0.0, "max_ms": 0.0,
+            })
+            metrics["calls"] += 1
+            metrics["candidates_in"] += candidates_in
+            metrics["candidates_out"] += candidates_out
+            metrics["total_ms"] += seconds * 1000
+            metrics["max_ms"] = max(metrics["max_ms"], seconds * 1000)
+
+    def stats(self) -> Dict[str, Dict[str, Any]]:
+        with self._lock:
+            return {
+                name: dict(
+                    metrics,
+                    total_ms=round(metrics["total_ms"], 3),
+                    max_ms=round(metrics["max_ms"], 3),
+                    mean_ms=round(metrics["total_ms"] / metrics["calls"], 3),
+                    mean_candidates_in=round(metrics["candidates_in"] / metrics["calls"], 1),
+                    mean_candidates_out=round(metrics["candidates_out"] / metrics["calls"], 1),
+                )
+                for name, metrics in self._stages.items()
+            }
+
+
+class Pipeline:
+    def __init__(self, stages: List[Stage], metrics: PipelineMetrics):
+        self.stages = stages
+        self.metrics = metrics
+
+    async def run(self, context: MatchContext, ranked: Optional[List[RankedCandidate]] = None) -> List[RankedCandidate]:
+        batch = CandidateBatch()
+        batch.ranked = ranked
+        for stage in self.stages:
+            candidates_in = len(batch)
+            start = time.perf_counter()
+            result = stage.process(context, batch)
+            if inspect.isawaitable(result):
+                await result
+            self.metrics.record(stage, candidates_in, len(batch), time.perf_counter() - start)
+        return batch.ranked or []
+
+
+class LoadCandidates(Stage):
+    """Runs the filtered candidate query and gathers traits from the trait store."""
+    name = "load_candidates"
+    kind = "filter"
+
+    def process(self, context, batch):
+        candidates = context.query.all()
+        batch.columns = matching_engine.build_columns_from_store(candidates, trait_store)
+        batch.scores = np.zeros(len(batch.columns))
+
+
+class ExcludeSeen(Stage):
+    name = "exclude_seen"
+    kind = "filter"
+
+    def process(self, context, batch):
+        batch.take(np.flatnonzero(~seen_filter.seen_mask(context.user.id, batch.columns.user_ids)))
+
+
+class Scorer(Stage):
+    """Adds a signal to candidate scores; with top_n, only the current best top_n are kept and scored."""
+
+    def __init__(self, top_n: Optional[int] = None):
+        self.top_n = top_n
+
+    def process(self, context, batch):
+        if self.top_n is not None and len(batch) > self.top_n:
+            batch.take(np.argpartition(-batch.scores, self.top_n - 1)[:self.top_n])
+        batch.scores = batch.scores + self.score(context, batch.columns)
+
+    def score(self, context: MatchContext, columns: matching_engine.CandidateColumns) -> np.ndarray:
+        raise NotImplementedError
+
+
+class DemographicScorer(Scorer):
+    name = "demographics"
+
+    def score(self, context, columns):
+        return matching_engine.score_demographics(context.user, columns)
+
+
+class PersonalityScorer(Scorer):
+    name = "personality"
+
+    def score(self, context, columns):
+        return matching_engine.score_personality(context.traits, columns, context.has_analysis)
+
+
+class InterestScorer(Scorer):
+    name = "interests"
+
+    def score(self, context, columns):
+        return matching_engine.score_interests(interest_index.shared_counts(context.user.id, columns.user_ids))
+
+
+class SelectTopK(Stage):
+    """Caps scores at 1.0 like calculate_compatibility and keeps the ranked top k after the cursor."""
+    name = "select_top_k"
+    kind = "selector"
+
+    def process(self, context, batch):
+        batch.ranked = select_top_k(batch.columns.user_ids, np.minimum(batch.scores, 1.0), context.k, context.after)
+
+
+class SqlRank(Stage):
+    """Scores and ranks inside the database (MATCHING_ENGINE=sql)."""
+    name = "sql_rank"
+    kind = "selector"
+
+    def process(self, context, batch):
+        user_id = context.user.id
+        batch.ranked = sql_scoring.rank(
+            context.query, context.user, context.traits, context.has_analysis, context.k, context.after,
+            exclude=lambda candidate_ids: seen_filter.seen_mask(user_id, candidate_ids)
+        )
+
+
+class CompatibilityAnalysis(Stage):
+    """LLM compatibility analysis of the top_n of a first page, optionally blended into their scores."""
+    name = "llm_analysis"
+    kind = "reranker"
+
+    def __init__(self, top_n: int, rerank_weight: float = 0.0):
+        self.top_n = top_n
+        self.rerank_weight = rerank_weight
+
+    async def process(self, context, batch):
+        if not self.top_n or context.after is not None or not batch.ranked:
+            return
+        head = batch.ranked[:self.top_n]
+        others = context.db.query(User).filter(User.id.in_([user_id for _, user_id in head])).all()
+        analyses = await compatibility_analysis.ensure_analyses(context.db, context.user, others)
+        
+        if self.rerank_weight:
+            weight = self.rerank_weight
+            blended = [
+                ((1 - weight) * score + weight * analyses[user_id].compatibility_score, user_id)
+                if user_id in analyses else (score, user_id)
+                for score, user_id in head
+            ]
+            batch.ranked = sorted(blended + batch.ranked[self.top_n:], key=lambda candidate: (-candidate[0], candidate[1]))
+
+
+pipeline_metrics = PipelineMetrics()
+llm_stage = CompatibilityAnalysis(settings.MATCHING_LLM_TOP_N, settings.MATCHING_LLM_RERANK_WEIGHT)
+numpy_pipeline = Pipeline(
+    [LoadCandidates(), ExcludeSeen(), DemographicScorer(), PersonalityScorer(), InterestScorer(), SelectTopK()],
+    pipeline_metrics,
+)
+sql_pipeline = Pipeline([SqlRank()], pipeline_metrics)
+# Run by find_matches on the page it serves, never while a deck is being ranked
+analysis_pipeline = Pipeline([llm_stage], pipeline_metrics)
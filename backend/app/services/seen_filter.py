@@ -0,0 +1,166 @@
+# backend/app/services/seen_filter.py
+import math
+import threading
+import numpy as np
+from typing import Dict, Iterable, List, Optional
+from app.core.config import settings
+
+_GOLDEN = np.uint64(0x9E3779B97F4A7C15)
+# Each new layer of a scalable filter gets a tighter error rate so the compound
+# false-positive rate stays under the configured one
+_TIGHTENING = 0.5
+
+
+def _mix64(values: np.ndarray) -> np.ndarray:
+    """splitmix64 finalizer, vectorized over uint64 values."""
+    with np.errstate(over="ignore"):
+        z = values + _GOLDEN
+        z = (z ^ (z >> np.uint64(30))) * np.uint64(0xBF58476D1CE4E5B9)
+        z = (z ^ (z >> np.uint64(27))) * np.uint64(0x94D049BB133111EB)
+        return z ^ (z >> np.uint64(31))
+
+
+class BloomFilter:
+    """Fixed-capacity Bloom filter over integer ids using double hashing."""
+
+    __slots__ = ("capacity", "error_rate", "bit_count", "hash_count", "count", "_bits")
+
+    def __init__(self, capacity: int, error_rate: float):
+        self.capacity = capacity
+        self.error_rate = error_rate
+        self.bit_count = max(64, int(math.ceil(-capacity * math.log(error_rate) / math.log(2) ** 2)))
+        self.hash_count = max(1, int(round(self.bit_count / capacity * math.log(2))))
+        self.count = 0
+        self._bits = np.zeros((self.bit_count + 7) // 8, dtype=np.uint8)
+
+    def _positions(self, ids: np.ndarray) -> np.ndarray:
+        values = np.asarray(ids, dtype=np.int64).astype(np.uint64)
+        first = _mix64(values)
+        second = _mix64(values ^ _GOLDEN) | np.uint64(1)
+        rounds = np.arange(self.hash_count, dtype=np.uint64)
+        with np.errstate(over="ignore"):
+            hashes = first[:, None] + rounds[None, :] * second[:, None]
+        return (hashes % np.uint64(self.bit_count)).astype(np.int64)
+
+    def add_many(self, ids: np.ndarray):
+        positions = self._positions(ids).ravel()
+        np.bitwise_or.at(self._bits, positions >> 3, (1 << (positions & 7)).astype(np.uint8))
+        self.count += len(ids)
+
+    def contains_many(self, ids: np.ndarray) -> np.ndarray:
+        positions = self._positions(ids)
+        return ((self._bits[positions >> 3] >> (positions & 7)) & 1).all(axis=1)
+
+    @property
+    def nbytes(self) -> int:
+        return self._bits.nbytes
+
+
+class ScalableBloomFilter:
+    """Bloom filter that grows by appending layers of doubling capacity."""
+
+    __slots__ = ("error_rate", "_layers")
+
+    def __init__(self, initial_capacity: int, error_rate: float):
+        self.error_rate = error_rate
+        self._layers: List[BloomFilter] = [BloomFilter(initial_capacity, error_rate * (1 - _TIGHTENING))]
+
+    def add_many(self, ids: np.ndarray):
+        ids = np.asarray(ids, dtype=np.int64)
+        while len(ids):
+            layer = self._layers[-1]
+            if layer.count >= layer.capacity:
+                layer = BloomFilter(layer.capacity * 2, layer.error_rate * _TIGHTENING)
+                self._layers.append(layer)
+            room = layer.capacity - layer.count
+            layer.add_many(ids[:room])
+            ids = ids[room:]
+
+    def contains_many(self, ids: np.ndarray) -> np.ndarray:
+        ids = np.asarray(ids, dtype=np.int64)
+        found = np.zeros(len(ids), dtype=bool)
+        for layer in self._layers:
+            found |= layer.contains_many(ids)
+        return found
+
+    def __len__(self) -> int:
+        return sum(layer.count for layer in self._layers)
+
+    @property
+    def nbytes(self) -> int:
+        return sum(layer.nbytes for layer in self._layers)
+
+    @property
+    def layer_count(self) -> int:
+        return len(self._layers)
+
+
+class SeenFilter:
+    """Process-local per-user Bloom filters of swiped user ids (false positives only, at up to error_rate)."""
+
+    def __init__(self, error_rate: float, initial_capacity: int):
+        self._lock = threading.Lock()
+        self._filters: Dict[int, ScalableBloomFilter] = {}
+        self.error_rate = error_rate
+        self.initial_capacity = initial_capacity
+        self.is_warm = False
+
+    def _new_filter(self, expected: int) -> ScalableBloomFilter:
+        capacity = self.initial_capacity
+        while capacity < expected:
+            capacity *= 2
+        return ScalableBloomFilter(capacity, self.error_rate)
+
+    def load(self, user_id: int, swiped_ids: Iterable[int]):
+        """Replace a user's filter with one sized for swiped_ids."""
+        ids = np.fromiter(swiped_ids, dtype=np.int64)
+        seen = self._new_filter(len(ids))
+        seen.add_many(ids)
+        with self._lock:
+            self._filters[user_id] = seen
+
+    def clear(self):
+        with self._lock:
+            self._filters = {}
+
+    def add(self, user_id: int, swiped_id: int):
+        with self._lock:
+            seen = self._filters.get(user_id)
+            if seen is None:
+                seen = self._filters[user_id] = self._new_filter(0)
+            seen.add_many(np.array([swiped_id], dtype=np.int64))
+
+    def seen_mask(self, user_id: int, candidate_ids: np.ndarray) -> np.ndarray:
+        """True for candidates user_id has (probably) swiped on already."""
+        with self._lock:
+            seen = self._filters.get(user_id)
+            if seen is None:
+                return np.zeros(len(candidate_ids), dtype=bool)
+            return seen.contains_many(candidate_ids)
+
+    def memory_stats(self, user_id: Optional[int] = None) -> Dict[str, float]:
+        """Memory used by one user's filter, or totals across users."""
+        with self._lock:
+            if user_id is not None:
+                seen = self._filters.get(user_id)
+                return {
+                    "swipes": len(seen) if seen else 0,
+                    "layers": seen.layer_count if seen else 0,
+                    "bytes": seen.nbytes if seen else 0,
+                    "error_rate": self.error_rate,
+                }
+            sizes = [seen.nbytes for seen in self._filters.values()]
+            return {
+                "users": len(sizes),
+                "swipes": sum(len(seen) for seen in self._filters.values()),
+                "bytes": sum(sizes),
+                "mean_bytes_per_user": sum(sizes) / len(sizes) if sizes else 0,
+                "max_bytes_per_user": max(sizes, default=0),
+                "error_rate": self.error_rate,
+            }
+
+
+seen_filter = SeenFilter(
+    error_rate=settings.SEEN_FILTER_ERROR_RATE,
+    initial_capacity=settings.SEEN_FILTER_INITIAL_CAPACITY,
+)
@@ -0,0 +1,157 @@
+# backend/app/services/sql_scoring.py
+"""SQL counterpart of calculate_compatibility, for ranking inside the database (MATCHING_ENGINE=sql)."""
+from typing import Callable, Dict, List, Optional
+import numpy as np
+from sqlalchemy import Float, and_, case, cast, func, literal, or_, select
+from sqlalchemy.orm import Query, Session, aliased
+from app.core.config import settings
+from app.models.analysis import UserTraitVector
+from app.models.interest import UserInterest
+from app.models.user import User
+from app.services.match_ranking import RankedCandidate
+from app.services.matching_engine import BASE_TRAITS
+
+
+def supports(traits: Optional[Dict[str, float]]) -> bool:
+    """Only the five trait columns are scored in SQL; other traits need the in-process engine."""
+    return all(trait in BASE_TRAITS for trait in traits or {})
+
+
+def store_trait_vector(db: Session, user_id: int, traits: Optional[Dict[str, float]]):
+    """Mirror a user's latest analysis into user_trait_vectors (flushed with the caller's commit)."""
+    traits = traits or {}
+    db.merge(UserTraitVector(
+        user_id=user_id,
+        extra_traits={trait: score for trait, score in traits.items() if trait not in BASE_TRAITS},
+        **{trait: traits.get(trait) for trait in BASE_TRAITS}
+    ))
+
+
+def _float(value: float):
+    # A bare 0.3 is exact numeric on Postgres; sums of those would not round like Python floats
+    return cast(literal(value), Float)
+
+
+def _cap(expression, limit: float):
+    return case((expression > limit, _float(limit)), else_=expression)
+
+
+def _interest_bonus(user_id, other_id):
+    """Bounded bonus for the interests two users (ids or id columns) share, like calculate_interest_compatibility."""
+    own, other = aliased(UserInterest), aliased(UserInterest)
+    shared = select(func.count())\
+        .select_from(own)\
+        .join(other, other.interest_id == own.interest_id)\
+        .where(own.user_id == user_id, other.user_id == other_id)\
+        .scalar_subquery()
+    return _cap(shared * _float(settings.MATCHING_INTEREST_BONUS), settings.MATCHING_INTEREST_BONUS_MAX)
+
+
+def compatibility_expression(
+    user: User,
+    traits: Optional[Dict[str, float]],
+    has_analysis: bool = True,
+):
+    """Score expression for candidates outer-joined to UserTraitVector; lower() folds ASCII only."""
+    score = _float(0.0)
+    
+    if user.age:
+        age_diff = func.abs(User.age - user.age)
+        score = score + case(
+            (and_(User.age.isnot(None), User.age != 0, age_diff <= 5), _float(0.3)),
+            (and_(User.age.isnot(None), User.age != 0, age_diff <= 10), _float(0.15)),
+            else_=_float(0.0)
+        )
+    if user.location:
+        score = score + case((func.lower(User.location) == user.location.lower(), _float(0.2)), else_=_float(0.0))
+    if user.gender:
+        score = score + case((func.lower(User.gender) == user.gender.lower(), _float(0.1)), else_=_float(0.0))
+    
+    if has_analysis:
+        personality = _float(0.0)
+        for trait in BASE_TRAITS:
+            if traits and trait in traits:
+                column = getattr(UserTraitVector, trait)
+                personality = personality + case(
+                    (column.isnot(None), (1 - func.abs(column - _float(traits[trait]))) * _float(0.1)),
+                    else_=_float(0.0)
+                )
+        # Candidates without an analysis have no vector row and score no personality terms
+        score = score + case(
+            (UserTraitVector.user_id.isnot(None), _cap(personality, 0.5)),
+            else_=_float(0.0)
+        )
+    if settings.MATCHING_INTEREST_BONUS:
+        score = score + _interest_bonus(user.id, User.id)
+    
+    return _cap(score, 1.0)
+
+
+def pair_compatibility_expression(user, vector, other, other_vector):
+    """compatibility_expression for two aliased User rows and their outer-joined UserTraitVector aliases."""
+    score = _float(0.0)
+    
+    both_aged = and_(user.age.isnot(None), user.age != 0, other.age.isnot(None), other.age != 0)
+    age_diff = func.abs(user.age - other.age)
+    score = score + case(
+        (and_(both_aged, age_diff <= 5), _float(0.3)),
+        (and_(both_aged, age_diff <= 10), _float(0.15)),
+        else_=_float(0.0)
+    )
+    for field, weight in (("location", 0.2), ("gender", 0.1)):
+        column, other_column = getattr(user, field), getattr(other, field)
+        score = score + case(
+            (and_(column != "", func.lower(column) == func.lower(other_column)), _float(weight)),
+            else_=_float(0.0)
+        )
+    
+    personality = _float(0.0)
+    for trait in BASE_TRAITS:
+        column, other_column = getattr(vector, trait), getattr(other_vector, trait)
+        personality = personality + case(
+            (and_(column.isnot(None), other_column.isnot(None)), (1 - func.abs(column - other_column)) * _float(0.1)),
+            else_=_float(0.0)
+        )
+    score = score + case(
+        (and_(vector.user_id.isnot(None), other_vector.user_id.isnot(None)), _cap(personality, 0.5)),
+        else_=_float(0.0)
+    )
+    if settings.MATCHING_INTEREST_BONUS:
+        score = score + _interest_bonus(user.id, other.id)
+    
+    return _cap(score, 1.0)
+
+
+def rank(
+    query: Query,
+    user: User,
+    traits: Optional[Dict[str, float]],
+    has_analysis: bool,
+    k: int,
+    after: Optional[RankedCandidate] = None,
+    exclude: Optional[Callable[[np.ndarray], np.ndarray]] = None,
+) -> List[RankedCandidate]:
+    """Best k (score, user_id) pairs of a filtered User query, ranked in the database; `exclude` masks ids to skip."""
+    score = compatibility_expression(user, traits, has_analysis).label("score")
+    scored = query\
+        .outerjoin(UserTraitVector, UserTraitVector.user_id == User.id)\
+        .with_entities(User.id, score)\
+        .order_by(score.desc(), User.id.asc())
+    
+    ranked: List[RankedCandidate] = []
+    while len(ranked) < k:
+        page = scored
+        if after is not None:
+            page = page.filter(or_(score < _float(after[0]), and_(score == _float(after[0]), User.id > after[1])))
+        wanted = k - len(ranked)
+        rows = page.limit(wanted).all()
+        candidates = [(float(row_score), row_id) for row_id, row_score in rows]
+        if exclude is not None and candidates:
+            excluded = exclude(np.array([row_id for _, row_id in candidates], dtype=np.int64))
+            ranked.extend(candidate for candidate, skip in zip(candidates, excluded.tolist()) if not skip)
+        else:
+            ranked.extend(candidates)
+        if len(rows) < wanted:
+            break
+        after = candidates[-1]
+    return ranked
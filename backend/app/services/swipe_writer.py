@@ -0,0 +1,241 @@
+# backend/app/services/swipe_writer.py
+import logging
+import threading
+import time
+from collections import OrderedDict
+from typing import Callable, Dict, List, Optional, Tuple
+from sqlalchemy import and_, delete, select, text, tuple_
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.orm import Session, aliased
+from app.core.config import settings
+from app.db.session import SessionLocal
+from app.models.analysis import UserTraitVector
+from app.models.swipe import Swipe, MutualMatch
+from app.models.user import User
+from app.services.sql_scoring import pair_compatibility_expression
+
+logger = logging.getLogger(__name__)
+
+SWIPE_ACTIONS = ("like", "dislike", "unmatch")
+
+
+class SwipeEvent:
+    __slots__ = ("swiper_id", "swipee_id", "action", "match_score")
+
+    def __init__(self, swiper_id: int, swipee_id: int, action: str, match_score: Optional[float] = None):
+        self.swiper_id = swiper_id
+        self.swipee_id = swipee_id
+        self.action = action
+        # Set on likes that complete a mutual match
+        self.match_score = match_score
+
+
+def _insert(session: Session, table):
+    dialect = postgresql if session.bind.dialect.name == "postgresql" else sqlite
+    return dialect.insert(table)
+
+
+def _lock_pairs(session: Session, pairs: List[Tuple[int, int]]):
+    """Serialize batches writing both halves of a pair with transaction-scoped advisory locks (Postgres only)."""
+    if session.bind.dialect.name != "postgresql":
+        return
+    keys = sorted({min(a, b) << 32 | max(a, b) for a, b in pairs})
+    session.execute(
+        text("SELECT pg_advisory_xact_lock(key) FROM unnest(CAST(:keys AS bigint[])) AS key"),
+        {"keys": keys}
+    )
+
+
+def _insert_reciprocal_matches(session: Session, likes: List[Tuple[int, int]]):
+    """INSERT ... SELECT the mutual matches the likes complete, scored in SQL; existing matches are kept."""
+    like, reverse = aliased(Swipe), aliased(Swipe)
+    user, other = aliased(User), aliased(User)
+    vector, other_vector = aliased(UserTraitVector), aliased(UserTraitVector)
+    pairs = likes + [(swipee_id, swiper_id) for swiper_id, swipee_id in likes]
+    reciprocal = select(
+        like.swiper_id, like.swipee_id,
+        pair_compatibility_expression(user, vector, other, other_vector)
+    )\
+        .join(reverse, and_(
+            reverse.swiper_id == like.swipee_id, reverse.swipee_id == like.swiper_id, reverse.action == "like"
+        ))\
+        .join(user, user.id == like.swiper_id)\
+        .join(other, other.id == like.swipee_id)\
+        .outerjoin(vector, vector.user_id == like.swiper_id)\
+        .outerjoin(other_vector, other_vector.user_id == like.swipee_id)\
+        .where(like.action == "like", tuple_(like.swiper_id, like.swipee_id).in_(pairs))
+    session.execute(
+        _insert(session, MutualMatch.__table__)
+        .from_select(["user_id", "matched_user_id", "compatibility_score"], reciprocal)
+        .on_conflict_do_nothing()
+    )
+
+
+class SwipeWriter:
+    """Buffers swipe events and group-commits them from a background thread; unflushed events are lost if the process dies."""
+
+    def __init__(
+        self,
+        session_factory: Callable[[], Session],
+        max_batch: int,
+        flush_interval: float,
+    ):
+        self._session_factory = session_factory
+        self._condition = threading.Condition()
+        self._pending: "OrderedDict[Tuple[int, int], SwipeEvent]" = OrderedDict()
+        self._thread: Optional[threading.Thread] = None
+        self._running = False
+        # Serializes batch writes between the background thread and flush() callers
+        self._write_lock = threading.Lock()
+        self.max_batch = max_batch
+        self.flush_interval = flush_interval
+        self.submitted = 0
+        self.deduplicated = 0
+        self.written = 0
+        self.batches = 0
+        self.failed = 0
+
+    def start(self):
+        with self._condition:
+            if self._running:
+                return
+            self._running = True
+            self._thread = threading.Thread(target=self._run, name="swipe-writer", daemon=True)
+            self._thread.start()
+
+    def stop(self):
+        with self._condition:
+            self._running = False
+            self._condition.notify()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+        self.flush()
+
+    def submit(self, event: SwipeEvent):
+        with self._condition:
+            key = (event.swiper_id, event.swipee_id)
+            if key in self._pending:
+                del self._pending[key]
+                self.deduplicated += 1
+            self._pending[key] = event
+            self.submitted += 1
+            if len(self._pending) >= self.max_batch:
+                self._condition.notify()
+        if not self._running:
+            self.start()
+
+    def flush(self):
+        """Write everything buffered so far before returning."""
+        while True:
+            with self._condition:
+                batch = self._take()
+            if not batch:
+                return
+            self._write(batch)
+
+    def _take(self) -> List[SwipeEvent]:
+        """Pop up to max_batch of the oldest buffered events."""
+        batch = []
+        while self._pending and len(batch) < self.max_batch:
+            batch.append(self._pending.popitem(last=False)[1])
+        return batch
+
+    def _run(self):
+        while True:
+            with self._condition:
+                deadline = time.monotonic() + self.flush_interval
+                while self._running and len(self._pending) < self.max_batch:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        break
+                    self._condition.wait(remaining)
+                if not self._running:
+                    return
+                batch = self._take()
+            self._write(batch)
+
+    def _write(self, batch: List[SwipeEvent]):
+        if not batch:
+            return
+        with self._write_lock:
+            try:
+                self._write_batch(batch)
+            except Exception:
+                logger.exception("Swipe batch of %d failed; retrying events one by one", len(batch))
+                # Isolate the events that cannot be written (e.g. a user deleted meanwhile)
+                for event in batch:
+                    try:
+                        self._write_batch([event])
+                    except Exception:
+                        logger.exception("Dropping swipe %s -> %s", event.swiper_id, event.swipee_id)
+                        self.failed += 1
+
+    def _write_batch(self, batch: List[SwipeEvent]):
+        session = self._session_factory()
+        try:
+            likes = [(event.swiper_id, event.swipee_id) for event in batch if event.action == "like"]
+            if likes:
+                _lock_pairs(session, likes)
+            
+            swipes = [
+                {
+                    "swiper_id": event.swiper_id,
+                    "swipee_id": event.swipee_id,
+                    "action": "like" if event.action == "like" else "dislike",
+                }
+                for event in batch
+            ]
+            upsert = _insert(session, Swipe.__table__).values(swipes)
+            session.execute(upsert.on_conflict_do_update(
+                index_elements=["swiper_id", "swipee_id"],
+                set_={"action": upsert.excluded.action, "created_at": upsert.excluded.created_at}
+            ))
+            
+            matches = [
+                {"user_id": user_id, "matched_user_id": matched_user_id, "compatibility_score": event.match_score}
+                for event in batch if event.action == "like" and event.match_score is not None
+                for user_id, matched_user_id in ((event.swiper_id, event.swipee_id), (event.swipee_id, event.swiper_id))
+            ]
+            if matches:
+                session.execute(_insert(session, MutualMatch.__table__).values(matches).on_conflict_do_nothing())
+            # The reverse like may have been buffered in another worker when the request checked
+            if likes:
+                _insert_reciprocal_matches(session, likes)
+            
+            unmatched = [
+                pair
+                for event in batch if event.action == "unmatch"
+                for pair in ((event.swiper_id, event.swipee_id), (event.swipee_id, event.swiper_id))
+            ]
+            if unmatched:
+                session.execute(delete(MutualMatch).where(
+                    tuple_(MutualMatch.user_id, MutualMatch.matched_user_id).in_(unmatched)
+                ))
+            
+            session.commit()
+            self.written += len(batch)
+            self.batches += 1
+        except Exception:
+            session.rollback()
+            raise
+        finally:
+            session.close()
+
+    def stats(self) -> Dict[str, int]:
+        with self._condition:
+            return {
+                "pending": len(self._pending),
+                "submitted": self.submitted,
+                "deduplicated": self.deduplicated,
+                "written": self.written,
+                "batches": self.batches,
+                "failed": self.failed,
+            }
+
+
+swipe_writer = SwipeWriter(
+    SessionLocal,
+    max_batch=settings.SWIPE_BATCH_SIZE,
+    flush_interval=settings.SWIPE_FLUSH_INTERVAL_SECONDS,
+)
@@ -0,0 +1,202 @@
+# backend/app/services/trait_store.py
+import os
+import threading
+import time
+import numpy as np
+from typing import Dict, Iterable, Optional, Tuple
+from app.services.matching_engine import BASE_TRAITS, STORE_DECIMALS
+
+SNAPSHOT_FORMAT_VERSION = 1
+
+
+class TraitStore:
+    """Process-local float32 matrix of every user's latest trait scores (NaN where missing), indexed by user id."""
+
+    def __init__(self, trait_names: Iterable[str] = BASE_TRAITS, capacity: int = 1024):
+        self._lock = threading.RLock()
+        self.trait_names = list(trait_names)
+        self._trait_index = {trait: index for index, trait in enumerate(self.trait_names)}
+        self._matrix = np.full((capacity, len(self.trait_names)), np.nan, dtype=np.float32)
+        self._row_user_ids = np.zeros(capacity, dtype=np.int64)
+        self._row_by_user = np.full(capacity, -1, dtype=np.int32)
+        self._size = 0
+        # Version of the FeatureSnapshot the matrix is mapped from, if any
+        self.snapshot_version: Optional[int] = None
+        self.is_warm = False
+
+    def __len__(self) -> int:
+        return self._size
+
+    def __contains__(self, user_id: int) -> bool:
+        return self._row(user_id) >= 0
+
+    def _row(self, user_id: int) -> int:
+        if 0 <= user_id < len(self._row_by_user):
+            return int(self._row_by_user[user_id])
+        return -1
+
+    def _ensure_user_capacity(self, user_id: int):
+        if user_id >= len(self._row_by_user):
+            grown = np.full(max(user_id + 1, len(self._row_by_user) * 2), -1, dtype=np.int32)
+            grown[:len(self._row_by_user)] = self._row_by_user
+            self._row_by_user = grown
+
+    def _ensure_row_capacity(self):
+        if self._size == len(self._matrix):
+            capacity = len(self._matrix) * 2
+            matrix = np.full((capacity, len(self.trait_names)), np.nan, dtype=np.float32)
+            matrix[:self._size] = self._matrix[:self._size]
+            user_ids = np.zeros(capacity, dtype=np.int64)
+            user_ids[:self._size] = self._row_user_ids[:self._size]
+            self._matrix, self._row_user_ids = matrix, user_ids
+
+    def _add_trait(self, trait: str):
+        self._trait_index[trait] = len(self.trait_names)
+        self.trait_names.append(trait)
+        column = np.full((len(self._matrix), 1), np.nan, dtype=np.float32)
+        self._matrix = np.hstack([self._matrix, column])
+
+    def upsert(self, user_id: int, traits: Optional[Dict[str, float]]):
+        """Store the trait scores of a user's latest TextAnalysis, replacing any previous row."""
+        with self._lock:
+            for trait in traits or {}:
+                if trait not in self._trait_index:
+                    self._add_trait(trait)
+
+            row = self._row(user_id)
+            if row < 0:
+                self._ensure_user_capacity(user_id)
+                self._ensure_row_capacity()
+                row = self._size
+                self._size += 1
+                self._row_user_ids[row] = user_id
+                self._row_by_user[user_id] = row
+
+            self._matrix[row] = np.nan
+            for trait, score in (traits or {}).items():
+                self._matrix[row, self._trait_index[trait]] = score
+
+    def load(self, rows: Iterable[Tuple[int, Optional[Dict[str, float]]]]):
+        for user_id, traits in rows:
+            self.upsert(user_id, traits)
+
+    def get(self, user_id: int) -> Optional[Dict[str, float]]:
+        """Return the stored trait dictionary, or None when the user has no analysis."""
+        with self._lock:
+            row = self._row(user_id)
+            if row < 0:
+                return None
+            values = self._matrix[row]
+            return {
+                trait: round(float(values[index]), STORE_DECIMALS)
+                for index, trait in enumerate(self.trait_names)
+                if not np.isnan(values[index])
+            }
+
+    def gather(self, user_ids: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """Return (traits, has_analysis) for user_ids in order; unknown users get NaN rows."""
+        with self._lock:
+            rows = self.rows(user_ids)
+            has_analysis = rows >= 0
+            traits = np.full((len(user_ids), len(self.trait_names)), np.nan, dtype=np.float32)
+            traits[has_analysis] = self._matrix[rows[has_analysis]]
+            return traits, has_analysis
+
+    def rows(self, user_ids: Iterable[int]) -> np.ndarray:
+        """Matrix rows of user_ids, -1 where missing; stable until the store is replaced."""
+        with self._lock:
+            user_ids = np.asarray(user_ids, dtype=np.int64)
+            rows = np.full(len(user_ids), -1, dtype=np.int32)
+            in_range = (user_ids >= 0) & (user_ids < len(self._row_by_user))
+            rows[in_range] = self._row_by_user[user_ids[in_range]]
+            return rows
+
+    def take_rows(self, rows: np.ndarray) -> np.ndarray:
+        with self._lock:
+            return self._matrix[rows]
+
+    def row_user_ids(self, rows: np.ndarray) -> np.ndarray:
+        with self._lock:
+            return self._row_user_ids[rows]
+
+    def export(self) -> Tuple[np.ndarray, np.ndarray]:
+        """Return copies of (user_ids, traits) for every stored user."""
+        with self._lock:
+            return self._row_user_ids[:self._size].copy(), self._matrix[:self._size].copy()
+
+    def memory_stats(self) -> Dict[str, int]:
+        with self._lock:
+            matrix_bytes = self._matrix.nbytes
+            index_bytes = self._row_by_user.nbytes + self._row_user_ids.nbytes
+            return {
+                "users": self._size,
+                "traits": len(self.trait_names),
+                "snapshot_version": self.snapshot_version,
+                "row_capacity": len(self._matrix),
+                "matrix_bytes": matrix_bytes,
+                "index_bytes": index_bytes,
+                "total_bytes": matrix_bytes + index_bytes,
+            }
+
+    def snapshot(self, path: str) -> float:
+        """Write the store to path atomically and return the snapshot timestamp."""
+        with self._lock:
+            taken_at = time.time()
+            tmp_path = f"{path}.tmp"
+            with open(tmp_path, "wb") as snapshot_file:
+                np.savez(
+                    snapshot_file,
+                    format_version=np.array(SNAPSHOT_FORMAT_VERSION),
+                    taken_at=np.array(taken_at),
+                    trait_names=np.array(self.trait_names),
+                    user_ids=self._row_user_ids[:self._size],
+                    matrix=self._matrix[:self._size],
+                )
+            os.replace(tmp_path, path)
+            return taken_at
+
+    def restore(self, path: str) -> float:
+        """Replace the store contents with a snapshot and return when it was taken."""
+        with np.load(path) as snapshot:
+            if int(snapshot["format_version"]) != SNAPSHOT_FORMAT_VERSION:
+                raise ValueError(f"Unsupported trait snapshot version in {path}")
+            trait_names = [str(trait) for trait in snapshot["trait_names"]]
+            user_ids = snapshot["user_ids"].astype(np.int64)
+            matrix = snapshot["matrix"].astype(np.float32)
+            taken_at = float(snapshot["taken_at"])
+        self.replace(user_ids, matrix, trait_names)
+        return taken_at
+
+    def replace(self, user_ids: np.ndarray, matrix: np.ndarray, trait_names: Iterable[str]):
+        """Replace the store contents with one row of matrix per user id."""
+        user_ids = np.asarray(user_ids, dtype=np.int64)
+        with self._lock:
+            self.trait_names = list(trait_names)
+            self._trait_index = {trait: index for index, trait in enumerate(self.trait_names)}
+            self._size = len(user_ids)
+            capacity = max(self._size, 1024)
+            self._matrix = np.full((capacity, len(self.trait_names)), np.nan, dtype=np.float32)
+            self._matrix[:self._size] = matrix
+            self._row_user_ids = np.zeros(capacity, dtype=np.int64)
+            self._row_user_ids[:self._size] = user_ids
+            self._row_by_user = np.full(int(user_ids.max()) + 1 if self._size else 1024, -1, dtype=np.int32)
+            self._row_by_user[user_ids] = np.arange(self._size, dtype=np.int32)
+            self.snapshot_version = None
+
+    def attach(self, snapshot, changes: Iterable[Tuple[int, Optional[Dict[str, float]]]] = ()) -> float:
+        """Serve traits from a mapped FeatureSnapshot, applying `changes` under the same lock; returns its creation time."""
+        with self._lock:
+            self.trait_names = list(snapshot.trait_names)
+            self._trait_index = {trait: index for index, trait in enumerate(self.trait_names)}
+            self._size = snapshot.trait_count
+            self._matrix = snapshot.traits
+            self._row_user_ids = snapshot.trait_user_ids
+            user_ids = self._row_user_ids[:self._size]
+            self._row_by_user = np.full(max(int(user_ids.max()) + 1 if self._size else 0, 1024), -1, dtype=np.int32)
+            self._row_by_user[user_ids] = np.arange(self._size, dtype=np.int32)
+            self.snapshot_version = snapshot.version
+            self.load(changes)
+        return snapshot.created_at
+
+
+trait_store = TraitStore()
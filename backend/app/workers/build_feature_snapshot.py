@@ -0,0 +1,69 @@
+# backend/app/workers/build_feature_snapshot.py
+"""Rebuild the feature snapshot: cd backend && python -m app.workers.build_feature_snapshot"""
+import argparse
+import logging
+import time
+import numpy as np
+from app.api import matching
+from app.core.config import settings
+from app.db.session import SessionLocal
+from app.models.user import User
+from app.services import feature_snapshot, matching_engine
+from app.services.ann_index import IVFIndex
+from app.services.trait_store import TraitStore
+
+logger = logging.getLogger(__name__)
+
+
+def build(db, directory: str) -> str:
+    """Read every user, their interests and latest traits and write a snapshot."""
+    created_at = time.time()
+    users = db.query(User.id, User.age, User.gender, User.location, User.latitude, User.longitude, User.is_active)\
+        .order_by(User.id)\
+        .all()
+    # A private store: the process-wide one may itself be mapped from the old snapshot
+    store = TraitStore()
+    for user_id, text_analysis in matching.get_latest_text_analyses(db.query(User.id), db).items():
+        store.upsert(user_id, text_analysis.trait_scores)
+    
+    columns = matching_engine.build_columns_from_store(users, store)
+    trait_user_ids, traits = store.export()
+    # Trained once here and mapped by every worker instead of re-trained in each
+    index = IVFIndex(store)
+    index.build()
+    path = feature_snapshot.write_snapshot(
+        directory,
+        columns,
+        np.array([bool(user.is_active) for user in users], dtype=bool),
+        trait_user_ids,
+        traits,
+        store.trait_names,
+        created_at,
+        ann=index.export(),
+        coordinates=(
+            np.array([user.latitude for user in users], dtype=np.float64),
+            np.array([user.longitude for user in users], dtype=np.float64),
+        ),
+        user_interests=matching.load_user_interests(db),
+    )
+    logger.info("Wrote feature snapshot %s (%d users, %d with traits)", path, len(users), len(trait_user_ids))
+    return path
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Build the shared matching feature snapshot.")
+    parser.add_argument("--directory", default=settings.FEATURE_SNAPSHOT_DIR, help="snapshot directory")
+    args = parser.parse_args(argv)
+    if not args.directory:
+        parser.error("set FEATURE_SNAPSHOT_DIR or pass --directory")
+    
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(message)s")
+    db = SessionLocal()
+    try:
+        print(build(db, args.directory))
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
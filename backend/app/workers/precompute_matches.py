@@ -0,0 +1,193 @@
+# backend/app/workers/precompute_matches.py
+"""
+Precompute every active user's ranked match deck in a sharded process pool:
+
+    cd backend && python -m app.workers.precompute_matches --workers 8
+    cd backend && python -m app.workers.precompute_matches --incremental
+"""
+import argparse
+import logging
+import os
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime, timedelta, timezone
+from typing import List, Optional, Set, Tuple
+from sqlalchemy import func, or_
+from app.api import matching
+from app.core.config import settings
+from app.db.session import SessionLocal, engine
+from app.models.match_deck import MatchDeck, MatchDeckCandidate, MatchPrecomputeRun
+from app.models.user import User
+from app.services import feature_snapshot, match_sync, matching_engine
+from app.services.interest_index import interest_index
+from app.services.trait_store import trait_store
+from app.workers import build_feature_snapshot
+
+logger = logging.getLogger(__name__)
+
+# Active population columns shared by every shard a worker process scores
+_population: Optional[matching_engine.CandidateColumns] = None
+
+
+def load_population(db) -> matching_engine.CandidateColumns:
+    matching.ensure_trait_store(db)
+    matching.ensure_interest_index(db)
+    candidates = db.query(User.id, User.age, User.gender, User.location)\
+        .filter(User.is_active == True)\
+        .order_by(User.id)\
+        .all()
+    return matching_engine.build_columns_from_store(candidates, trait_store)
+
+
+def load_snapshot_population(path: str) -> matching_engine.CandidateColumns:
+    snapshot = feature_snapshot.FeatureSnapshot(path)
+    match_sync.replace_traits(lambda: trait_store.attach(snapshot), snapshot)
+    trait_store.is_warm = True
+    user_interests = snapshot.user_interests()
+    if user_interests is not None:
+        interest_index.load(user_interests)
+        interest_index.is_warm = True
+    else:
+        db = SessionLocal()
+        try:
+            matching.ensure_interest_index(db)
+        finally:
+            db.close()
+    return snapshot.population()
+
+
+def _init_worker(snapshot_path: Optional[str] = None):
+    global _population
+    # Connections inherited from the parent must not be shared across processes
+    engine.dispose(close=False)
+    if _population is None and snapshot_path:
+        _population = load_snapshot_population(snapshot_path)
+    elif _population is None:
+        db = SessionLocal()
+        try:
+            _population = load_population(db)
+        finally:
+            db.close()
+
+
+def precompute_shard(user_ids: List[int], computed_at: datetime) -> int:
+    """Score and store decks for one id-range shard; returns the number of decks written."""
+    db = SessionLocal()
+    try:
+        users = db.query(User).filter(User.id.in_(user_ids), User.is_active == True).all()
+        decks = [
+            {
+                "user_id": user.id,
+                "candidates": [
+                    [score, candidate_id]
+                    for score, candidate_id in matching.rank_population(user, _population, settings.MATCH_CACHE_DEPTH)
+                ],
+                "computed_at": computed_at,
+            }
+            for user in users
+        ]
+        db.query(MatchDeckCandidate).filter(MatchDeckCandidate.owner_id.in_(user_ids)).delete(synchronize_session=False)
+        db.query(MatchDeck).filter(MatchDeck.user_id.in_(user_ids)).delete(synchronize_session=False)
+        db.bulk_insert_mappings(MatchDeck, decks)
+        matching.store_deck_candidates(db, {
+            deck["user_id"]: [candidate_id for _, candidate_id in deck["candidates"]] for deck in decks
+        })
+        db.commit()
+        return len(decks)
+    finally:
+        db.close()
+
+
+def select_users(db, incremental: bool) -> List[int]:
+    query = db.query(User.id).filter(User.is_active == True)
+    last_run = None
+    if incremental:
+        last_run = db.query(MatchPrecomputeRun)\
+            .filter(MatchPrecomputeRun.finished_at.isnot(None))\
+            .order_by(MatchPrecomputeRun.started_at.desc())\
+            .first()
+    if last_run is None:
+        return [user_id for user_id, in query.order_by(User.id).all()]
+    
+    # Re-score decks that would expire before the next nightly run as well
+    expiring = datetime.now(timezone.utc) - timedelta(seconds=settings.MATCH_DECK_MAX_AGE_SECONDS / 2)
+    user_ids = {
+        user_id for user_id, in query.outerjoin(MatchDeck, MatchDeck.user_id == User.id).filter(or_(
+            MatchDeck.user_id.is_(None),
+            MatchDeck.computed_at < expiring
+        ))
+    }
+    # Changed users' own decks and every deck they appear in; inactive owners get theirs deleted
+    changed = matching.changed_since(db, last_run.started_at)
+    return sorted(user_ids | changed | decks_containing(db, changed))
+
+
+def decks_containing(db, user_ids: Set[int]) -> Set[int]:
+    """Owners of stored decks that rank any of user_ids, looked up in match_deck_candidates."""
+    owners = set()
+    user_ids = sorted(user_ids)
+    # Chunked to stay under the bound-parameter limits of the drivers
+    for start in range(0, len(user_ids), 10000):
+        owners.update(
+            owner_id for owner_id, in db.query(MatchDeckCandidate.owner_id)
+            .filter(MatchDeckCandidate.candidate_id.in_(user_ids[start:start + 10000]))
+            .distinct()
+        )
+    return owners
+
+
+def shard(user_ids: List[int], shard_size: int) -> List[List[int]]:
+    return [user_ids[start:start + shard_size] for start in range(0, len(user_ids), shard_size)]
+
+
+def run(incremental: bool = False, workers: Optional[int] = None, shard_size: Optional[int] = None) -> Tuple[int, int]:
+    """Precompute decks and record the run; returns (run id, decks written)."""
+    global _population
+    shard_size = shard_size or settings.MATCH_PRECOMPUTE_SHARD_SIZE
+    db = SessionLocal()
+    try:
+        precompute_run = MatchPrecomputeRun(mode="incremental" if incremental else "full", users_scored=0)
+        db.add(precompute_run)
+        db.commit()
+        db.refresh(precompute_run)
+        # Decks reflect the data as of the run start, so users changed while it runs stay stale
+        computed_at = precompute_run.started_at
+        
+        user_ids = select_users(db, incremental)
+        shards = shard(user_ids, shard_size)
+        logger.info("Scoring %d users in %d shards", len(user_ids), len(shards))
+        
+        written = 0
+        if shards:
+            snapshot_path = None
+            if settings.FEATURE_SNAPSHOT_DIR:
+                snapshot_path = build_feature_snapshot.build(db, settings.FEATURE_SNAPSHOT_DIR)
+                _population = load_snapshot_population(snapshot_path)
+            else:
+                _population = load_population(db)
+            with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(snapshot_path,)) as pool:
+                for shard_written in pool.map(precompute_shard, shards, [computed_at] * len(shards)):
+                    written += shard_written
+        
+        precompute_run.users_scored = written
+        precompute_run.finished_at = func.now()
+        db.commit()
+        logger.info("Wrote %d match decks", written)
+        return precompute_run.id, written
+    finally:
+        db.close()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Precompute ranked match decks.")
+    parser.add_argument("--incremental", action="store_true", help="only re-score users changed since the last run")
+    parser.add_argument("--workers", type=int, default=os.cpu_count(), help="worker processes")
+    parser.add_argument("--shard-size", type=int, default=settings.MATCH_PRECOMPUTE_SHARD_SIZE, help="users per shard")
+    args = parser.parse_args(argv)
+    
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(message)s")
+    run_id, written = run(args.incremental, args.workers, args.shard_size)
+    print(f"run {run_id}: wrote {written} match decks")
+
+
+if __name__ == "__main__":
+    main()
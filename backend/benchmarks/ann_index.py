@@ -0,0 +1,57 @@
+# backend/benchmarks/ann_index.py
+"""
+Recall vs latency of the IVF trait index against exhaustive scoring.
+
+    cd backend && python -m benchmarks.ann_index --users 200000 --queries 200
+"""
+import argparse
+import numpy as np
+from benchmarks.common import Timer
+from app.services.ann_index import IVFIndex, MISSING_TRAIT_VALUE
+from app.services.matching_engine import BASE_TRAITS
+from app.services.trait_store import TraitStore
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--users", type=int, default=200000)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--k", type=int, default=300)
+    parser.add_argument("--probes", type=int, nargs="+", default=[1, 2, 4, 8, 16, 32])
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(11)
+    vectors = rng.beta(2, 2, size=(args.users, len(BASE_TRAITS))).astype(np.float32)
+    vectors[rng.random(vectors.shape) < 0.05] = np.nan
+    user_ids = np.arange(1, args.users + 1)
+    queries = rng.choice(args.users, args.queries, replace=False)
+    store = TraitStore()
+    store.replace(user_ids, vectors, BASE_TRAITS)
+    # The index reads missing traits as MISSING_TRAIT_VALUE
+    vectors = np.where(np.isnan(vectors), MISSING_TRAIT_VALUE, vectors)
+
+    index = IVFIndex(store)
+    with Timer() as build_timer:
+        index.build()
+    print(f"users: {args.users}  lists: {index.stats()['lists']}  build: {build_timer.elapsed:.2f} s")
+
+    truth = []
+    with Timer() as exact_timer:
+        for query in queries:
+            distances = np.abs(vectors - vectors[query]).sum(axis=1)
+            distances[query] = np.inf
+            truth.append(set(user_ids[np.argpartition(distances, args.k - 1)[:args.k]].tolist()))
+    print(f"exhaustive:   {exact_timer.elapsed / args.queries * 1000:8.3f} ms/query  recall 1.000")
+
+    for n_probe in args.probes:
+        hits = 0
+        with Timer() as ann_timer:
+            results = [index.search(vectors[query], args.k, exclude=int(user_ids[query]), n_probe=n_probe) for query in queries]
+        for expected, found in zip(truth, results):
+            hits += len(expected & set(found.tolist()))
+        recall = hits / (args.k * args.queries)
+        print(f"n_probe={n_probe:<4} {ann_timer.elapsed / args.queries * 1000:8.3f} ms/query  recall {recall:.3f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,181 @@
+# backend/benchmarks/backplane.py
+"""
+Chat backplane fan-out throughput and latency, against a RESP stand-in or a real server (--url):
+
+    cd backend && python -m benchmarks.backplane --frames 20000 --workers 4 --burst 10
+    cd backend && python -m benchmarks.backplane --url redis://localhost:6379
+
+Serving the stand-in for a local multi-worker run of the app:
+
+    cd backend && python -m benchmarks.backplane --serve 6390
+    CHAT_BACKPLANE_URL=redis://127.0.0.1:6390 uvicorn app.main:app --workers 4
+"""
+import argparse
+import asyncio
+import os
+import random
+import time
+from typing import Dict, List, Set
+
+os.environ.setdefault("OPENAI_API_KEY", "benchmark")
+os.environ.setdefault("DATABASE_URL", "sqlite://")
+
+from app.services.chat_backplane import (
+    Backplane, InProcessBackplane, RespBackplane, RespError, encode_command, read_reply, session_channel
+)
+
+
+class RespStandIn:
+    """Just enough of Redis for the backplane: PING, AUTH, SELECT, SUBSCRIBE, UNSUBSCRIBE, PUBLISH."""
+
+    def __init__(self):
+        self.channels: Dict[bytes, Set[asyncio.StreamWriter]] = {}
+        self.clients: Dict[asyncio.StreamWriter, asyncio.Task] = {}
+        self.server = None
+
+    async def start(self, port: int = 0) -> int:
+        self.server = await asyncio.start_server(self._serve, "127.0.0.1", port)
+        return self.server.sockets[0].getsockname()[1]
+
+    async def stop(self):
+        self.server.close()
+        await self.server.wait_closed()
+        handlers = list(self.clients.values())
+        for writer in list(self.clients):
+            writer.close()
+        await asyncio.gather(*handlers)
+
+    async def _serve(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        subscribed: Set[bytes] = set()
+        self.clients[writer] = asyncio.current_task()
+        try:
+            while True:
+                command = await read_reply(reader)
+                if not isinstance(command, list) or not command:
+                    break
+                name = command[0].upper()
+                if name == b"PUBLISH":
+                    subscribers = self.channels.get(command[1], set())
+                    message = encode_command(b"message", command[1], command[2])
+                    for subscriber in subscribers:
+                        subscriber.write(message)
+                    writer.write(b":%d\r\n" % len(subscribers))
+                elif name in (b"SUBSCRIBE", b"UNSUBSCRIBE"):
+                    for channel in command[1:]:
+                        if name == b"SUBSCRIBE":
+                            self.channels.setdefault(channel, set()).add(writer)
+                            subscribed.add(channel)
+                        else:
+                            self.channels.get(channel, set()).discard(writer)
+                            subscribed.discard(channel)
+                        writer.write(b"*3\r\n$%d\r\n%s\r\n$%d\r\n%s\r\n:%d\r\n" % (
+                            len(name), name.lower(), len(channel), channel, len(subscribed)
+                        ))
+                elif name == b"PING":
+                    writer.write(b"+PONG\r\n")
+                elif name in (b"AUTH", b"SELECT"):
+                    writer.write(b"+OK\r\n")
+                else:
+                    writer.write(b"-ERR unknown command '%s'\r\n" % name)
+                await writer.drain()
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            self.clients.pop(writer, None)
+            for channel in subscribed:
+                self.channels.get(channel, set()).discard(writer)
+            writer.close()
+
+
+async def run(backplanes: List[Backplane], frames: int, burst: int, sessions: int, seed: int) -> Dict[str, float]:
+    """Publish bursts of frames from every backplane in turn until each subscriber received them all."""
+    received = {"count": 0}
+    done = asyncio.Event()
+    expected = frames * len(backplanes)
+
+    def handler(frame, user_ids):
+        received["count"] += 1
+        if received["count"] >= expected:
+            done.set()
+
+    for backplane in backplanes:
+        await backplane.start(handler)
+        for session_id in range(sessions):
+            await backplane.subscribe(session_channel(session_id))
+    # Let upstream subscriptions settle before the clock starts
+    await asyncio.sleep(0.2)
+
+    rng = random.Random(seed)
+    start = time.perf_counter()
+    for sent in range(0, frames, burst):
+        publisher = backplanes[(sent // burst) % len(backplanes)]
+        for index in range(sent, min(sent + burst, frames)):
+            publisher.publish(session_channel(rng.randrange(sessions)), {
+                "type": "chat_message", "data": {"id": index, "senderId": 1, "message": "x" * 64},
+            }, [1, 2])
+        # One tick per burst, as when a worker handles one frame from a socket
+        await asyncio.sleep(0)
+    await asyncio.wait_for(done.wait(), 60)
+    elapsed = time.perf_counter() - start
+
+    stats = [backplane.stats() for backplane in backplanes]
+    for backplane in backplanes:
+        await backplane.stop()
+    return {
+        "frames_per_s": frames / elapsed,
+        "deliveries_per_s": expected / elapsed,
+        "frames_per_flush": sum(stat["published"] for stat in stats) / max(sum(stat["flushes"] for stat in stats), 1),
+        "latency_p50_ms": max(stat["latency_p50_ms"] for stat in stats),
+        "latency_p99_ms": max(stat["latency_p99_ms"] for stat in stats),
+    }
+
+
+def report(name: str, result: Dict[str, float]):
+    print(f"{name:<26} {result['frames_per_s']:10.0f} frames/s {result['deliveries_per_s']:10.0f} deliveries/s "
+          f"{result['frames_per_flush']:6.1f} frames/flush  p50 {result['latency_p50_ms']:7.3f} ms  "
+          f"p99 {result['latency_p99_ms']:7.3f} ms")
+
+
+async def benchmark(args):
+    report("in-process", await run([InProcessBackplane()], args.frames, args.burst, args.sessions, args.seed))
+    standin = None
+    url = args.url
+    if url is None:
+        standin = RespStandIn()
+        url = f"redis://127.0.0.1:{await standin.start()}"
+    try:
+        for burst in sorted({1, args.burst}):
+            result = await run(
+                [RespBackplane(url) for _ in range(args.workers)], args.frames, burst, args.sessions, args.seed
+            )
+            report(f"resp x{args.workers} (burst {burst})", result)
+    finally:
+        if standin is not None:
+            await standin.stop()
+
+
+async def serve(port: int):
+    standin = RespStandIn()
+    await standin.start(port)
+    print(f"RESP stand-in listening on redis://127.0.0.1:{port}")
+    await asyncio.Event().wait()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--frames", type=int, default=20000)
+    parser.add_argument("--burst", type=int, default=10, help="frames published per event loop tick")
+    parser.add_argument("--workers", type=int, default=4, help="backplane connections, one per simulated worker")
+    parser.add_argument("--sessions", type=int, default=500)
+    parser.add_argument("--seed", type=int, default=5)
+    parser.add_argument("--url", help="Redis URL to benchmark instead of the stand-in")
+    parser.add_argument("--serve", type=int, metavar="PORT", help="only run the RESP stand-in on PORT")
+    args = parser.parse_args()
+    try:
+        asyncio.run(serve(args.serve) if args.serve else benchmark(args))
+    except RespError as error:
+        raise SystemExit(f"backplane server error: {error}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,138 @@
+# backend/benchmarks/common.py
+"""
+Shared helpers for the matching benchmarks, which default to a throwaway SQLite database:
+
+    cd backend && python -m benchmarks.matching_engine --users 2000
+"""
+import os
+import random
+import time
+
+os.environ.setdefault("OPENAI_API_KEY", "benchmark")
+os.environ.setdefault("DATABASE_URL", "sqlite://")
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+from app.db.base import Base
+from app.models import user, analysis, chat, journal, notification, interest, match_deck, swipe  # noqa: F401 - register tables
+from app.models.interest import Interest, UserInterest
+from app.models.user import User
+from app.models.analysis import TextAnalysis, UserTraitVector
+from app.services.geo import geohash_encode, resolve_location
+from app.services.matching_engine import BASE_TRAITS
+from app.services.sql_scoring import store_trait_vector
+
+LOCATIONS = ["New York", "london", "Paris", "Berlin", "Tokyo", "Mumbai", "Toronto", "Sydney", None]
+GENDERS = ["male", "Female", "female", "non-binary", None]
+INTERESTS = [
+    "hiking", "reading", "cooking", "travel", "photography", "music", "yoga", "gaming",
+    "painting", "running", "dancing", "movies", "coffee", "wine", "cycling", "climbing",
+]
+
+
+def make_session(url: str = "sqlite://"):
+    if url.startswith("sqlite"):
+        engine = create_engine(url, poolclass=StaticPool, connect_args={"check_same_thread": False})
+    else:
+        engine = create_engine(url)
+    Base.metadata.create_all(bind=engine)
+    return sessionmaker(bind=engine)()
+
+
+def synthetic_users(count: int, seed: int = 7):
+    """Yield (User, trait_scores or None) pairs with a realistic share of missing fields."""
+    rng = random.Random(seed)
+    for index in range(count):
+        candidate = User(
+            id=index + 1,
+            email=f"user{index + 1}@example.com",
+            hashed_password="x",
+            full_name=f"User {index + 1}",
+            is_active=True,
+            age=rng.choice([None, 0]) if rng.random() < 0.05 else rng.randint(18, 70),
+            gender=rng.choice(GENDERS),
+            location=rng.choice(LOCATIONS),
+            trait_scores={},
+            emotional_badges=[],
+        )
+        coordinates = resolve_location(candidate.location)
+        if coordinates:
+            candidate.latitude, candidate.longitude = coordinates
+            candidate.geohash = geohash_encode(*coordinates)
+        traits = None
+        if rng.random() < 0.8:
+            traits = {trait: round(rng.random(), 3) for trait in BASE_TRAITS if rng.random() < 0.9}
+        yield candidate, traits
+
+
+def synthetic_interests(count: int, seed: int = 7):
+    """Yield (user_id, interest names) with popularity skewed towards the head of INTERESTS."""
+    rng = random.Random(seed)
+    weights = [1.0 / (rank + 1) for rank in range(len(INTERESTS))]
+    for user_id in range(1, count + 1):
+        yield user_id, sorted(set(rng.choices(INTERESTS, weights, k=rng.randint(0, 6))))
+
+
+def populate(db, count: int, seed: int = 7):
+    for candidate, traits in synthetic_users(count, seed):
+        db.add(candidate)
+        if traits is not None:
+            db.add(TextAnalysis(user_id=candidate.id, text_content="benchmark", trait_scores=traits))
+            store_trait_vector(db, candidate.id, traits)
+    interests = {name: Interest(id=index + 1, name=name) for index, name in enumerate(INTERESTS)}
+    db.add_all(interests.values())
+    db.flush()
+    for user_id, names in synthetic_interests(count, seed):
+        db.add_all(UserInterest(user_id=user_id, interest_id=interests[name].id) for name in names)
+    db.commit()
+
+
+def bulk_populate(db, count: int, seed: int = 7, chunk_size: int = 10000):
+    """Same population as populate(), written with chunked bulk inserts."""
+    interests = [{"id": index + 1, "name": name} for index, name in enumerate(INTERESTS)]
+    interest_ids = {interest["name"]: interest["id"] for interest in interests}
+    db.bulk_insert_mappings(Interest, interests)
+    users, analyses, vectors = [], [], []
+    user_interests = synthetic_interests(count, seed)
+
+    def flush():
+        db.bulk_insert_mappings(User, users)
+        db.bulk_insert_mappings(TextAnalysis, analyses)
+        db.bulk_insert_mappings(UserTraitVector, vectors)
+        db.bulk_insert_mappings(UserInterest, [
+            {"user_id": user_id, "interest_id": interest_ids[name]}
+            for user_id, names in (next(user_interests) for _ in users)
+            for name in names
+        ])
+        db.commit()
+        users.clear()
+        analyses.clear()
+        vectors.clear()
+
+    for candidate, traits in synthetic_users(count, seed):
+        users.append({
+            column: getattr(candidate, column)
+            for column in ("id", "email", "hashed_password", "full_name", "is_active", "age", "gender",
+                           "location", "latitude", "longitude", "geohash", "trait_scores", "emotional_badges")
+        })
+        if traits is not None:
+            analyses.append({"user_id": candidate.id, "text_content": "benchmark", "trait_scores": traits})
+            vectors.append(dict(
+                user_id=candidate.id,
+                extra_traits={},
+                **{trait: traits.get(trait) for trait in BASE_TRAITS}
+            ))
+        if len(users) == chunk_size:
+            flush()
+    if users:
+        flush()
+
+
+class Timer:
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.elapsed = time.perf_counter() - self.start
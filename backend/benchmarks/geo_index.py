@@ -0,0 +1,51 @@
+# backend/benchmarks/geo_index.py
+"""
+Radius queries through the geo grid index vs a full vectorized haversine scan.
+
+    cd backend && python -m benchmarks.geo_index --users 1000000 --radius 50
+"""
+import argparse
+import numpy as np
+from benchmarks.common import Timer
+from app.services.geo import GeoGridIndex, _gazetteer, haversine_km
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--users", type=int, default=1000000)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--radius", type=float, default=50.0)
+    args = parser.parse_args()
+
+    # Cluster synthetic users around gazetteer cities like a real population
+    rng = np.random.default_rng(3)
+    cities = np.array(list(_gazetteer().values()))
+    homes = cities[rng.integers(len(cities), size=args.users)]
+    latitudes = np.clip(homes[:, 0] + rng.normal(0, 0.4, args.users), -90, 90)
+    longitudes = (homes[:, 1] + rng.normal(0, 0.4, args.users) + 180) % 360 - 180
+    user_ids = np.arange(1, args.users + 1)
+
+    index = GeoGridIndex()
+    with Timer() as build_timer:
+        for user_id, latitude, longitude in zip(user_ids.tolist(), latitudes.tolist(), longitudes.tolist()):
+            index.upsert(user_id, latitude, longitude)
+    print(f"users: {args.users}  buckets: {index.stats()['buckets']}  build: {build_timer.elapsed:.1f} s")
+
+    queries = rng.integers(args.users, size=args.queries)
+    with Timer() as scan_timer:
+        expected = [
+            user_ids[haversine_km(latitudes[q], longitudes[q], latitudes, longitudes) <= args.radius]
+            for q in queries
+        ]
+    with Timer() as index_timer:
+        found = [index.within(latitudes[q], longitudes[q], args.radius) for q in queries]
+
+    assert all(np.array_equal(a, b) for a, b in zip(expected, found)), "grid index disagrees with full scan"
+    hits = np.mean([len(result) for result in found])
+    print(f"radius {args.radius:g} km, mean {hits:.0f} users in range")
+    print(f"full haversine scan: {scan_timer.elapsed / args.queries * 1000:8.2f} ms/query")
+    print(f"grid index:          {index_timer.elapsed / args.queries * 1000:8.2f} ms/query")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,49 @@
+# backend/benchmarks/interest_index.py
+"""
+All-of interest filters through the bitmap inverted index vs Python set intersection.
+
+    cd backend && python -m benchmarks.interest_index --users 1000000
+"""
+import argparse
+import random
+import numpy as np
+from benchmarks.common import INTERESTS, Timer, synthetic_interests
+from app.services.interest_index import InterestIndex
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--users", type=int, default=1000000)
+    parser.add_argument("--queries", type=int, default=200)
+    args = parser.parse_args()
+
+    user_interests = dict(synthetic_interests(args.users))
+    index = InterestIndex()
+    with Timer() as build_timer:
+        index.load(user_interests)
+    stats = index.stats()
+    print(f"users: {args.users}  interests: {stats['interests']}  build: {build_timer.elapsed:.1f} s")
+
+    members = {}
+    for user_id, names in user_interests.items():
+        for name in names:
+            members.setdefault(name, set()).add(user_id)
+    set_bytes = sum(len(users) for users in members.values()) * 8
+    print(f"bitmap memory: {stats['bitmap_bytes'] / 2**20:.1f} MiB  (~{set_bytes / 2**20:.1f} MiB of set pointers alone)")
+
+    rng = random.Random(5)
+    queries = [rng.sample(INTERESTS, rng.randint(1, 3)) for _ in range(args.queries)]
+    with Timer() as set_timer:
+        expected = [np.array(sorted(set.intersection(*(members[name] for name in query)))) for query in queries]
+    with Timer() as index_timer:
+        found = [index.users_with_all(query) for query in queries]
+
+    assert all(np.array_equal(a, b) for a, b in zip(expected, found)), "bitmap index disagrees with set intersection"
+    hits = np.mean([len(result) for result in found])
+    print(f"mean {hits:.0f} users per query")
+    print(f"set intersection: {set_timer.elapsed / args.queries * 1000:8.2f} ms/query")
+    print(f"bitmap index:     {index_timer.elapsed / args.queries * 1000:8.2f} ms/query")
+
+
+if __name__ == "__main__":
+    main()
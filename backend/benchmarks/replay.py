@@ -0,0 +1,314 @@
+# backend/benchmarks/replay.py
+"""
+Offline replay of logged swipes for comparing scoring functions (AUC, precision@k, NDCG@k):
+
+    cd backend && python -m benchmarks.replay export --database-url postgresql://... --output swipes.npz
+    cd backend && python -m benchmarks.replay run --input swipes.npz --variants baseline,no_gender --workers 8
+    cd backend && python -m benchmarks.replay run --synthetic 5000 --variants baseline,age_gaussian
+"""
+import argparse
+import importlib
+import os
+import random
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Callable, Dict, List, Optional, Tuple
+import numpy as np
+
+MISSING_CODE = -1
+
+
+class ReplayData:
+    """User columns indexed by row plus swipe events as (swiper row, swipee row) pairs."""
+
+    ARRAYS = ("user_ids", "ages", "gender_codes", "location_codes", "traits", "has_analysis",
+              "swipers", "swipees", "liked", "mutual")
+
+    def __init__(self, **arrays: np.ndarray):
+        for name in self.ARRAYS:
+            setattr(self, name, arrays[name])
+
+    def __len__(self) -> int:
+        return len(self.swipers)
+
+    def save(self, path: str):
+        np.savez(path, **{name: getattr(self, name) for name in self.ARRAYS})
+
+    @classmethod
+    def load(cls, path: str) -> "ReplayData":
+        with np.load(path) as arrays:
+            return cls(**{name: arrays[name] for name in cls.ARRAYS})
+
+
+def export(db) -> ReplayData:
+    """Read users, their latest traits, swipes and mutual matches into a ReplayData."""
+    from app.api import matching
+    from app.models.swipe import MutualMatch, Swipe
+    from app.models.user import User
+    from app.services import matching_engine
+    from app.services.trait_store import TraitStore
+
+    users = db.query(User.id, User.age, User.gender, User.location).order_by(User.id).all()
+    store = TraitStore()
+    for user_id, text_analysis in matching.get_latest_text_analyses(db.query(User.id), db).items():
+        store.upsert(user_id, text_analysis.trait_scores)
+    columns = matching_engine.build_columns_from_store(users, store)
+
+    logged = db.query(Swipe.swiper_id, Swipe.swipee_id, Swipe.action).order_by(Swipe.id).all()
+    swipes = np.array([(swiper_id, swipee_id) for swiper_id, swipee_id, _ in logged], dtype=np.int64).reshape(-1, 2)
+    actions = np.array([action for _, _, action in logged])
+    matched = {(user_id, other_id) for user_id, other_id in db.query(MutualMatch.user_id, MutualMatch.matched_user_id)}
+    return ReplayData(
+        user_ids=columns.user_ids,
+        ages=columns.ages,
+        gender_codes=columns.gender_codes,
+        location_codes=columns.location_codes,
+        traits=columns.traits,
+        has_analysis=columns.has_analysis,
+        swipers=np.searchsorted(columns.user_ids, swipes[:, 0]).astype(np.int32),
+        swipees=np.searchsorted(columns.user_ids, swipes[:, 1]).astype(np.int32),
+        liked=actions == "like",
+        mutual=np.array([(int(a), int(b)) in matched for a, b in swipes], dtype=bool),
+    )
+
+
+# Variants: pairwise, vectorized over aligned swiper/swipee rows
+
+def demographic(data: ReplayData, a: np.ndarray, b: np.ndarray) -> np.ndarray:
+    """calculate_demographic_compatibility; NaN ages fail both bands like falsy ones."""
+    age_diff = np.abs(data.ages[a] - data.ages[b])
+    scores = np.where(age_diff <= 5, 0.3, np.where(age_diff <= 10, 0.15, 0.0))
+    scores += np.where((data.location_codes[a] == data.location_codes[b]) & (data.location_codes[a] != MISSING_CODE), 0.2, 0.0)
+    scores += np.where((data.gender_codes[a] == data.gender_codes[b]) & (data.gender_codes[a] != MISSING_CODE), 0.1, 0.0)
+    return scores
+
+
+def personality(data: ReplayData, a: np.ndarray, b: np.ndarray) -> np.ndarray:
+    """calculate_personality_compatibility; traits missing on either side are NaN and drop out."""
+    diff = np.abs(data.traits[a] - data.traits[b])
+    scores = np.minimum(np.where(np.isnan(diff), 0.0, (1 - diff) * 0.1).sum(axis=1), 0.5)
+    return np.where(data.has_analysis[a] & data.has_analysis[b], scores, 0.0)
+
+
+def baseline(data, a, b):
+    return np.minimum(demographic(data, a, b) + personality(data, a, b), 1.0)
+
+
+def no_gender(data, a, b):
+    same_gender = (data.gender_codes[a] == data.gender_codes[b]) & (data.gender_codes[a] != MISSING_CODE)
+    return np.minimum(demographic(data, a, b) - np.where(same_gender, 0.1, 0.0) + personality(data, a, b), 1.0)
+
+
+def age_gaussian(data, a, b):
+    """Smooth age term instead of the 5/10 year bands."""
+    age_diff = np.abs(data.ages[a] - data.ages[b])
+    age_score = np.where(np.isnan(age_diff), 0.0, 0.3 * np.exp(-(age_diff / 7.0) ** 2))
+    banded = np.where(age_diff <= 5, 0.3, np.where(age_diff <= 10, 0.15, 0.0))
+    return np.minimum(demographic(data, a, b) - banded + age_score + personality(data, a, b), 1.0)
+
+
+def personality_only(data, a, b):
+    return personality(data, a, b)
+
+
+VARIANTS: Dict[str, Callable[[ReplayData, np.ndarray, np.ndarray], np.ndarray]] = {
+    "baseline": baseline,
+    "no_gender": no_gender,
+    "age_gaussian": age_gaussian,
+    "personality_only": personality_only,
+}
+
+
+def resolve_variant(name: str):
+    if name in VARIANTS:
+        return VARIANTS[name]
+    module_name, _, function_name = name.partition(":")
+    if not function_name:
+        raise SystemExit(f"Unknown variant {name!r}; use one of {sorted(VARIANTS)} or module:function")
+    return getattr(importlib.import_module(module_name), function_name)
+
+
+# Process pool: every worker loads the replay file once
+
+_data: Optional[ReplayData] = None
+
+
+def _init_worker(path: str):
+    global _data
+    _data = ReplayData.load(path)
+
+
+def _score_chunk(variant: str, start: int, stop: int) -> Tuple[int, np.ndarray, float]:
+    scorer = resolve_variant(variant)
+    began = time.perf_counter()
+    scores = scorer(_data, _data.swipers[start:stop], _data.swipees[start:stop])
+    return start, np.asarray(scores, dtype=np.float64), time.perf_counter() - began
+
+
+# Metrics
+
+def auc(scores: np.ndarray, labels: np.ndarray) -> Optional[float]:
+    """Probability a positive outranks a negative (ties count half), via average ranks."""
+    positives = int(labels.sum())
+    negatives = len(labels) - positives
+    if not positives or not negatives:
+        return None
+    _, inverse, counts = np.unique(scores, return_inverse=True, return_counts=True)
+    average_ranks = (np.cumsum(counts) - (counts - 1) / 2)[inverse]
+    return float((average_ranks[labels].sum() - positives * (positives + 1) / 2) / (positives * negatives))
+
+
+def ranking_metrics(swipers: np.ndarray, scores: np.ndarray, liked: np.ndarray, k: int) -> Dict[str, float]:
+    """Mean precision@k and NDCG@k of likes when each swiper's swiped profiles are ranked by score."""
+    # Ties keep the logged order so a constant scorer gets no credit from a lucky sort
+    order = np.lexsort((np.arange(len(scores)), -scores, swipers))
+    groups, starts, sizes = np.unique(swipers[order], return_index=True, return_counts=True)
+    positions = np.arange(len(order)) - np.repeat(starts, sizes)
+    top = positions < k
+    hits = liked[order] & top
+    group_index = np.repeat(np.arange(len(groups)), sizes)
+
+    likes_per_group = np.bincount(group_index, weights=liked[order], minlength=len(groups))
+    shown = np.minimum(sizes, k)
+    precision = np.bincount(group_index, weights=hits, minlength=len(groups)) / shown
+    dcg = np.bincount(group_index, weights=hits / np.log2(positions + 2), minlength=len(groups))
+    discounts = np.cumsum(1 / np.log2(np.arange(k) + 2))
+    ideal = discounts[np.minimum(likes_per_group, k).astype(int) - 1]
+    evaluated = likes_per_group > 0
+    return {
+        f"precision_at_{k}": round(float(precision[evaluated].mean()), 4) if evaluated.any() else None,
+        f"ndcg_at_{k}": round(float((dcg[evaluated] / ideal[evaluated]).mean()), 4) if evaluated.any() else None,
+        "swipers_evaluated": int(evaluated.sum()),
+    }
+
+
+def evaluate(path: str, variants: List[str], workers: int, chunk_size: int, k: int) -> Dict[str, Dict]:
+    data = ReplayData.load(path)
+    chunks = [(start, min(start + chunk_size, len(data))) for start in range(0, len(data), chunk_size)]
+    report = {}
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(path,)) as pool:
+        for variant in variants:
+            resolve_variant(variant)
+            scores = np.empty(len(data))
+            began = time.perf_counter()
+            compute_seconds = 0.0
+            for start, chunk_scores, seconds in pool.map(
+                _score_chunk, [variant] * len(chunks), [start for start, _ in chunks], [stop for _, stop in chunks]
+            ):
+                scores[start:start + len(chunk_scores)] = chunk_scores
+                compute_seconds += seconds
+            wall_seconds = time.perf_counter() - began
+            like_auc = auc(scores, data.liked)
+            mutual_auc = auc(scores[data.liked], data.mutual[data.liked])
+            report[variant] = dict(
+                like_auc=round(like_auc, 4) if like_auc is not None else None,
+                mutual_auc=round(mutual_auc, 4) if mutual_auc is not None else None,
+                **ranking_metrics(data.swipers, scores, data.liked, k),
+                pairs=len(data),
+                pairs_per_s=round(len(data) / wall_seconds),
+                pairs_per_cpu_s=round(len(data) / compute_seconds) if compute_seconds else None,
+            )
+    return report
+
+
+def check_parity(db, data: ReplayData, samples: int = 500):
+    """The baseline variant must reproduce calculate_compatibility on logged pairs."""
+    from app.api import matching
+    from app.models.user import User
+    rng = np.random.default_rng(3)
+    picked = rng.choice(len(data), size=min(samples, len(data)), replace=False)
+    scores = baseline(data, data.swipers[picked], data.swipees[picked])
+    users = {user.id: user for user in db.query(User).all()}
+    for position, score in zip(picked, scores):
+        expected = matching.calculate_compatibility(
+            users[int(data.user_ids[data.swipers[position]])], users[int(data.user_ids[data.swipees[position]])], db
+        )
+        if abs(expected - score) > 1e-9:
+            raise SystemExit(f"baseline variant diverges from calculate_compatibility: {score} != {expected}")
+
+
+def synthesize(size: int, swipes_per_user: int, seed: int):
+    """A synthetic population whose swipes follow the baseline score plus noise."""
+    from benchmarks.common import bulk_populate, make_session
+    from app.models.swipe import MutualMatch, Swipe
+
+    db = make_session()
+    bulk_populate(db, size, seed)
+    data = export(db)
+    rng = random.Random(seed)
+    swipers, swipees = [], []
+    for swiper in range(size):
+        for swipee in rng.sample(range(size), min(swipes_per_user, size - 1)):
+            if swipee != swiper:
+                swipers.append(swiper)
+                swipees.append(swipee)
+    swipers, swipees = np.array(swipers), np.array(swipees)
+    noise = np.random.default_rng(seed).normal(0, 0.15, len(swipers))
+    liked = baseline(data, swipers, swipees) + noise > 0.45
+
+    db.bulk_insert_mappings(Swipe, [
+        {"swiper_id": int(data.user_ids[a]), "swipee_id": int(data.user_ids[b]), "action": "like" if like else "dislike"}
+        for a, b, like in zip(swipers, swipees, liked)
+    ])
+    likes = {(int(a), int(b)) for a, b, like in zip(swipers, swipees, liked) if like}
+    mutual = np.array([pair for pair in likes if pair[::-1] in likes], dtype=np.int64).reshape(-1, 2)
+    db.bulk_insert_mappings(MutualMatch, [
+        {"user_id": int(data.user_ids[a]), "matched_user_id": int(data.user_ids[b]), "compatibility_score": float(score)}
+        for (a, b), score in zip(mutual, baseline(data, mutual[:, 0], mutual[:, 1]))
+    ])
+    db.commit()
+    return db
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Offline swipe replay for scoring variants.")
+    commands = parser.add_subparsers(dest="command", required=True)
+    export_parser = commands.add_parser("export", help="write logged swipes and users to an .npz file")
+    export_parser.add_argument("--database-url", help="source database (default: DATABASE_URL)")
+    export_parser.add_argument("--output", required=True)
+    run_parser = commands.add_parser("run", help="evaluate scoring variants")
+    source = run_parser.add_mutually_exclusive_group(required=True)
+    source.add_argument("--input", help=".npz written by export")
+    source.add_argument("--synthetic", type=int, help="replay a synthetic population of this many users")
+    run_parser.add_argument("--swipes-per-user", type=int, default=50)
+    run_parser.add_argument(
+        "--variants", default=",".join(VARIANTS),
+        help="comma-separated VARIANTS names or module:function callables (data, swipers, swipees) -> scores"
+    )
+    run_parser.add_argument("--workers", type=int, default=os.cpu_count())
+    run_parser.add_argument("--chunk-size", type=int, default=200000, help="swipes per pool task")
+    run_parser.add_argument("-k", type=int, default=10, help="cut-off for precision and NDCG")
+    run_parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    if args.command == "export":
+        if args.database_url:
+            os.environ["DATABASE_URL"] = args.database_url
+        from app.db.session import SessionLocal
+        db = SessionLocal()
+        try:
+            data = export(db)
+        finally:
+            db.close()
+        data.save(args.output)
+        print(f"exported {len(data)} swipes over {len(data.user_ids)} users to {args.output}")
+        return
+
+    path = args.input
+    if args.synthetic:
+        import tempfile
+        db = synthesize(args.synthetic, args.swipes_per_user, args.seed)
+        data = export(db)
+        check_parity(db, data)
+        path = os.path.join(tempfile.mkdtemp(prefix="replay-"), "swipes.npz")
+        data.save(path)
+
+    report = evaluate(path, args.variants.split(","), args.workers, args.chunk_size, args.k)
+    columns = ["like_auc", "mutual_auc", f"precision_at_{args.k}", f"ndcg_at_{args.k}", "pairs_per_s", "pairs_per_cpu_s"]
+    print(f"{'variant':<20}" + "".join(f"{column:>18}" for column in columns))
+    for variant, metrics in report.items():
+        print(f"{variant:<20}" + "".join(f"{str(metrics[column]):>18}" for column in columns))
+
+
+if __name__ == "__main__":
+    main()
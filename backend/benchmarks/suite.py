@@ -0,0 +1,221 @@
+# backend/benchmarks/suite.py
+"""
+Matching benchmark suite on synthetic populations, written as JSON to compare across commits:
+
+    cd backend && python -m benchmarks.suite --sizes 1000,10000,100000 --output before.json
+    cd backend && python -m benchmarks.suite --sizes 1000,10000,100000 --output after.json --compare before.json
+"""
+import argparse
+import json
+import os
+import platform
+import random
+import subprocess
+import sys
+import tempfile
+import time
+from typing import Any, Dict, List
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def summarize(latencies: List[float], queries: List[int]) -> Dict[str, Any]:
+    import numpy as np
+    milliseconds = np.array(latencies) * 1000
+    return {
+        "requests": len(latencies),
+        "mean_ms": round(float(milliseconds.mean()), 3),
+        "p50_ms": round(float(np.percentile(milliseconds, 50)), 3),
+        "p90_ms": round(float(np.percentile(milliseconds, 90)), 3),
+        "p99_ms": round(float(np.percentile(milliseconds, 99)), 3),
+        "max_ms": round(float(milliseconds.max()), 3),
+        "queries_mean": round(sum(queries) / len(queries), 2),
+        "queries_max": max(queries),
+    }
+
+
+def seed_mutual_matches(db, user_ids: List[int], size: int, per_user: int, rng: random.Random):
+    from app.models.swipe import MutualMatch, Swipe
+    swipes, matches, seen = [], [], set()
+    for user_id in user_ids:
+        for other_id in rng.sample(range(1, size + 1), min(per_user, size - 1)):
+            if other_id == user_id or (user_id, other_id) in seen:
+                continue
+            seen.update({(user_id, other_id), (other_id, user_id)})
+            for swiper_id, swipee_id in ((user_id, other_id), (other_id, user_id)):
+                swipes.append({"swiper_id": swiper_id, "swipee_id": swipee_id, "action": "like"})
+                matches.append({"user_id": swiper_id, "matched_user_id": swipee_id, "compatibility_score": rng.random()})
+    db.bulk_insert_mappings(Swipe, swipes)
+    db.bulk_insert_mappings(MutualMatch, matches)
+    db.commit()
+
+
+def measure(client, counter: Dict[str, int], method: str, urls: List[str]) -> Dict[str, Any]:
+    latencies, queries = [], []
+    for url in urls:
+        counter["queries"] = 0
+        start = time.perf_counter()
+        response = getattr(client, method)(url)
+        latencies.append(time.perf_counter() - start)
+        queries.append(counter["queries"])
+        if response.status_code != 200:
+            raise SystemExit(f"{method.upper()} {url} returned {response.status_code}: {response.text}")
+    return summarize(latencies, queries)
+
+
+def run_size(size: int, database_url: str, requests: int, seed: int) -> Dict[str, Any]:
+    """Populate one database and benchmark it; runs in a child process with its own settings."""
+    os.environ["DATABASE_URL"] = database_url
+    os.environ.setdefault("OPENAI_API_KEY", "benchmark")
+    os.environ["MATCHING_LLM_TOP_N"] = "0"
+
+    from sqlalchemy import event
+    from fastapi.testclient import TestClient
+    from benchmarks.common import Timer, bulk_populate
+    from app.api import matching
+    from app.db.base import Base
+    from app.db.session import SessionLocal, engine
+    from app.models.user import User
+    from app.services import matching_engine
+    from app.services.trait_store import trait_store
+    from app.workers.precompute_matches import load_population
+    import app.main
+
+    Base.metadata.drop_all(bind=engine)
+    Base.metadata.create_all(bind=engine)
+    db = SessionLocal()
+    rng = random.Random(seed)
+    with Timer() as populate_timer:
+        bulk_populate(db, size, seed)
+    sample = rng.sample(range(1, size + 1), min(requests, size))
+    seed_mutual_matches(db, sample, size, 20, rng)
+
+    counter = {"queries": 0}
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def count_query(*args):
+        counter["queries"] += 1
+
+    results: Dict[str, Any] = {"users": size, "populate_s": round(populate_timer.elapsed, 3)}
+    start = time.perf_counter()
+    with TestClient(app.main.app) as client:
+        # Entering the client runs the startup warm-up of every matching structure
+        results["startup_s"] = round(time.perf_counter() - start, 3)
+        match_urls = [f"/api/matches/{user_id}?limit=20" for user_id in sample]
+        like_urls = []
+        for user_id in sample:
+            target_id = rng.randint(1, size)
+            like_urls.append(f"/api/matches/{user_id}/like/{target_id if target_id != user_id else user_id % size + 1}")
+        results["endpoints"] = {
+            "get_matches": measure(client, counter, "get", match_urls),
+            "get_matches_cached": measure(client, counter, "get", match_urls),
+            "like_user": measure(client, counter, "post", like_urls),
+            "get_mutual_matches": measure(client, counter, "get", [f"/api/matches/{user_id}/mutual" for user_id in sample]),
+        }
+
+    population = load_population(db)
+    current = db.query(User).filter(User.id == sample[0]).first()
+    traits = trait_store.get(current.id)
+    repeat = max(1, 200000 // max(len(population), 1))
+    with Timer() as vector_timer:
+        for _ in range(repeat):
+            matching_engine.score_candidates(current, traits, population, has_analysis=current.id in trait_store)
+
+    pairs = min(size, 2000)
+    users = db.query(User).order_by(User.id).limit(pairs).all()
+    analyses = matching.get_latest_text_analyses([other.id for other in users], db)
+    with Timer() as demographic_timer:
+        for other in users:
+            matching.calculate_demographic_compatibility(current, other)
+    with Timer() as personality_timer:
+        for other in users:
+            matching.calculate_personality_compatibility(current.id, other.id, db, analyses)
+    results["scoring"] = {
+        "score_candidates_per_s": round(len(population) * repeat / vector_timer.elapsed),
+        "calculate_demographic_compatibility_per_s": round(len(users) / demographic_timer.elapsed),
+        "calculate_personality_compatibility_per_s": round(len(users) / personality_timer.elapsed),
+    }
+    db.close()
+    return results
+
+
+def git_commit():
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "HEAD"], cwd=BACKEND_DIR, capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def compare(baseline: Dict[str, Any], current: Dict[str, Any]):
+    """Print latency and throughput changes for the sizes both runs cover."""
+    print(f"{'size':>8} {'metric':<52} {'baseline':>12} {'current':>12} {'change':>8}")
+    for size, result in current["results"].items():
+        previous = baseline["results"].get(size)
+        if previous is None:
+            continue
+        rows = [
+            (f"{name}.{metric}", previous["endpoints"][name][metric], stats[metric])
+            for name, stats in result["endpoints"].items() if name in previous["endpoints"]
+            for metric in ("p50_ms", "p99_ms", "queries_mean")
+        ] + [
+            (f"scoring.{name}", previous["scoring"][name], value)
+            for name, value in result["scoring"].items() if name in previous["scoring"]
+        ]
+        for metric, old, new in rows:
+            change = f"{(new - old) / old * 100:+.1f}%" if old else "-"
+            print(f"{size:>8} {metric:<52} {old:>12} {new:>12} {change:>8}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Matching benchmark suite.")
+    parser.add_argument("--sizes", default="1000,10000", help="comma-separated population sizes, up to 1000000")
+    parser.add_argument("--requests", type=int, default=200, help="requests per endpoint and size")
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--database-url", help="benchmark database, whose tables are dropped and recreated (default: a fresh SQLite file per size)")
+    parser.add_argument("--output", help="write results JSON here instead of stdout")
+    parser.add_argument("--compare", help="results JSON of a previous run to diff against")
+    parser.add_argument("--run-size", type=int, help=argparse.SUPPRESS)
+    parser.add_argument("--run-output", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.run_size:
+        result = run_size(args.run_size, args.database_url, args.requests, args.seed)
+        with open(args.run_output, "w") as output_file:
+            json.dump(result, output_file)
+        return
+
+    report = {
+        "commit": git_commit(),
+        "created_at": time.time(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "requests": args.requests,
+        "results": {},
+    }
+    workdir = tempfile.mkdtemp(prefix="matching-bench-")
+    for size in [int(size) for size in args.sizes.split(",")]:
+        run_output = os.path.join(workdir, f"{size}.json")
+        database_url = args.database_url or f"sqlite:///{os.path.join(workdir, f'{size}.db')}"
+        print(f"benchmarking {size} users", file=sys.stderr)
+        subprocess.run([
+            sys.executable, "-m", "benchmarks.suite", "--run-size", str(size), "--run-output", run_output,
+            "--database-url", database_url, "--requests", str(args.requests), "--seed", str(args.seed),
+        ], cwd=BACKEND_DIR, check=True)
+        with open(run_output) as result_file:
+            report["results"][str(size)] = json.load(result_file)
+
+    if args.output:
+        with open(args.output, "w") as output_file:
+            json.dump(report, output_file, indent=2)
+    else:
+        json.dump(report, sys.stdout, indent=2)
+        print()
+    if args.compare:
+        with open(args.compare) as baseline_file:
+            compare(json.load(baseline_file), report)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,62 @@
+# backend/benchmarks/swipe_writer.py
+"""
+Swipe ingestion through the buffered group-commit writer vs one commit per swipe, on a SQLite file:
+
+    cd backend && python -m benchmarks.swipe_writer --users 2000 --swipes 50000
+"""
+import argparse
+import os
+import random
+import tempfile
+from benchmarks.common import Timer, make_session, populate
+from sqlalchemy.orm import sessionmaker
+from app.models.swipe import Swipe
+from app.services.swipe_writer import SwipeEvent, SwipeWriter
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--users", type=int, default=2000)
+    parser.add_argument("--swipes", type=int, default=50000)
+    parser.add_argument("--batch", type=int, default=500)
+    args = parser.parse_args()
+
+    path = os.path.join(tempfile.mkdtemp(), "swipes.db")
+    db = make_session(f"sqlite:///{path}")
+    populate(db, args.users)
+    session_factory = sessionmaker(bind=db.get_bind())
+
+    rng = random.Random(11)
+    events = []
+    for _ in range(args.swipes):
+        swiper_id, swipee_id = rng.sample(range(1, args.users + 1), 2)
+        events.append((swiper_id, swipee_id, rng.choice(["like", "like", "dislike"])))
+
+    baseline = events[:min(len(events), 2000)]
+    with Timer() as row_timer:
+        for swiper_id, swipee_id, action in baseline:
+            swipe = db.query(Swipe).filter(Swipe.swiper_id == swiper_id, Swipe.swipee_id == swipee_id).first()
+            if swipe is None:
+                db.add(Swipe(swiper_id=swiper_id, swipee_id=swipee_id, action=action))
+            else:
+                swipe.action = action
+            db.commit()
+    db.query(Swipe).delete()
+    db.commit()
+
+    writer = SwipeWriter(session_factory, max_batch=args.batch, flush_interval=0.05)
+    with Timer() as writer_timer:
+        for swiper_id, swipee_id, action in events:
+            writer.submit(SwipeEvent(swiper_id, swipee_id, action))
+        writer.stop()
+
+    stats = writer.stats()
+    stored = db.query(Swipe).count()
+    assert stored == len({(swiper_id, swipee_id) for swiper_id, swipee_id, _ in events}), "swipes were lost"
+    print(f"commit per swipe:   {len(baseline) / row_timer.elapsed:10.0f} swipes/s ({len(baseline)} swipes)")
+    print(f"group-commit:       {len(events) / writer_timer.elapsed:10.0f} swipes/s ({len(events)} swipes, "
+          f"{stats['batches']} batches, {stats['deduplicated']} deduplicated)")
+
+
+if __name__ == "__main__":
+    main()
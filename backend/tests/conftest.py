@@ -0,0 +1,19 @@
+# backend/tests/conftest.py
+import os
+import sys
+
+# Settings are read at import time: no real database or OpenAI key is needed
+os.environ.setdefault("OPENAI_API_KEY", "test")
+os.environ.setdefault("DATABASE_URL", "sqlite://")
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pytest
+
+
+@pytest.fixture
+def db():
+    """A session on a fresh in-memory SQLite database with every table created."""
+    from benchmarks.common import make_session
+    session = make_session()
+    yield session
+    session.close()
@@ -0,0 +1,131 @@
+# backend/tests/test_matching_engine.py
+import numpy as np
+import pytest
+from app.api.matching import (
+    calculate_demographic_compatibility, calculate_interest_compatibility, calculate_personality_compatibility
+)
+from app.models.analysis import TextAnalysis
+from app.models.user import User
+from app.services import matching_engine
+from app.services.interest_index import InterestIndex
+from app.services.trait_store import TraitStore
+from benchmarks.common import synthetic_interests, synthetic_users
+
+# (age, gender, location, trait_scores or None for no analysis)
+EDGE_CASES = [
+    (30, "female", "New York", {"openness": 0.5, "conscientiousness": 0.25, "extraversion": 0.75,
+                                "agreeableness": 0.1, "neuroticism": 0.9}),
+    # Age bands: differences of exactly 5 and 10 are inside, 6 and 11 are not
+    (35, "Female", "new york", {"openness": 0.5}),
+    (36, "FEMALE", "NEW YORK", {"openness": 0.123456, "neuroticism": 0.987654}),
+    (40, "male", "London", {}),
+    (41, "male", "london", {"openness": 1.0, "conscientiousness": 0.0}),
+    (25, "female", "Paris", {"humor": 0.4, "openness": 0.2}),
+    (24, "non-binary", "Paris", None),
+    (20, "female", "Tokyo", {"humor": 0.9}),
+    (19, "female", "Tokyo", None),
+    # Missing and unknown demographics
+    (None, None, None, {"openness": 0.5, "agreeableness": 0.5}),
+    (0, "", "", {"openness": 0.3}),
+    (30, "agender", "Atlantis", {"extraversion": 0.6, "neuroticism": 0.2}),
+    (30, None, "Atlantis", None),
+]
+
+# Interests of EDGE_CASES users by id; four shared interests run past the bonus cap
+EDGE_INTERESTS = {
+    1: ["hiking", "jazz", "chess", "cooking"],
+    2: ["hiking", "jazz", "chess", "cooking"],
+    3: ["hiking"],
+    5: ["jazz", "chess"],
+    7: ["cooking"],
+    10: ["hiking", "jazz"],
+}
+
+
+def make_population(rows):
+    users, analyses = [], {}
+    for user_id, (age, gender, location, traits) in enumerate(rows, start=1):
+        users.append(User(id=user_id, age=age, gender=gender, location=location))
+        if traits is not None:
+            analyses[user_id] = TextAnalysis(user_id=user_id, trait_scores=traits)
+    return users, analyses
+
+
+def scalar_scores(current, candidates, analyses, interests):
+    return np.array([
+        min(
+            calculate_demographic_compatibility(current, candidate)
+            + calculate_personality_compatibility(current.id, candidate.id, None, analyses)
+            + calculate_interest_compatibility(current.id, candidate.id, None, interests),
+            1.0
+        )
+        for candidate in candidates
+    ])
+
+
+def vectorized_scores(current, candidates, analyses, interests, columns):
+    current_analysis = analyses.get(current.id)
+    index = InterestIndex()
+    index.load(interests)
+    return matching_engine.score_candidates(
+        current,
+        current_analysis.trait_scores if current_analysis else None,
+        columns,
+        has_analysis=current_analysis is not None,
+        shared_interests=index.shared_counts(current.id, columns.user_ids)
+    )
+
+
+def json_columns(candidates, analyses):
+    return matching_engine.build_columns(candidates, {
+        candidate.id: analyses[candidate.id].trait_scores for candidate in candidates if candidate.id in analyses
+    })
+
+
+def store_columns(candidates, analyses):
+    store = TraitStore()
+    store.load((user_id, analysis.trait_scores) for user_id, analysis in analyses.items())
+    return matching_engine.build_columns_from_store(candidates, store)
+
+
+def synthetic_population(count=300):
+    return make_population([
+        (user.age, user.gender, user.location, traits) for user, traits in synthetic_users(count, seed=3)
+    ])
+
+
+@pytest.mark.parametrize("build", [json_columns, store_columns], ids=["json", "trait_store"])
+@pytest.mark.parametrize("current_index", range(len(EDGE_CASES)))
+def test_edge_cases_match_scalar_scores(build, current_index):
+    users, analyses = make_population(EDGE_CASES)
+    current = users[current_index]
+    candidates = [user for user in users if user is not current]
+    
+    expected = scalar_scores(current, candidates, analyses, EDGE_INTERESTS)
+    actual = vectorized_scores(current, candidates, analyses, EDGE_INTERESTS, build(candidates, analyses))
+    
+    np.testing.assert_allclose(actual, expected, rtol=0, atol=1e-12)
+
+
+@pytest.mark.parametrize("build", [json_columns, store_columns], ids=["json", "trait_store"])
+def test_synthetic_population_matches_scalar_scores(build):
+    users, analyses = synthetic_population()
+    interests = dict(synthetic_interests(len(users), seed=3))
+    for current in users[:25]:
+        candidates = [user for user in users if user is not current]
+        expected = scalar_scores(current, candidates, analyses, interests)
+        actual = vectorized_scores(current, candidates, analyses, interests, build(candidates, analyses))
+        np.testing.assert_allclose(actual, expected, rtol=0, atol=1e-12)
+
+
+def test_age_band_boundaries():
+    users, _ = make_population([(30, None, None, None), (35, None, None, None), (36, None, None, None),
+                                (40, None, None, None), (41, None, None, None), (None, None, None, None)])
+    columns = matching_engine.build_columns(users[1:], {})
+    
+    np.testing.assert_array_equal(matching_engine.score_demographics(users[0], columns), [0.3, 0.15, 0.15, 0.0, 0.0])
+
+
+def test_interest_bonus_is_bounded():
+    np.testing.assert_allclose(matching_engine.score_interests(np.array([0, 1, 2, 3, 4, 10])),
+                               [0.0, 0.05, 0.1, 0.15, 0.15, 0.15])
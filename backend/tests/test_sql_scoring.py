@@ -0,0 +1,111 @@
+# backend/tests/test_sql_scoring.py
+import pytest
+from sqlalchemy.orm import aliased
+from app.api.matching import calculate_compatibility, get_latest_text_analyses, load_user_interests
+from app.models.analysis import TextAnalysis, UserTraitVector
+from app.models.interest import Interest, UserInterest
+from app.models.user import User
+from app.services import sql_scoring
+from benchmarks.common import populate
+
+# (age, gender, location, trait_scores or None for no analysis)
+EDGE_CASES = [
+    (30, "female", "New York", {"openness": 0.5, "conscientiousness": 0.25, "extraversion": 0.75,
+                                "agreeableness": 0.1, "neuroticism": 0.9}),
+    # Age bands: differences of exactly 5 and 10 are inside, 6 and 11 are not
+    (35, "Female", "new york", {"openness": 0.5}),
+    (36, "FEMALE", "NEW YORK", {"openness": 0.123456, "neuroticism": 0.987654}),
+    (40, "male", "London", {}),
+    (41, "male", "london", {"openness": 1.0, "conscientiousness": 0.0}),
+    # Traits outside the vector columns
+    (25, "female", "Paris", {"humor": 0.4, "openness": 0.2}),
+    (24, "non-binary", "Paris", None),
+    (None, None, None, {"openness": 0.5, "agreeableness": 0.5}),
+    (0, "", "", {"openness": 0.3}),
+    (30, "agender", "Atlantis", None),
+]
+
+# Interests of EDGE_CASES users by id; four shared interests run past the bonus cap
+EDGE_INTERESTS = {
+    1: ["hiking", "jazz", "chess", "cooking"],
+    2: ["hiking", "jazz", "chess", "cooking"],
+    3: ["hiking"],
+    5: ["jazz", "chess"],
+    8: ["cooking"],
+}
+
+TOLERANCE = 1e-9
+
+
+def add_users(db, rows, interests=None):
+    names = sorted({name for user_names in (interests or {}).values() for name in user_names})
+    interest_ids = {name: index + 1 for index, name in enumerate(names)}
+    db.add_all(Interest(id=interest_id, name=name) for name, interest_id in interest_ids.items())
+    for user_id, user_names in (interests or {}).items():
+        db.add_all(UserInterest(user_id=user_id, interest_id=interest_ids[name]) for name in user_names)
+    for user_id, (age, gender, location, traits) in enumerate(rows, start=1):
+        db.add(User(
+            id=user_id, email=f"user{user_id}@example.com", hashed_password="x", full_name=f"User {user_id}",
+            is_active=True, age=age, gender=gender, location=location, trait_scores={}, emotional_badges=[]
+        ))
+        if traits is not None:
+            db.add(TextAnalysis(user_id=user_id, text_content="test", trait_scores=traits))
+            sql_scoring.store_trait_vector(db, user_id, traits)
+    db.commit()
+
+
+def assert_sql_matches_python(db):
+    users = db.query(User).order_by(User.id).all()
+    analyses = get_latest_text_analyses([user.id for user in users], db)
+    interests = load_user_interests(db)
+    checked = 0
+    for current in users:
+        analysis = analyses.get(current.id)
+        traits = analysis.trait_scores if analysis else None
+        if not sql_scoring.supports(traits):
+            # MATCHING_ENGINE=sql falls back to the in-process engine for these users
+            continue
+        score = sql_scoring.compatibility_expression(current, traits, has_analysis=analysis is not None)
+        sql_scores = dict(
+            db.query(User.id, score)
+            .outerjoin(UserTraitVector, UserTraitVector.user_id == User.id)
+            .filter(User.id != current.id)
+            .all()
+        )
+        for other in users:
+            if other.id != current.id:
+                expected = calculate_compatibility(current, other, db, analyses, interests)
+                assert sql_scores[other.id] == pytest.approx(expected, abs=TOLERANCE), (current.id, other.id)
+                checked += 1
+    assert checked
+
+
+def test_compatibility_expression_matches_python_edge_cases(db):
+    add_users(db, EDGE_CASES, EDGE_INTERESTS)
+    assert_sql_matches_python(db)
+
+
+def test_compatibility_expression_matches_python_population(db):
+    populate(db, 150, seed=3)
+    assert_sql_matches_python(db)
+
+
+def test_pair_expression_matches_python(db):
+    add_users(db, [row for row in EDGE_CASES if sql_scoring.supports(row[3])], EDGE_INTERESTS)
+    user, other = aliased(User), aliased(User)
+    vector, other_vector = aliased(UserTraitVector), aliased(UserTraitVector)
+    pair_scores = db.query(
+        user.id, other.id, sql_scoring.pair_compatibility_expression(user, vector, other, other_vector)
+    )\
+        .join(other, other.id != user.id)\
+        .outerjoin(vector, vector.user_id == user.id)\
+        .outerjoin(other_vector, other_vector.user_id == other.id)\
+        .all()
+    
+    users = {row.id: row for row in db.query(User).all()}
+    analyses = get_latest_text_analyses(list(users), db)
+    interests = load_user_interests(db)
+    assert len(pair_scores) == len(users) * (len(users) - 1)
+    for user_id, other_id, score in pair_scores:
+        expected = calculate_compatibility(users[user_id], users[other_id], db, analyses, interests)
+        assert score == pytest.approx(expected, abs=TOLERANCE), (user_id, other_id)
@@ -4,6 +4,7 @@ import { useParams } from 'react-router-dom';
 import { useAuth } from '../../contexts/AuthContext';
 import { useWebSocket } from '../../contexts/WebSocketContext';
 import { chatAPI } from '../../services/api';
+import { webSocketService } from '../../services/websocket';
 import './Chat.css';
 
 interface ChatProps {
@@ -16,6 +17,7 @@ interface ChatProps {
 
 interface Message {
   id: string;
+  seq?: number; // Position in the session; history pages are fetched by it
   sender: string; // Changed to always be string
   content: string;
   timestamp: Date;
@@ -39,7 +41,6 @@ const Chat: React.FC<ChatProps> = ({
   const [isLoading, setIsLoading] = useState(true);
   const [error, setError] = useState<string>('');
   const [hasMoreMessages, setHasMoreMessages] = useState(true);
-  const [page, setPage] = useState(1);
   
   const messagesEndRef = useRef<HTMLDivElement>(null);
   const messagesContainerRef = useRef<HTMLDivElement>(null);
@@ -60,29 +61,34 @@ const Chat: React.FC<ChatProps> = ({
     scrollToBottom();
   }, [messages]);
 
-  const fetchChatHistory = async (pageNum: number = 1) => {
+  const fetchChatHistory = async (before?: number) => {
     if (!chatSessionId || !user) return;
 
     try {
       setIsLoading(true);
-      const response = await chatAPI.getChatHistory(chatSessionId);
+      const response = await chatAPI.getChatHistory(chatSessionId, { before });
       
       if (response.data && response.data.messages) {
         const newMessages = response.data.messages.map((msg: any) => ({
-          ...msg,
-          sender: msg.sender.toString(), // Ensure sender is string
-          timestamp: new Date(msg.timestamp),
-          status: msg.sender.toString() === currentUserId ? 'delivered' : undefined
+          id: msg.id.toString(),
+          seq: msg.seq,
+          sender: msg.sender_id.toString(), // Ensure sender is string
+          content: msg.message_content,
+          timestamp: new Date(msg.created_at),
+          status: msg.sender_id.toString() === currentUserId ? 'delivered' : undefined
         }));
         
-        if (pageNum === 1) {
+        if (before === undefined) {
           setMessages(newMessages);
+          // The latest page is held now; a reconnect only needs what comes after it
+          if (newMessages.length > 0) {
+            webSocketService.noteSeq(Number(chatSessionId), newMessages[newMessages.length - 1].seq);
+          }
         } else {
           setMessages(prev => [...newMessages, ...prev]);
         }
         
         setHasMoreMessages(response.data.has_more || false);
-        setPage(pageNum);
       }
     } catch (error: any) {
       console.error('Error fetching chat history:', error);
@@ -93,8 +99,9 @@ const Chat: React.FC<ChatProps> = ({
   };
 
   const loadMoreMessages = () => {
-    if (hasMoreMessages && !isLoading) {
-      fetchChatHistory(page + 1);
+    if (hasMoreMessages && !isLoading && messages.length > 0) {
+      // Keyset paging: everything older than the oldest message shown
+      fetchChatHistory(messages[0].seq);
     }
   };
 
@@ -116,12 +116,14 @@ export const analysisAPI = {
 };
 
 export const chatAPI = {
-  getChatHistory: (sessionId: string) => 
-    api.get(`/chat/${sessionId}/history`),
+  getChatHistory: (sessionId: string, params: { before?: number; after?: number; limit?: number } = {}) => 
+    api.get(`/chat/${sessionId}/history`, { params }),
   createChatSession: (userId: number, targetUserId: number) => 
     api.post('/chat/sessions', { user_id: userId, target_user_id: targetUserId }),
   getChatSessions: (userId: number) => 
     api.get(`/chat/user/${userId}/sessions`),
+  syncChats: (sessions: Record<number, number>, watermarks: Record<number, [number, number]> = {}, limit?: number) => 
+    api.post('/chat/sync', { sessions, watermarks }, { params: { limit } }),
   markAsRead: (sessionId: string, messageIds: string[]) => 
     api.post(`/chat/${sessionId}/read`, { message_ids: messageIds }),
   sendTypingIndicator: (sessionId: string, isTyping: boolean) => 
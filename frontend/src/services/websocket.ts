@@ -1,16 +1,30 @@
 // frontend/src/services/websocket.ts
+import { chatAPI } from './api';
+
 class WebSocketService {
   private socket: WebSocket | null = null;
   private reconnectAttempts = 0;
   private maxReconnectAttempts = 5;
+  private hasConnected = false;
+  // Newest message seq seen per chat session, sent to /chat/sync after a reconnect
+  private lastSeq: Record<number, number> = {};
+  // [read_seq, other_read_seq] per session, so /chat/sync can leave unchanged sessions out
+  private watermarks: Record<number, [number, number]> = {};
 
   connect(userId: number) {
-    const wsUrl = `ws://localhost:8000/api/v1/ws/chat/${userId}`;
+    const token = localStorage.getItem('auth_token') || '';
+    const wsUrl = `ws://localhost:8000/api/v1/ws/chat/${userId}?token=${encodeURIComponent(token)}`;
     this.socket = new WebSocket(wsUrl);
 
     this.socket.onopen = () => {
       console.log('WebSocket connected');
       this.reconnectAttempts = 0;
+      if (this.hasConnected) {
+        this.syncMissed();
+      } else {
+        this.seedFromInbox(userId);
+      }
+      this.hasConnected = true;
     };
 
     this.socket.onmessage = (event) => {
@@ -47,11 +61,88 @@ class WebSocketService {
     }
   }
 
+  // Record that the client holds a session's messages up to seq (from history or the inbox)
+  noteSeq(sessionId: number, seq?: number) {
+    if (seq) {
+      this.lastSeq[sessionId] = Math.max(this.lastSeq[sessionId] || 0, seq);
+    }
+  }
+
+  private async seedFromInbox(userId: number) {
+    // After a page load nothing has arrived live yet; start from each session's latest seq
+    try {
+      const response = await chatAPI.getChatSessions(userId);
+      for (const session of response.data.sessions) {
+        this.noteSeq(session.session_id, session.last_seq);
+        this.watermarks[session.session_id] = [session.read_seq, session.other_read_seq];
+      }
+    } catch (error) {
+      console.error('Loading chat sessions failed:', error);
+    }
+  }
+
+  private async syncMissed() {
+    // Fetch only what arrived while the socket was down, replayed as chat_message frames
+    try {
+      const known = { ...this.lastSeq };
+      const response = await chatAPI.syncChats(known, this.watermarks);
+      for (const session of response.data.sessions) {
+        this.watermarks[session.session_id] = [session.read_seq, session.other_read_seq];
+        let messages = session.messages;
+        if (session.gap && messages.length > 0) {
+          messages = (await this.fetchGap(session.session_id, known[session.session_id] || 0, messages[0].seq)).concat(messages);
+        }
+        for (const message of messages) {
+          this.replay(message);
+        }
+      }
+    } catch (error) {
+      console.error('Chat sync failed:', error);
+    }
+  }
+
+  // Page back through history from firstSeq until the messages after knownSeq are all held
+  private async fetchGap(sessionId: number, knownSeq: number, firstSeq: number) {
+    let missed: any[] = [];
+    let before = firstSeq;
+    while (true) {
+      const response = await chatAPI.getChatHistory(String(sessionId), { before, limit: 200 });
+      const page = response.data.messages;
+      missed = page.filter((message: any) => message.seq > knownSeq).concat(missed);
+      if (!response.data.has_more || page.length === 0 || page[0].seq <= knownSeq + 1) {
+        return missed;
+      }
+      before = page[0].seq;
+    }
+  }
+
+  private replay(message: any) {
+    this.handleMessage({
+      type: 'chat_message',
+      data: {
+        id: message.id,
+        seq: message.seq,
+        sessionId: message.session_id,
+        senderId: message.sender_id,
+        message: message.message_content,
+        createdAt: message.created_at,
+      },
+    });
+  }
+
   private handleMessage(data: any) {
     // Handle different message types
     switch (data.type) {
       case 'chat_message':
         // Update UI with new message
+        this.noteSeq(data.data.sessionId, data.data.seq);
+        break;
+      case 'read_receipt':
+        // The other participant has read up to data.readSeq
+        if (this.watermarks[data.data.sessionId]) {
+          const [readSeq, otherReadSeq] = this.watermarks[data.data.sessionId];
+          this.watermarks[data.data.sessionId] = [readSeq, Math.max(otherReadSeq, data.data.readSeq)];
+        }
         break;
       case 'moderation_warning':
         // Show moderation warning to user
@@ -59,6 +150,10 @@ class WebSocketService {
       case 'ai_suggestions':
         // Show AI response suggestions
         break;
+      case 'ping':
+        // Heartbeat: the server closes connections that stay silent too long
+        this.sendMessage({ type: 'pong', data: {}, timestamp: Date.now() });
+        break;
       default:
         console.log('Unknown message type:', data.type);
     }